@@ -46,6 +46,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'MechanicallyApp.middleware.RequestProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -99,6 +100,24 @@ DATABASES = {
 }
 
 
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+    'sessions': env.cache('SESSION_CACHE_URL', default='dummycache://'),
+    'tokens': env.cache('TOKEN_DENYLIST_CACHE_URL', default='dummycache://'),
+}
+#lista odwołanych tokenów musi być wspólna dla wszystkich procesów i nie może usuwać wpisów przed ich wygaśnięciem
+#(np. redis z maxmemory-policy noeviction, a na pojedynczym serwerze filecache z dużym MAX_ENTRIES); dla locmem
+#i dummy uwierzytelnianie tokenami jest wyłączone
+TOKEN_DENYLIST_CACHE_ALIAS = 'tokens'
+REFERENCE_DATA_CACHE_TIMEOUT = 60*60
+DASHBOARD_CACHE_TIMEOUT = 30
+USER_SNAPSHOT_CACHE_TIMEOUT = 60*10
+
+REQUEST_PROFILING_ENABLED = env.bool('REQUEST_PROFILING_ENABLED', default=False)
+REQUEST_PROFILING_SLOW_THRESHOLD_MS = env.int('REQUEST_PROFILING_SLOW_THRESHOLD_MS', default=500)
+REQUEST_PROFILING_FLUSH_INTERVAL = 30
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 AUTH_PASSWORD_VALIDATORS = [
@@ -124,9 +143,13 @@ AUTH_PASSWORD_VALIDATORS = [
         'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
     },
     {
-        'NAME': 'pwned_passwords_django.validators.PwnedPasswordsValidator',
+        'NAME': 'MechanicallyApp.validators.BreachedPasswordValidator',
     },
 ]
+#posortowane skróty SHA-1 wyciekniętych haseł. Plik nie jest częścią repozytorium - przy wdrożeniu trzeba pobrać listę
+#Pwned Passwords (SHA-1) i zbudować go komendą "manage.py build_breached_password_file <lista>"; bez niego
+#"manage.py check --deploy" zgłasza błąd MechanicallyApp.E001
+BREACHED_PASSWORDS_PATH = env('BREACHED_PASSWORDS_PATH', default=os.path.join(BASE_DIR, 'data', 'breached_passwords.bin'))
 
 
 # Internationalization
@@ -149,9 +172,11 @@ USE_TZ = True
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = 'MechanicallyApp.User'
+AUTHENTICATION_BACKENDS = ['MechanicallyApp.auth_services.CachedUserModelBackend', 'django.contrib.auth.backends.ModelBackend']
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework.authentication.SessionAuthentication',
+        'MechanicallyApp.authentication.AccessTokenAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'MechanicallyApp.permissions.DefaultDenyAll',
@@ -159,6 +184,8 @@ REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'MechanicallyApp.pagination.DefaultCursorPagination',
+    'PAGE_SIZE': 50,
     'DEFAULT_THROTTLE_CLASSES':[
         'rest_framework.throttling.UserRateThrottle',
         'rest_framework.throttling.AnonRateThrottle',
@@ -173,17 +200,41 @@ REST_FRAMEWORK = {
         'account_activation': '10/hour',
         'obtain_csrf': '3/minute',
         'login':'3/minute',
+        'token_refresh':'10/minute',
     }
 }
 
+JWT_SIGNING_KEY = env('JWT_SIGNING_KEY', default=SECRET_KEY)
+JWT_ALGORITHM = 'HS256'
+JWT_ACCESS_TOKEN_LIFETIME = timedelta(minutes=5)
+JWT_REFRESH_TOKEN_LIFETIME = timedelta(days=1)
+
+PAGINATION_MAX_PAGE_SIZE=200
+AUTOCOMPLETE_MAX_RESULTS=50
+BATCH_LOOKUP_MAX_SIZE=100
+
 EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST=env('EMAIL_HOST')
 EMAIL_PORT=env('EMAIL_PORT')
 EMAIL_USE_TLS=True
 EMAIL_HOST_USER=env('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD=env('EMAIL_HOST_PASSWORD')
+EMAIL_QUEUE_BATCH_SIZE=100
+EMAIL_QUEUE_MAX_ATTEMPTS=5
+EMAIL_QUEUE_RETRY_DELAY=60
+#czas rezerwacji paczki maili (sekundy) - musi wystarczyć na wysłanie całej paczki
+EMAIL_QUEUE_CLAIM_TIMEOUT=300
 
 CSRF_COOKIE_SAMESITE = 'Strict'
+#przy wspólnym cache (SESSION_CACHE_URL: redis lub memcached, filecache dla jednego serwera) sesje czytane są z cache,
+#a baza jest tylko kopią zapasową przy braku wpisu w cache. locmem jest osobny w każdym procesie (wylogowanie
+#usunęłoby sesję tylko z cache jednego procesu), więc bez wspólnego cache sesje czytane są z bazy.
+#Wygasłe sesje usuwa komenda purge_expired_sessions
+SHARED_SESSION_CACHE = CACHES['sessions']['BACKEND'] not in ('django.core.cache.backends.locmem.LocMemCache',
+                                                             'django.core.cache.backends.dummy.DummyCache')
+SESSION_ENGINE = env('SESSION_ENGINE', default='django.contrib.sessions.backends.cached_db' if SHARED_SESSION_CACHE
+                     else 'django.contrib.sessions.backends.db')
+SESSION_CACHE_ALIAS = 'sessions'
 SESSION_COOKIE_AGE=60*60*12
 SESSION_COOKIE_HTTPONLY=True
 SESSION_COOKIE_SAMESITE='Strict'
@@ -0,0 +1,36 @@
+from typing import NamedTuple
+from uuid import UUID
+
+from .models import UserLocationAssignment
+
+
+#informacje o wykonującym żądanie użytkowniku (rola oraz przypisana lokalizacja), wyznaczane jednokrotnie na żądanie
+#i współdzielone przez klasy uprawnień, widoki oraz serializery
+class ActorContext(NamedTuple):
+    role: str | None
+    location_id: UUID | None
+    location_type: str | None
+
+    @property
+    def branch_id(self):
+        return self.location_id if self.location_type == 'B' else None
+
+    @property
+    def workshop_id(self):
+        return self.location_id if self.location_type == 'W' else None
+
+
+def get_actor_context(request):
+    actor_context = getattr(request, '_actor_context', None)
+    if actor_context is not None:
+        return actor_context
+    user = request.user
+    role = user.role if user.is_authenticated else None
+    location_id, location_type = None, None
+    if role in ('standard', 'mechanic'):
+        assignment = UserLocationAssignment.objects.filter(user_id=user.id).values_list('location_id', 'location__location_type').first()
+        if assignment is not None:
+            location_id, location_type = assignment
+    actor_context = ActorContext(role=role, location_id=location_id, location_type=location_type)
+    request._actor_context = actor_context
+    return actor_context
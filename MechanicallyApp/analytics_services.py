@@ -0,0 +1,93 @@
+from django.db import transaction, IntegrityError
+from django.db.models import F, Sum, Count, DateField
+from django.db.models.functions import TruncDate, Trunc
+from django.utils import timezone
+
+from .models import RepairReport, RepairCostRollup
+
+ANALYTICS_PERIODS = ('day', 'month', 'year')
+ANALYTICS_DIMENSIONS = {
+    'vehicle': ('vehicle_id', 'vehicle__vin'),
+    'manufacturer': ('manufacturer_id', 'manufacturer__name'),
+    'workshop': ('workshop_id', 'workshop__name'),
+}
+ANALYTICS_GROUPINGS = ANALYTICS_PERIODS + tuple(ANALYTICS_DIMENSIONS)
+
+def rollup_key(day, vehicle_id, workshop_id, managed_by_id):
+    return ':'.join((day.isoformat(), str(vehicle_id), str(workshop_id or ''), str(managed_by_id or '')))
+
+def _add_to_rollup(lookup, repair_count, total_cost):
+    return RepairCostRollup.objects.filter(**lookup).update(
+        repair_count=F('repair_count') + repair_count, total_cost=F('total_cost') + total_cost)
+
+#dopisuje koszt repair reportu, który właśnie przeszedł do statusu HISTORIC, do wiersza dnia, pojazdu, warsztatu i menadżera.
+#Najpierw próbowany jest UPDATE; jeśli wiersza jeszcze nie ma, jest tworzony, a przy wyścigu z równoległym
+#zamknięciem innego zgłoszenia (naruszenie unikalności rollup_key) koszt dopisywany jest ponownie UPDATE-em
+def record_repair_cost(repair_report_queryset):
+    cost, last_change_date, vehicle_id, manufacturer_id, workshop_id, managed_by_id = repair_report_queryset.values_list(
+        'cost', 'last_change_date', 'failure_report__vehicle_id', 'failure_report__vehicle__manufacturer_id',
+        'failure_report__workshop_id', 'failure_report__managed_by_id').get()
+    day = timezone.localdate(last_change_date)
+    lookup = {'rollup_key': rollup_key(day, vehicle_id, workshop_id, managed_by_id)}
+    if _add_to_rollup(lookup, 1, cost):
+        return
+    try:
+        with transaction.atomic():
+            RepairCostRollup.objects.create(day=day, vehicle_id=vehicle_id, manufacturer_id=manufacturer_id,
+                                            workshop_id=workshop_id, managed_by_id=managed_by_id, repair_count=1,
+                                            total_cost=cost, **lookup)
+    except IntegrityError:
+        _add_to_rollup(lookup, 1, cost)
+
+#odtwarza wiersze zagregowane jednym zapytaniem GROUP BY po zakończonych naprawach. Z parametrem since przeliczane są
+#tylko dni od podanej daty, a starsze wiersze pozostają bez zmian
+def backfill_repair_cost_rollups(since=None, batch_size=1000):
+    repair_reports = RepairReport.objects.filter(status='H')
+    rollups = RepairCostRollup.objects.all()
+    if since is not None:
+        repair_reports = repair_reports.filter(last_change_date__date__gte=since)
+        rollups = rollups.filter(day__gte=since)
+    rows = (repair_reports.order_by()
+            .annotate(day=TruncDate('last_change_date'))
+            .values('day', 'failure_report__vehicle_id', 'failure_report__vehicle__manufacturer_id', 'failure_report__workshop_id',
+                    'failure_report__managed_by_id')
+            .annotate(repair_count=Count('id'), total_cost=Sum('cost')))
+    with transaction.atomic():
+        rollups.delete()
+        created = RepairCostRollup.objects.bulk_create((
+            RepairCostRollup(rollup_key=rollup_key(row['day'], row['failure_report__vehicle_id'],
+                                                   row['failure_report__workshop_id'], row['failure_report__managed_by_id']),
+                             day=row['day'], vehicle_id=row['failure_report__vehicle_id'],
+                             manufacturer_id=row['failure_report__vehicle__manufacturer_id'],
+                             workshop_id=row['failure_report__workshop_id'],
+                             managed_by_id=row['failure_report__managed_by_id'],
+                             repair_count=row['repair_count'], total_cost=row['total_cost'])
+            for row in rows.iterator(chunk_size=batch_size)), batch_size=batch_size)
+    return len(created)
+
+#sumy kosztów i liczby napraw w podziale na okres (dzień, miesiąc, rok) lub na pojazd, producenta albo warsztat.
+#Podział na obiekty sortowany jest malejąco po koszcie i ograniczany do limit pozycji
+def repair_cost_summary(queryset, group_by, limit):
+    totals = queryset.aggregate(repair_count=Sum('repair_count'), total_cost=Sum('total_cost'))
+    if group_by in ANALYTICS_PERIODS:
+        rows = (queryset.order_by()
+                .annotate(period=Trunc('day', group_by, output_field=DateField()))
+                .values('period')
+                .annotate(repair_count=Sum('repair_count'), total_cost=Sum('total_cost'))
+                .order_by('period'))
+        results = [{'key': row['period'].isoformat(), 'name': None, 'repair_count': row['repair_count'],
+                    'total_cost': row['total_cost']} for row in rows]
+    else:
+        key_field, name_field = ANALYTICS_DIMENSIONS[group_by]
+        rows = (queryset.order_by()
+                .values(key_field, name_field)
+                .annotate(repair_count=Sum('repair_count'), total_cost=Sum('total_cost'))
+                .order_by('-total_cost', key_field)[:limit])
+        results = [{'key': row[key_field], 'name': row[name_field], 'repair_count': row['repair_count'],
+                    'total_cost': row['total_cost']} for row in rows]
+    return {
+        'group_by': group_by,
+        'repair_count': totals['repair_count'] or 0,
+        'total_cost': totals['total_cost'] or 0,
+        'results': results,
+    }
@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class MechanicallyappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'MechanicallyApp'
+
+    def ready(self):
+        from . import signals, checks
+        from .search_services import create_fulltext_indexes
+        post_migrate.connect(create_fulltext_indexes, sender=self)
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import PermissionDenied
+from django.core.cache import cache, caches
+
+from .cache_services import get_cache_version, bump_cache_version, is_shared_cache
+from .models import User
+
+#pola użytkownika potrzebne klasom uprawnień; reszta pól obiektu request.user jest odroczona (deferred)
+#i wczytywana z bazy dopiero przy pierwszym odczycie
+USER_SNAPSHOT_FIELDS = ('id', 'role', 'is_superuser', 'is_active')
+
+def _user_snapshot_namespace(user_id):
+    return f'user_snapshot:{user_id}'
+
+#migawka użytkownika w cache, pod kluczem z numerem wersji podbijanym przy każdym zapisie użytkownika (zmiana roli,
+#dezaktywacja, zmiana hasła), więc zmiany działają od następnego żądania. Zamiast hasła przechowywany jest
+#tylko skrót sesji, którym django.contrib.auth weryfikuje sesję
+def get_user_snapshot(user_id):
+    namespace = _user_snapshot_namespace(user_id)
+    cache_key = f'{namespace}:v{get_cache_version(namespace)}'
+    snapshot = cache.get(cache_key)
+    if snapshot is None:
+        user = User.objects.only(*USER_SNAPSHOT_FIELDS, 'password').filter(pk=user_id).first()
+        if user is None:
+            return None
+        snapshot = {field: getattr(user, field) for field in USER_SNAPSHOT_FIELDS}
+        snapshot['session_auth_hash'] = user.get_session_auth_hash()
+        cache.set(cache_key, snapshot, timeout=getattr(settings, 'USER_SNAPSHOT_CACHE_TIMEOUT', 600))
+    return snapshot
+
+def invalidate_user_snapshot(user_id):
+    bump_cache_version(_user_snapshot_namespace(user_id))
+
+#obiekt User z wczytanymi tylko podanymi polami (pozostałe są odroczone); from_db przyjmuje wartości w kolejności pól modelu
+def build_deferred_user(values):
+    field_names = [field.attname for field in User._meta.concrete_fields if field.attname in values]
+    return User.from_db('default', field_names, [values[field] for field in field_names])
+
+def build_user_from_snapshot(snapshot):
+    user = build_deferred_user({field: snapshot[field] for field in USER_SNAPSHOT_FIELDS})
+    user._session_auth_hash = snapshot['session_auth_hash']
+    return user
+
+
+#backend uwierzytelniania: logowanie jak w ModelBackend, a użytkownik sesji odtwarzany jest z migawki w cache
+#zamiast z pełnego wiersza auth_user przy każdym żądaniu. Migawka używana jest tylko ze wspólnym cache - z locmem
+#dezaktywacja w jednym procesie nie unieważniłaby migawek w pozostałych, więc użytkownik czytany jest wtedy z bazy.
+#ModelBackend pozostaje w AUTHENTICATION_BACKENDS dla sesji zalogowanych przed jego wprowadzeniem; odrzucone dane
+#logowania kończą sprawdzanie (PermissionDenied), żeby ModelBackend nie liczył skrótu hasła drugi raz
+class CachedUserModelBackend(ModelBackend):
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        user = super().authenticate(request, username=username, password=password, **kwargs)
+        if user is None:
+            raise PermissionDenied
+        return user
+
+    def get_user(self, user_id):
+        if not is_shared_cache(caches['default']):
+            return super().get_user(user_id)
+        snapshot = get_user_snapshot(user_id)
+        if snapshot is None:
+            return None
+        user = build_user_from_snapshot(snapshot)
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,27 @@
+import jwt
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+
+from .token_services import decode_token, build_user_from_token, build_actor_context_from_token
+
+
+#uwierzytelnianie nagłówkiem "Authorization: Bearer <access token>" dla aplikacji mobilnych i usług: użytkownik oraz
+#kontekst (rola, lokalizacja) odtwarzane są z claims podpisanego tokenu, więc żądanie nie odpytuje bazy
+class AccessTokenAuthentication(BaseAuthentication):
+    keyword = b'bearer'
+
+    def authenticate(self, request):
+        header = get_authorization_header(request).split()
+        if not header or header[0].lower() != self.keyword:
+            return None
+        if len(header) != 2:
+            raise AuthenticationFailed('Invalid Authorization header.')
+        try:
+            payload = decode_token(header[1].decode(), 'access')
+        except (jwt.InvalidTokenError, UnicodeDecodeError):
+            raise AuthenticationFailed('Token is invalid or expired.')
+        request._actor_context = build_actor_context_from_token(payload)
+        return build_user_from_token(payload), payload
+
+    def authenticate_header(self, request):
+        return 'Bearer'
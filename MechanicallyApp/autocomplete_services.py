@@ -0,0 +1,38 @@
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+
+from .models import Location, User, Vehicle
+from .normalization import normalize_text
+
+NORMALIZED_MODELS = (Location, User, Vehicle)
+
+#wyszukiwanie prefiksowe po kolumnach-cieniach: wiersz pasuje, gdy któraś kolumna zaczyna się od całego zapytania
+#albo gdy każde słowo zapytania jest początkiem którejś z kolumn ('jan kow' -> imię 'jan%' i nazwisko 'kow%').
+#Kolumny i zapytanie są już znormalizowane, więc istartswith (na MySQL zwykłe LIKE 'abc%') korzysta z indeksu,
+#w przeciwieństwie do icontains ('%abc%')
+def autocomplete(queryset, fields, query, limit):
+    query = ' '.join(normalize_text(query).split())
+    words = query.split(' ')
+    condition = reduce(or_, (Q(**{f'{field}__istartswith': query}) for field in fields))
+    if len(words) > 1:
+        condition |= reduce(lambda a, b: a & b, (reduce(or_, (Q(**{f'{field}__istartswith': word}) for field in fields)) for word in words))
+    return queryset.filter(condition).order_by(*fields, 'pk')[:limit]
+
+#uzupełnia kolumny-cienie istniejących wierszy (np. po dodaniu kolumn migracją), paczkami po batch_size
+def rebuild_normalized_fields(batch_size=1000):
+    counts = {}
+    for model in NORMALIZED_MODELS:
+        queryset = model.objects.order_by('pk').only('pk', *model.normalized_fields)
+        normalized_fields = list(model.normalized_fields.values())
+        counts[model._meta.model_name] = 0
+        last_pk = None
+        while True:
+            batch = list((queryset if last_pk is None else queryset.filter(pk__gt=last_pk))[:batch_size])
+            if not batch:
+                break
+            model.objects.bulk_update(batch, normalized_fields, batch_size=batch_size)
+            counts[model._meta.model_name] += len(batch)
+            last_pk = batch[-1].pk
+    return counts
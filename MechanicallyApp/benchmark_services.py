@@ -0,0 +1,295 @@
+import json
+import math
+import os
+import tempfile
+import time
+import tracemalloc
+import uuid
+from typing import NamedTuple, Callable, Optional
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .models import City, Manufacturer, Location, Vehicle, User, FailureReport, RepairReport, RepairReportRejection
+from .seed_services import seed_fleet, SEED_PASSWORD
+
+BENCHMARK_ROLES = ('standard', 'mechanic', 'manager', 'admin')
+BENCHMARK_BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'benchmark_baseline.json')
+
+#pomiary wykonywane są z wyłączonym cache: liczba zapytań nie zależy od kolejności pomiarów, a limity zapytań
+#(throttling) nie zmieniają odpowiedzi przy wielokrotnym powtarzaniu tego samego żądania
+BENCHMARK_CACHES = {alias: {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'} for alias in ('default', 'sessions')}
+
+#lista odwołanych tokenów nie może być dummy (tokeny nie byłyby wystawiane), więc na czas pomiarów trafia do
+#tymczasowego katalogu
+def _benchmark_caches(token_denylist_location):
+    return {**BENCHMARK_CACHES, 'tokens': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                                           'LOCATION': token_denylist_location}}
+
+class BenchmarkCase(NamedTuple):
+    url_name: str
+    method: str
+    url_kwargs: Optional[Callable] = None
+    data: Optional[Callable] = None
+    request_format: str = 'json'
+    authenticate: bool = True
+
+    @property
+    def key(self):
+        return f'{self.method.upper()} {self.url_name}'
+
+def _vehicle_import_file(targets, user):
+    content = 'vin,manufacturer,vehicle_model,year,vehicle_type,fuel_type,location\n'
+    content += f"BENCH000000000001,{targets['manufacturer'].pk},Benchmark,2020,PC,P,{targets['branch'].pk}\n"
+    return {'file': SimpleUploadedFile('vehicles.csv', content.encode(), content_type='text/csv')}
+
+def _batch_ids(targets, *names):
+    return ','.join(str(targets[name].pk) for name in names)
+
+#co najmniej jeden przypadek dla każdego adresu z MechanicallyApp/urls.py. Żądania modyfikujące dane wykonywane są
+#w transakcji wycofywanej po pomiarze, więc każdy pomiar startuje z tego samego stanu bazy. Przypadki
+#z authenticate=False (logowanie, tokeny, aktywacja konta, reset hasła) wysyłane są bez uwierzytelnienia
+BENCHMARK_CASES = (
+    BenchmarkCase('login', 'post', data=lambda t, user: {'username': user.username, 'password': SEED_PASSWORD}, authenticate=False),
+    BenchmarkCase('logout', 'post'),
+    BenchmarkCase('token-obtain', 'post', data=lambda t, user: {'username': user.username, 'password': SEED_PASSWORD}, authenticate=False),
+    BenchmarkCase('token-refresh', 'post', data=lambda t, user: {'refresh': 'invalid-token'}, authenticate=False),
+    BenchmarkCase('token-revoke', 'post', data=lambda t, user: {'refresh': 'invalid-token'}, authenticate=False),
+    BenchmarkCase('manufacturer-list', 'get'),
+    BenchmarkCase('manufacturer-list', 'post', data=lambda t, user: {'name': 'Benchmark'}),
+    BenchmarkCase('manufacturer-detail', 'get', url_kwargs=lambda t: {'pk': t['manufacturer'].pk}),
+    BenchmarkCase('manufacturer-detail', 'patch', url_kwargs=lambda t: {'pk': t['manufacturer'].pk}, data=lambda t, user: {'name': 'Benchmark'}),
+    BenchmarkCase('city-list', 'get'),
+    BenchmarkCase('city-list', 'post', data=lambda t, user: {'name': 'Benchmarkowo'}),
+    BenchmarkCase('city-detail', 'get', url_kwargs=lambda t: {'pk': t['city'].pk}),
+    BenchmarkCase('city-detail', 'patch', url_kwargs=lambda t: {'pk': t['city'].pk}, data=lambda t, user: {'name': 'Benchmarkowo'}),
+    BenchmarkCase('location-list', 'get'),
+    BenchmarkCase('location-list', 'post', data=lambda t, user: {
+        'name': 'ODDZIAL BENCHMARK', 'phone_number': '900000000', 'email': 'benchmark@fleet.example.com',
+        'street_name': 'Testowa', 'building_number': 1, 'city': t['city'].pk, 'location_type': 'B'}),
+    BenchmarkCase('location-autocomplete', 'get', data=lambda t, user: {'q': 'odd'}),
+    BenchmarkCase('location-detail', 'get', url_kwargs=lambda t: {'pk': t['branch'].pk}),
+    BenchmarkCase('location-detail', 'patch', url_kwargs=lambda t: {'pk': t['branch'].pk}, data=lambda t, user: {'street_name': 'Testowa'}),
+    BenchmarkCase('vehicle-list', 'get'),
+    BenchmarkCase('vehicle-list', 'post', data=lambda t, user: {
+        'vin': 'BENCH000000000002', 'manufacturer': t['manufacturer'].pk, 'vehicle_model': 'Benchmark', 'year': 2020,
+        'vehicle_type': 'PC', 'fuel_type': 'P', 'location': t['branch'].pk}),
+    BenchmarkCase('vehicle-import', 'post', data=_vehicle_import_file, request_format='multipart'),
+    BenchmarkCase('vehicle-autocomplete', 'get', data=lambda t, user: {'q': 'tr'}),
+    BenchmarkCase('vehicle-by-vin-list', 'get', data=lambda t, user: {'vins': ','.join(
+        getattr(t[name], 'vin', 'BENCH000000000000') for name in ('vehicle', 'repair_vehicle'))}),
+    BenchmarkCase('vehicle-by-vin', 'get', url_kwargs=lambda t: {'vin': getattr(t['vehicle'], 'vin', 'BENCH000000000000')}),
+    BenchmarkCase('vehicle-batch', 'get', data=lambda t, user: {'ids': _batch_ids(t, 'vehicle', 'repair_vehicle')}),
+    BenchmarkCase('vehicle-detail', 'get', url_kwargs=lambda t: {'pk': t['vehicle'].pk}),
+    BenchmarkCase('vehicle-detail', 'patch', url_kwargs=lambda t: {'pk': t['vehicle'].pk}, data=lambda t, user: {'vehicle_model': 'Benchmark'}),
+    BenchmarkCase('user-activation', 'post', data=lambda t, user: {
+        'user': t['target_user'].pk, 'token': 'invalid-token', 'password': SEED_PASSWORD, 'confirm_password': SEED_PASSWORD},
+        authenticate=False),
+    BenchmarkCase('user-status', 'post', url_kwargs=lambda t: {'pk': t['target_user'].pk}, data=lambda t, user: {'status': 'inactive'}),
+    BenchmarkCase('user-reset-password', 'post', data=lambda t, user: {
+        'user': t['target_user'].pk, 'token': 'invalid-token', 'password': SEED_PASSWORD, 'confirm_password': SEED_PASSWORD},
+        authenticate=False),
+    BenchmarkCase('user-reset-password-request', 'post', data=lambda t, user: {'email': t['target_user'].email}, authenticate=False),
+    BenchmarkCase('user-password-change', 'post', data=lambda t, user: {
+        'old_password': SEED_PASSWORD, 'new_password': 'Benchmark-password-2', 'confirm_password': 'Benchmark-password-2'}),
+    BenchmarkCase('user-list', 'get'),
+    BenchmarkCase('user-list', 'post', data=lambda t, user: {
+        'first_name': 'Benedykt', 'last_name': 'Testowy', 'email': 'benchmark@fleet.example.com',
+        'phone_number': '900000001', 'role': 'standard'}),
+    BenchmarkCase('user-autocomplete', 'get', data=lambda t, user: {'q': 'kow'}),
+    BenchmarkCase('user-profile', 'get'),
+    BenchmarkCase('assigned-location', 'get'),
+    BenchmarkCase('user-batch', 'get', data=lambda t, user: {'ids': _batch_ids(t, 'target_user')}),
+    BenchmarkCase('user-detail', 'get', url_kwargs=lambda t: {'pk': t['target_user'].pk}),
+    BenchmarkCase('user-detail', 'patch', url_kwargs=lambda t: {'pk': t['target_user'].pk}, data=lambda t, user: {'first_name': 'Benedykt'}),
+    BenchmarkCase('user-assignment', 'post', url_kwargs=lambda t: {'pk': t['target_user'].pk}, data=lambda t, user: {'action': 'unassign'}),
+    BenchmarkCase('failure-report-list', 'get'),
+    BenchmarkCase('failure-report-list', 'post', data=lambda t, user: {
+        'vehicle': t['vehicle'].pk, 'title': 'Engine failure', 'description': 'Engine is not starting properly.'}),
+    BenchmarkCase('failure-report-export', 'get'),
+    BenchmarkCase('failure-report-batch', 'get', data=lambda t, user: {'ids': _batch_ids(t, 'failure_report')}),
+    BenchmarkCase('failure-report-detail', 'get', url_kwargs=lambda t: {'pk': t['failure_report'].pk}),
+    BenchmarkCase('failure-report-management', 'post', url_kwargs=lambda t: {'pk': t['failure_report'].pk}, data=lambda t, user: {'action': 'release'}),
+    BenchmarkCase('failure-report-action', 'post', url_kwargs=lambda t: {'pk': t['failure_report'].pk}, data=lambda t, user: {'action': 'dismiss'}),
+    BenchmarkCase('repair-report-list', 'get'),
+    BenchmarkCase('repair-report-export', 'get'),
+    BenchmarkCase('repair-report-rejection-export', 'get'),
+    BenchmarkCase('repair-report-batch', 'get', data=lambda t, user: {'ids': _batch_ids(t, 'repair_report', 'ready_repair_report')}),
+    BenchmarkCase('repair-report-detail', 'get', url_kwargs=lambda t: {'pk': t['repair_report'].pk}),
+    BenchmarkCase('repair-report-detail', 'patch', url_kwargs=lambda t: {'pk': t['repair_report'].pk}, data=lambda t, user: {'repair_action': 'Replaced the battery.'}),
+    BenchmarkCase('workshop-repair-report-list', 'get'),
+    BenchmarkCase('related-repair-report-list', 'get', url_kwargs=lambda t: {'vehicle_id': t['repair_vehicle'].pk}),
+    BenchmarkCase('repair-report-status', 'post', url_kwargs=lambda t: {'pk': t['repair_report'].pk}, data=lambda t, user: {'status': 'ready'}),
+    BenchmarkCase('repair-report-reject', 'post', url_kwargs=lambda t: {'pk': t['ready_repair_report'].pk}, data=lambda t, user: {
+        'title': 'Incomplete repair', 'reason': 'The reported issue has not been fully resolved.'}),
+    BenchmarkCase('repair-report-rejection-list', 'get'),
+    BenchmarkCase('repair-report-rejection-detail', 'get', url_kwargs=lambda t: {'pk': t['rejection'].pk}),
+    BenchmarkCase('fleet-dashboard', 'get'),
+    BenchmarkCase('repair-cost-analytics', 'get'),
+    BenchmarkCase('search', 'get', data=lambda t, user: {'q': 'engine leak'}),
+    BenchmarkCase('request-metrics', 'get'),
+)
+
+class _MissingTarget:
+    pk = uuid.UUID(int=0)
+
+#wybiera obiekty, na których wykonywane są żądania, tak aby dla każdej roli trafiały w typowe ścieżki (np. mechanik
+#z warsztatu, w którym jest aktywna naprawa, manager zarządzający zgłoszeniem). Obiekty sortowane są po kolumnach
+#wygenerowanych z seed (VIN, daty), a nie po losowych UUID, żeby kody odpowiedzi były powtarzalne. Brakujące obiekty
+#zastępowane są identyfikatorem, który nie istnieje w bazie
+def benchmark_targets():
+    missing = _MissingTarget()
+    repair_report = RepairReport.objects.filter(status='A', failure_report__status='A').select_related('failure_report')\
+        .order_by('failure_report__vehicle__vin', 'created_date').first()
+    failure_report = FailureReport.objects.filter(status='P', managed_by__isnull=False).order_by('vehicle__vin', 'report_date').first()
+    vehicle = Vehicle.objects.filter(availability='A', location__location_type='B').order_by('vin').first()
+
+    users = {role: User.objects.filter(role=role).order_by('username') for role in BENCHMARK_ROLES}
+    standard = users['standard'].filter(user_location_assignment__location_id=getattr(vehicle, 'location_id', None)).first()
+    mechanic = None
+    if repair_report is not None:
+        mechanic = users['mechanic'].filter(user_location_assignment__location_id=repair_report.failure_report.workshop_id).first()
+    manager = users['manager'].filter(pk=getattr(failure_report, 'managed_by_id', None)).first()
+    actors = {
+        'standard': standard or users['standard'].first(),
+        'mechanic': mechanic or users['mechanic'].first(),
+        'manager': manager or users['manager'].first(),
+        'admin': users['admin'].first(),
+    }
+    target_user = users['standard'].exclude(pk=getattr(actors['standard'], 'pk', None)).first()
+    ready_repair_report = RepairReport.objects.filter(status='R', failure_report__managed_by=actors['manager'])\
+        .order_by('failure_report__vehicle__vin', 'created_date').first()
+    return {
+        'actors': actors,
+        'city': City.objects.order_by('name').first() or missing,
+        'manufacturer': Manufacturer.objects.order_by('name').first() or missing,
+        'branch': Location.objects.filter(location_type='B').order_by('name').first() or missing,
+        'vehicle': vehicle or missing,
+        'target_user': target_user or missing,
+        'failure_report': failure_report or missing,
+        'repair_report': repair_report or missing,
+        'repair_vehicle': repair_report.failure_report.vehicle if repair_report is not None else missing,
+        'ready_repair_report': ready_repair_report or missing,
+        'rejection': RepairReportRejection.objects.order_by('repair_report__failure_report__vehicle__vin', 'rejection_date').first() or missing,
+    }
+
+def _percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+def _perform(client, case, url, targets, user):
+    data = case.data(targets, user) if case.data is not None else None
+    with transaction.atomic():
+        response = getattr(client, case.method)(url, data=data, format=case.request_format)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        transaction.set_rollback(True)
+    return response
+
+#mierzy jeden przypadek dla jednej roli: liczbę zapytań, medianę i 95. percentyl czasu odpowiedzi oraz szczytowe
+#zużycie pamięci (osobny przebieg, bo tracemalloc spowalnia wykonanie)
+def measure_case(case, role, targets, repeat=10):
+    user = targets['actors'][role]
+    client = APIClient()
+    client.raise_request_exception = False
+    if case.authenticate:
+        client.force_authenticate(user)
+    url = reverse(case.url_name, kwargs=case.url_kwargs(targets) if case.url_kwargs is not None else None)
+
+    _perform(client, case, url, targets, user)
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response = _perform(client, case, url, targets, user)
+            timings.append((time.perf_counter() - start) * 1000)
+        queries = max(queries, len(captured.captured_queries))
+
+    tracemalloc.start()
+    try:
+        _perform(client, case, url, targets, user)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'status': response.status_code,
+        'queries': queries,
+        'p50_ms': round(_percentile(timings, 50), 3),
+        'p95_ms': round(_percentile(timings, 95), 3),
+        'peak_kb': round(peak_memory / 1024, 1),
+    }
+
+def benchmark_endpoints(repeat=10, roles=BENCHMARK_ROLES, cases=BENCHMARK_CASES):
+    targets = benchmark_targets()
+    results = {}
+    for case in cases:
+        for role in roles:
+            results[f'{case.key} {role}'] = measure_case(case, role, targets, repeat)
+    return results
+
+#dla każdego rozmiaru floty generuje dane, wykonuje pomiary i wycofuje transakcję, więc kolejne rozmiary
+#mierzone są na czystej bazie. Zwraca wyniki w postaci {rozmiar: {"METODA nazwa-adresu rola": metryki}}
+def run_benchmarks(sizes=(1000,), repeat=10, seed=0, roles=BENCHMARK_ROLES):
+    results = {}
+    with tempfile.TemporaryDirectory() as token_denylist_location, \
+            override_settings(CACHES=_benchmark_caches(token_denylist_location)):
+        for size in sizes:
+            with transaction.atomic():
+                seed_fleet(size, seed=seed)
+                results[size] = benchmark_endpoints(repeat, roles)
+                transaction.set_rollback(True)
+    return results
+
+#liczba zapytań nie może rosnąć razem z rozmiarem floty - wzrost oznacza problem N+1. Porównywane są tylko
+#przypadki zakończone tym samym kodem odpowiedzi
+def find_scaling_regressions(results):
+    regressions = []
+    sizes = sorted(results)
+    for smaller, larger in zip(sizes, sizes[1:]):
+        for key, metrics in results[larger].items():
+            small_metrics = results[smaller].get(key)
+            if small_metrics is None or small_metrics['status'] != metrics['status']:
+                continue
+            if metrics['queries'] > small_metrics['queries']:
+                regressions.append(f"{key}: {small_metrics['queries']} queries for {smaller} vehicles, "
+                                   f"{metrics['queries']} queries for {larger} vehicles")
+    return regressions
+
+#porównuje wyniki z zapisanym wzorcem: żadne żądanie nie może skończyć się błędem serwera, liczba zapytań nie może
+#wzrosnąć, a czas odpowiedzi i pamięć nie mogą przekroczyć wzorca o więcej niż podaną tolerancję. Kod odpowiedzi inny
+#niż we wzorcu też jest regresją (dane są generowane deterministycznie), a metryki takiego przypadku nie są porównywane.
+#Wzorzec bez czasów i pamięci (np. MechanicallyApp/benchmark_baseline.json) sprawdza tylko kody i liczbę zapytań
+def find_regressions(results, baseline, latency_tolerance=0.5, memory_tolerance=0.5):
+    regressions = []
+    for key, metrics in results.items():
+        expected = baseline.get(key)
+        if expected is None:
+            continue
+        if metrics['status'] >= 500:
+            regressions.append(f"{key}: status {metrics['status']}")
+            continue
+        if 'status' in expected and metrics['status'] != expected['status']:
+            regressions.append(f"{key}: status {metrics['status']}, baseline {expected['status']}")
+            continue
+        if 'queries' in expected and metrics['queries'] > expected['queries']:
+            regressions.append(f"{key}: {metrics['queries']} queries, baseline {expected['queries']}")
+        if 'p95_ms' in expected and metrics['p95_ms'] > expected['p95_ms'] * (1 + latency_tolerance):
+            regressions.append(f"{key}: p95 {metrics['p95_ms']} ms, baseline {expected['p95_ms']} ms")
+        if 'peak_kb' in expected and metrics['peak_kb'] > expected['peak_kb'] * (1 + memory_tolerance):
+            regressions.append(f"{key}: peak memory {metrics['peak_kb']} KB, baseline {expected['peak_kb']} KB")
+    return regressions
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as baseline_file:
+        return json.load(baseline_file)
+
+def write_baseline(path, results, fields=('status', 'queries', 'p95_ms', 'peak_kb')):
+    baseline = {key: {field: metrics[field] for field in fields} for key, metrics in sorted(results.items())}
+    with open(path, 'w', encoding='utf-8') as baseline_file:
+        json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+        baseline_file.write('\n')
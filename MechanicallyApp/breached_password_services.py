@@ -0,0 +1,119 @@
+import hashlib
+import heapq
+import mmap
+import os
+import tempfile
+
+#plik bazy wyciekniętych haseł to posortowane rosnąco, 20-bajtowe skróty SHA-1 (binarnie, bez separatorów), więc
+#i-ty rekord leży pod offsetem i*20, a sprawdzenie hasła to wyszukiwanie binarne (~30 odczytów przy miliardzie skrótów)
+RECORD_SIZE = 20
+_READ_BATCH = RECORD_SIZE*4096
+
+
+#plik mapowany jest w pamięci tylko do odczytu: strony ładowane są z cache systemu plików na żądanie i mogą
+#być przez system zwolnione, więc zużycie pamięci procesu nie zależy od rozmiaru pliku
+class BreachedPasswordDatabase:
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            stat = os.fstat(file.fileno())
+            if stat.st_size % RECORD_SIZE:
+                raise ValueError(f'{path} is not a breached password database (size is not a multiple of {RECORD_SIZE}).')
+            self.identity = (stat.st_dev, stat.st_ino, stat.st_mtime_ns)
+            self.count = stat.st_size // RECORD_SIZE
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if self.count else None
+
+    def __contains__(self, digest):
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            offset = middle*RECORD_SIZE
+            record = self._mmap[offset:offset + RECORD_SIZE]
+            if record < digest:
+                low = middle + 1
+            elif record > digest:
+                high = middle
+            else:
+                return True
+        return False
+
+_databases = {}
+
+#baza otwierana jest raz na proces; po przebudowie pliku (os.replace zmienia i-węzeł) otwierana jest ponownie, a stare
+#mapowanie zamykane jest dopiero przez odśmiecanie, gdy nie korzysta z niego żaden wątek
+def get_breached_password_database(path):
+    database = _databases.get(path)
+    stat = os.stat(path)
+    if database is None or database.identity != (stat.st_dev, stat.st_ino, stat.st_mtime_ns):
+        database = _databases[path] = BreachedPasswordDatabase(path)
+    return database
+
+def is_password_breached(password, path):
+    digest = hashlib.sha1(password.encode('utf-8'), usedforsecurity=False).digest()
+    return digest in get_breached_password_database(path)
+
+
+def _parse_hash_line(line, min_count):
+    hash_hex, _, count = line.strip().partition(':')
+    if len(hash_hex) != RECORD_SIZE*2:
+        return None
+    if count and int(count) < min_count:
+        return None
+    return bytes.fromhex(hash_hex)
+
+def _read_records(file):
+    while batch := file.read(_READ_BATCH):
+        for offset in range(0, len(batch), RECORD_SIZE):
+            yield batch[offset:offset + RECORD_SIZE]
+
+def _write_sorted_chunk(records, directory):
+    records.sort()
+    chunk = tempfile.TemporaryFile(dir=directory)
+    chunk.write(b''.join(records))
+    chunk.seek(0)
+    return chunk
+
+#buduje plik bazy z listy skrótów w formacie Pwned Passwords ("SHA1:liczba wystąpień" w wierszu). Wejście nie musi
+#być posortowane: skróty sortowane są w porcjach po chunk_size (ograniczona pamięć), a porcje scalane (heapq.merge)
+#z pominięciem duplikatów. Gotowy plik podmieniany jest atomowo, więc działające procesy czytają starą wersję do końca.
+#Zwraca (liczba zapisanych skrótów, liczba pominiętych wierszy)
+def build_breached_password_file(lines, output_path, min_count=1, chunk_size=5_000_000):
+    directory = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(directory, exist_ok=True)
+    chunks, records, skipped = [], [], 0
+    try:
+        for line in lines:
+            try:
+                digest = _parse_hash_line(line, min_count)
+            except ValueError:
+                digest = None
+            if digest is None:
+                if line.strip():
+                    skipped += 1
+                continue
+            records.append(digest)
+            if len(records) >= chunk_size:
+                chunks.append(_write_sorted_chunk(records, directory))
+                records = []
+        if records or not chunks:
+            chunks.append(_write_sorted_chunk(records, directory))
+
+        written, previous = 0, None
+        temporary_path = f'{output_path}.tmp'
+        with open(temporary_path, 'wb') as output:
+            buffer = []
+            for digest in heapq.merge(*(_read_records(chunk) for chunk in chunks)):
+                if digest == previous:
+                    continue
+                buffer.append(digest)
+                previous = digest
+                written += 1
+                if len(buffer) >= _READ_BATCH // RECORD_SIZE:
+                    output.write(b''.join(buffer))
+                    buffer = []
+            output.write(b''.join(buffer))
+        os.replace(temporary_path, output_path)
+    finally:
+        for chunk in chunks:
+            chunk.close()
+    return written, skipped
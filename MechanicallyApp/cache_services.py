@@ -0,0 +1,54 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+
+#przestrzenie nazw w cache dla rzadko zmieniających się danych słownikowych. Każda przestrzeń ma własny numer wersji,
+#który jest podbijany przy każdej zmianie modelu - stare wpisy przestają być odczytywane i wygasają same. Brakujący
+#(np. usunięty przez cache) numer wersji zaczyna od bieżącego czasu w nanosekundach, a nie od 1, więc nigdy nie
+#wraca do wartości sprzed podbicia i nie ożywia nieaktualnych wpisów
+def get_cache_version(namespace):
+    version_key = f'{namespace}:version'
+    initial = time.time_ns()
+    cache.add(version_key, initial, timeout=None)
+    return cache.get(version_key, initial)
+
+def bump_cache_version(namespace):
+    version_key = f'{namespace}:version'
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        cache.set(version_key, time.time_ns(), timeout=None)
+
+#locmem jest osobny w każdym procesie (zmiana w jednym procesie nie dociera do pozostałych), a dummy nie przechowuje niczego
+def is_shared_cache(backend):
+    return not isinstance(backend, (LocMemCache, DummyCache))
+
+def build_list_cache_key(namespace, request):
+    query = '&'.join(f'{key}={value}' for key, value in sorted(request.query_params.lists()))
+    digest = hashlib.sha256(f'{request.get_host()}?{query}'.encode()).hexdigest()
+    return f'{namespace}:v{get_cache_version(namespace)}:list:{digest}'
+
+
+#mixin dla widoków listujących dane słownikowe: odpowiedź zapisywana jest w cache jako gotowe bajty JSON,
+#więc trafienie w cache pomija zapytanie do bazy, serializację oraz renderowanie
+class CachedListMixin:
+    cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        cache_key = build_list_cache_key(self.cache_namespace, request)
+        cached = cache.get(cache_key)
+        if cached is None:
+            response = super().list(request, *args, **kwargs)
+            cached = (JSONRenderer().render(response.data), response.headers.get('Link'))
+            cache.set(cache_key, cached, timeout=getattr(settings, 'REFERENCE_DATA_CACHE_TIMEOUT', 3600))
+        content, link = cached
+        response = HttpResponse(content, content_type='application/json')
+        if link is not None:
+            response['Link'] = link
+        return response
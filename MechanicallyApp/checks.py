@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.checks import Error, register, Tags
+
+from .breached_password_services import get_breached_password_database
+
+BREACHED_PASSWORD_VALIDATOR = 'MechanicallyApp.validators.BreachedPasswordValidator'
+
+#bez pliku bazy walidator przepuszcza każde hasło (zapisując tylko ostrzeżenie w logu), więc przy wdrożeniu brak
+#lub uszkodzenie pliku zgłaszane jest jako błąd "manage.py check --deploy"
+@register(Tags.security, deploy=True)
+def check_breached_password_database(app_configs, **kwargs):
+    if not any(validator['NAME'] == BREACHED_PASSWORD_VALIDATOR for validator in settings.AUTH_PASSWORD_VALIDATORS):
+        return []
+    try:
+        get_breached_password_database(settings.BREACHED_PASSWORDS_PATH)
+    except (OSError, ValueError) as err:
+        return [Error(f'Breached password database is unavailable, so breached passwords are accepted: {err}',
+                      hint='Download the Pwned Passwords SHA-1 hash list and run "python manage.py build_breached_password_file '
+                           '<hash list>", or point BREACHED_PASSWORDS_PATH to an existing database.',
+                      id='MechanicallyApp.E001')]
+    return []
@@ -0,0 +1,31 @@
+from django.db.models import F
+from django.utils import timezone
+
+from .exceptions import ConflictError
+
+#QuerySet.update() nie obsługuje pól auto_now, więc ich wartości są uzupełniane ręcznie
+def _with_auto_now(model, changes):
+    for field in model._meta.concrete_fields:
+        if getattr(field, 'auto_now', False):
+            changes.setdefault(field.attname, timezone.now())
+    return changes
+
+#aktualizuje wskazane kolumny wszystkich wierszy querysetu jednym zapytaniem UPDATE, podbijając ich wersję.
+#Zwraca liczbę zaktualizowanych wierszy
+def update_queryset_versioned(queryset, **changes):
+    changes = _with_auto_now(queryset.model, changes)
+    return queryset.update(version=F('version') + 1, **changes)
+
+#optymistyczna kontrola współbieżności: zmiana zapisywana jest pojedynczym UPDATE ... WHERE id=X AND version=N,
+#więc jeśli w międzyczasie ktoś inny zmienił wiersz, nic nie zostanie zaktualizowane i zwracany jest błąd 409.
+#Dodatkowe warunki (np. oczekiwany status) można przekazać w predicates
+def update_versioned(instance, predicates=None, **changes):
+    model = type(instance)
+    changes = _with_auto_now(model, changes)
+    updated = model.objects.filter(pk=instance.pk, version=instance.version, **(predicates or {})).update(version=F('version') + 1, **changes)
+    if not updated:
+        raise ConflictError()
+    for name, value in changes.items():
+        setattr(instance, name, value)
+    instance.version += 1
+    return instance
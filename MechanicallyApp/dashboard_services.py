@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+def _increment(counts, key, value):
+    counts[key] = counts.get(key, 0) + value
+
+#liczba pojazdów per lokalizacja w podziale na dostępność, typ pojazdu oraz rodzaj paliwa - jedno zapytanie GROUP BY,
+#z którego w Pythonie składane są jedynie sumy częściowe (wierszy jest tyle, ile kombinacji wartości, a nie pojazdów)
+def vehicle_counts(queryset):
+    rows = (queryset.order_by()
+            .values('location_id', 'location__name', 'availability', 'vehicle_type', 'fuel_type')
+            .annotate(count=Count('id')))
+    locations = {}
+    total = 0
+    for row in rows:
+        location = locations.setdefault(row['location_id'], {
+            'location': row['location_id'], 'location_name': row['location__name'], 'total': 0,
+            'availability': {}, 'vehicle_type': {}, 'fuel_type': {}})
+        location['total'] += row['count']
+        for field in ('availability', 'vehicle_type', 'fuel_type'):
+            _increment(location[field], row[field], row['count'])
+        total += row['count']
+    return {'total': total, 'by_location': sorted(locations.values(), key=lambda location: location['location_name'] or '')}
+
+def failure_report_counts(queryset):
+    rows = queryset.order_by().values('workshop_id', 'workshop__name', 'status').annotate(count=Count('id'))
+    workshops = {}
+    total = 0
+    for row in rows:
+        workshop = workshops.setdefault(row['workshop_id'], {
+            'workshop': row['workshop_id'], 'workshop_name': row['workshop__name'], 'total': 0, 'status': {}})
+        workshop['total'] += row['count']
+        _increment(workshop['status'], row['status'], row['count'])
+        total += row['count']
+    return {'total': total, 'by_workshop': sorted(workshops.values(), key=lambda workshop: workshop['workshop_name'] or '')}
+
+def repair_report_counts(queryset):
+    status_counts = {row['status']: row['count'] for row in queryset.order_by().values('status').annotate(count=Count('id'))}
+    return {'total': sum(status_counts.values()), 'status': status_counts}
+
+#dane panelu floty: trzy zapytania agregujące zamiast pobierania pełnych list. Wynik trzymany jest w cache przez
+#DASHBOARD_CACHE_TIMEOUT sekund pod kluczem zależnym od zakresu danych widocznego dla użytkownika (0 wyłącza cache)
+def fleet_dashboard(cache_key, vehicles, failure_reports, repair_reports):
+    timeout = getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 30)
+    if timeout:
+        dashboard = cache.get(cache_key)
+        if dashboard is not None:
+            return dashboard
+    dashboard = {
+        'vehicles': vehicle_counts(vehicles),
+        'failure_reports': failure_report_counts(failure_reports),
+        'repair_reports': repair_report_counts(repair_reports),
+    }
+    if timeout:
+        cache.set(cache_key, dashboard, timeout=timeout)
+    return dashboard
@@ -0,0 +1,12 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+class ConflictError(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Resource has been modified by another request. Reload it and try again.'
+    default_code = 'conflict'
+
+class TokenAuthenticationUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Token authentication is not available.'
+    default_code = 'token_authentication_unavailable'
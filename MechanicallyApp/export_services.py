@@ -0,0 +1,51 @@
+import csv
+import json
+from datetime import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+
+FAILURE_REPORT_EXPORT_FIELDS = ('id', 'vehicle_id', 'vehicle__vin', 'title', 'description', 'workshop_id', 'report_date',
+                                'report_author_id', 'status', 'last_status_change_date', 'managed_by_id')
+REPAIR_REPORT_EXPORT_FIELDS = ('id', 'failure_report_id', 'failure_report__vehicle_id', 'failure_report__title',
+                               'condition_analysis', 'repair_action', 'cost', 'last_change_date', 'status')
+REPAIR_REPORT_REJECTION_EXPORT_FIELDS = ('id', 'repair_report_id', 'title', 'reason', 'rejection_date')
+
+#obiekt udający plik dla csv.writer - zamiast zapisywać wiersz, zwraca go jako tekst
+class _Echo:
+    def write(self, value):
+        return value
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+#pobiera wiersze paczkami po kluczu głównym (WHERE pk > ostatni_pk ORDER BY pk LIMIT n), więc pamięć zajmowana
+#przez eksport nie zależy od liczby wierszy, niezależnie od tego, czy sterownik bazy wspiera kursory po stronie serwera
+def iterate_rows(queryset, fields, chunk_size=2000):
+    queryset = queryset.order_by('pk').values_list(*fields)
+    pk_index = fields.index('id')
+    last_pk = None
+    while True:
+        chunk_queryset = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        rows = list(chunk_queryset[:chunk_size])
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        last_pk = rows[-1][pk_index]
+
+#generator kolejnych linii pliku eksportu w formacie CSV (z nagłówkiem) lub NDJSON
+def stream_export(queryset, fields, file_format, chunk_size=2000):
+    header = [field.replace('__', '_') for field in fields]
+    if file_format == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(header)
+        for row in iterate_rows(queryset, fields, chunk_size):
+            yield writer.writerow([_csv_value(value) for value in row])
+    else:
+        for row in iterate_rows(queryset, fields, chunk_size):
+            yield json.dumps(dict(zip(header, row)), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
@@ -1,5 +1,6 @@
 from django_filters import rest_framework as filters
-from .models import Location, Vehicle, User, FailureReport, RepairReport, RepairReportRejection, Manufacturer, City
+from .models import Location, Vehicle, User, FailureReport, RepairReport, RepairReportRejection, Manufacturer, City, \
+    RepairCostRollup
 
 
 class LocationFilter(filters.FilterSet):
@@ -30,6 +31,7 @@ class VehicleFilter(filters.FilterSet):
     class Meta:
         model = Vehicle
         fields = {
+            'vin': ['exact'],
             'vehicle_model': ['icontains'],
             'year': ['exact', 'lt', 'gt', 'range'],
             'fuel_type': ['exact'],
@@ -75,3 +77,13 @@ class RepairReportRejectionFilter(filters.FilterSet):
         fields={
             'title': ['icontains'],
         }
+
+class RepairCostRollupFilter(filters.FilterSet):
+    date_from=filters.DateFilter(field_name='day', lookup_expr='gte')
+    date_to=filters.DateFilter(field_name='day', lookup_expr='lte')
+    vehicle=filters.UUIDFilter(field_name='vehicle', lookup_expr='exact')
+    manufacturer=filters.UUIDFilter(field_name='manufacturer', lookup_expr='exact')
+    workshop=filters.UUIDFilter(field_name='workshop', lookup_expr='exact')
+    class Meta:
+        model = RepairCostRollup
+        fields = []
@@ -0,0 +1,157 @@
+import csv
+import json
+import uuid
+from itertools import islice
+
+from django.db import transaction, IntegrityError
+from rest_framework import serializers
+
+from .models import Vehicle, Manufacturer, Location
+from .validators import vin_validator, vehicle_model_validator, vehicle_year_validator
+
+VEHICLE_IMPORT_FORMATS = ('csv', 'ndjson')
+VEHICLE_IMPORT_REQUIRED_FIELDS = ('vin', 'manufacturer', 'vehicle_model', 'year', 'vehicle_type', 'fuel_type')
+
+#wczytuje kolejne wiersze pliku CSV (z nagłówkiem) lub NDJSON jako słowniki, bez ładowania całego pliku do pamięci
+def read_vehicle_rows(lines, file_format):
+    if file_format == 'csv':
+        yield from csv.DictReader(lines)
+    elif file_format == 'ndjson':
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                row = None
+            yield row if isinstance(row, dict) else None
+
+def _parse_uuid(value):
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+def _run_validator(errors, field, validator, value):
+    try:
+        validator(value)
+    except serializers.ValidationError as err:
+        errors[field] = [str(detail) for detail in err.detail]
+
+def _build_vehicle(row, manufacturer_ids, location_types, seen_vins, existing_vins):
+    errors = {}
+    for field in VEHICLE_IMPORT_REQUIRED_FIELDS:
+        if row.get(field) in (None, ''):
+            errors[field] = ['This field is required.']
+
+    vin = str(row.get('vin') or '')
+    if 'vin' not in errors:
+        _run_validator(errors, 'vin', vin_validator, vin)
+        if 'vin' not in errors and (vin in seen_vins or vin in existing_vins):
+            errors['vin'] = ['Vehicle with this vin already exists.']
+
+    vehicle_model = str(row.get('vehicle_model') or '')
+    if 'vehicle_model' not in errors:
+        _run_validator(errors, 'vehicle_model', vehicle_model_validator, vehicle_model)
+
+    year = None
+    if 'year' not in errors:
+        try:
+            year = int(row.get('year'))
+        except (TypeError, ValueError):
+            errors['year'] = ['A valid integer is required.']
+        else:
+            _run_validator(errors, 'year', vehicle_year_validator, year)
+
+    # noinspection PyUnresolvedReferences
+    choice_fields = (
+        ('vehicle_type', Vehicle.VehicleTypeChoices, 'Vehicle type'),
+        ('fuel_type', Vehicle.FuelTypeChoices, 'Fuel type'),
+        ('availability', Vehicle.AvailabilityChoices, 'Availability type'),
+    )
+    for field, choices, label in choice_fields:
+        value = row.get(field) or None
+        valid_values = [choice[0] for choice in choices.choices]
+        if field not in errors and value is not None and value not in valid_values:
+            errors[field] = ['%s must be one of the following: %s' % (label, ', '.join(valid_values))]
+
+    manufacturer_id = _parse_uuid(row.get('manufacturer'))
+    if 'manufacturer' not in errors and manufacturer_id not in manufacturer_ids:
+        errors['manufacturer'] = ['There is no manufacturer with provided ID.']
+
+    location_id = None
+    if row.get('location'):
+        location_id = _parse_uuid(row.get('location'))
+        if location_id not in location_types:
+            errors['location'] = ['There is no location with provided ID.']
+        elif location_types[location_id] != 'B':
+            errors['location'] = ['Vehicle can only be assigned to branch location.']
+
+    if errors:
+        return None, errors
+    return Vehicle(vin=vin, manufacturer_id=manufacturer_id, vehicle_model=vehicle_model, year=year,
+                   vehicle_type=row['vehicle_type'], fuel_type=row['fuel_type'],
+                   availability=row.get('availability') or 'A', location_id=location_id), None
+
+def _existing_vins(vins):
+    return set(Vehicle.objects.filter(vin__in=vins).values_list('vin', flat=True))
+
+#waliduje jedną paczkę wierszy: producenci, lokalizacje oraz istniejące numery VIN pobierane są jednym zapytaniem
+#na paczkę. Zwraca poprawne pojazdy z numerami wierszy oraz błędy pozostałych wierszy
+def _build_vehicle_chunk(numbered_rows, seen_vins):
+    rows = [row for _, row in numbered_rows if row is not None]
+    manufacturer_ids = {_parse_uuid(row.get('manufacturer')) for row in rows} - {None}
+    location_ids = {_parse_uuid(row.get('location')) for row in rows if row.get('location')} - {None}
+    vins = {str(row.get('vin')) for row in rows if row.get('vin')}
+    manufacturer_ids = set(Manufacturer.objects.filter(pk__in=manufacturer_ids).values_list('id', flat=True))
+    location_types = dict(Location.objects.filter(pk__in=location_ids).values_list('id', 'location_type'))
+    existing_vins = _existing_vins(vins)
+
+    vehicles, row_errors = [], []
+    for row_number, row in numbered_rows:
+        if row is None:
+            row_errors.append({'row': row_number, 'errors': {'detail': ['Row could not be parsed.']}})
+            continue
+        vehicle, errors = _build_vehicle(row, manufacturer_ids, location_types, seen_vins, existing_vins)
+        if errors:
+            row_errors.append({'row': row_number, 'errors': errors})
+        else:
+            vehicles.append((row_number, vehicle))
+            existing_vins.add(vehicle.vin)
+    return vehicles, row_errors
+
+#walidacja i bulk_create paczki wykonywane są w jednej transakcji. Jeśli równoległy zapis (np. pojazd z tym samym VIN
+#dodany w międzyczasie) naruszy więzy, paczka jest walidowana ponownie, a gdy i to się nie uda, jej poprawne wiersze
+#trafiają do raportu jako błędy. Wcześniejsze paczki pozostają zapisane i są policzone w created
+def _import_vehicle_chunk(numbered_rows, seen_vins, report, attempts=2):
+    for attempt in range(attempts):
+        try:
+            with transaction.atomic():
+                vehicles, row_errors = _build_vehicle_chunk(numbered_rows, seen_vins)
+                Vehicle.objects.bulk_create([vehicle for _, vehicle in vehicles])
+            break
+        except IntegrityError:
+            continue
+    else:
+        row_errors = sorted(row_errors + [{'row': row_number, 'errors': {'detail': ['Row could not be saved because of a concurrent change.']}}
+                                          for row_number, _ in vehicles], key=lambda row_error: row_error['row'])
+        vehicles = []
+
+    report['errors'].extend(row_errors)
+    seen_vins.update(vehicle.vin for _, vehicle in vehicles)
+    report['created'] += len(vehicles)
+
+#importuje pojazdy z iterowalnego źródła linii tekstu i zwraca raport z liczbą utworzonych pojazdów
+#oraz błędami walidacji dla każdego odrzuconego wiersza
+def import_vehicles(lines, file_format, chunk_size=1000):
+    if file_format not in VEHICLE_IMPORT_FORMATS:
+        raise serializers.ValidationError({'format': 'Only available formats are: %s.' % ', '.join(VEHICLE_IMPORT_FORMATS)})
+    report = {'created': 0, 'errors': []}
+    seen_vins = set()
+    numbered_rows = enumerate(read_vehicle_rows(lines, file_format), start=1)
+    while True:
+        chunk = list(islice(numbered_rows, chunk_size))
+        if not chunk:
+            return report
+        _import_vehicle_chunk(chunk, seen_vins, report)
@@ -0,0 +1,48 @@
+from django.db.models import FilteredRelation, Q
+
+OPEN_FAILURE_REPORT_STATUSES = ('P', 'A', 'S')
+
+VEHICLE_LOOKUP_FIELDS = ('id', 'vin', 'manufacturer_id', 'manufacturer__name', 'vehicle_model', 'year', 'vehicle_type',
+                         'fuel_type', 'availability', 'location_id')
+OPEN_FAILURE_REPORT_LOOKUP_FIELDS = ('open_failure_report__id', 'open_failure_report__title', 'open_failure_report__status',
+                                     'open_failure_report__report_date', 'open_failure_report__workshop_id',
+                                     'open_failure_report__workshop__name')
+
+def _vehicle_lookup_result(row):
+    open_failure_report = None
+    if row['open_failure_report__id'] is not None:
+        workshop = None
+        if row['open_failure_report__workshop_id'] is not None:
+            workshop = {'id': row['open_failure_report__workshop_id'], 'name': row['open_failure_report__workshop__name']}
+        open_failure_report = {
+            'id': row['open_failure_report__id'],
+            'title': row['open_failure_report__title'],
+            'status': row['open_failure_report__status'],
+            'report_date': row['open_failure_report__report_date'],
+            'workshop': workshop,
+        }
+    return {
+        'id': row['id'],
+        'vin': row['vin'],
+        'manufacturer': {'id': row['manufacturer_id'], 'name': row['manufacturer__name']},
+        'vehicle_model': row['vehicle_model'],
+        'year': row['year'],
+        'vehicle_type': row['vehicle_type'],
+        'fuel_type': row['fuel_type'],
+        'availability': row['availability'],
+        'location': row['location_id'],
+        'open_failure_report': open_failure_report,
+    }
+
+#pojazdy o podanych numerach VIN (wyszukiwanie po unikalnym indeksie) wraz z otwartym zgłoszeniem awarii i warsztatem,
+#pobrane jednym zapytaniem z LEFT JOIN do zgłoszeń w statusie P, A lub S. Zwraca słownik {vin: dane pojazdu}
+def lookup_vehicles_by_vin(queryset, vins):
+    rows = (queryset.filter(vin__in=vins)
+            .annotate(open_failure_report=FilteredRelation(
+                'failure_reports', condition=Q(failure_reports__status__in=OPEN_FAILURE_REPORT_STATUSES)))
+            .order_by('vin', '-open_failure_report__report_date')
+            .values(*VEHICLE_LOOKUP_FIELDS, *OPEN_FAILURE_REPORT_LOOKUP_FIELDS))
+    vehicles = {}
+    for row in rows:
+        vehicles.setdefault(row['vin'], _vehicle_lookup_result(row))
+    return vehicles
@@ -1,5 +1,85 @@
-from django.core.mail import send_mail
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
 from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import QueuedEmail
+
+#maile nie są wysyłane w trakcie obsługi żądania - trafiają do tabeli QueuedEmail, z której wysyła je komenda
+#send_queued_emails, korzystając z jednego połączenia SMTP dla całej paczki
+def queue_email(subject, message, recipient):
+    return QueuedEmail.objects.create(subject=subject, message=message, from_email=settings.EMAIL_HOST_USER, recipient=recipient)
+
+#nieudana próba: po przekroczeniu limitu prób mail otrzymuje status FAILED, a wcześniej kolejna próba odkładana jest
+#z wykładniczo rosnącym opóźnieniem
+def _record_failed_attempt(queued_email, error, max_attempts, retry_delay):
+    queued_email.attempts += 1
+    queued_email.last_error = str(error)[:1024]
+    if queued_email.attempts >= max_attempts:
+        queued_email.status = 'F'
+    else:
+        queued_email.next_attempt_date = timezone.now() + timedelta(seconds=retry_delay * 2 ** (queued_email.attempts - 1))
+    queued_email.save(update_fields=['attempts', 'status', 'last_error', 'next_attempt_date'])
+
+#paczka maili rezerwowana jest w krótkiej transakcji: blokada wierszy trwa tylko do przesunięcia next_attempt_date
+#o czas rezerwacji, więc inne procesy nie pobiorą tych maili, a wysyłka SMTP nie trzyma blokad w bazie. Jeśli proces
+#przerwie pracę przed zapisaniem wyniku, maile wracają do kolejki po upływie rezerwacji
+def _claim_queued_emails(batch_size, claim_timeout):
+    with transaction.atomic():
+        queued_emails = list(
+            QueuedEmail.objects.select_for_update(skip_locked=True)
+            .filter(status='P', next_attempt_date__lte=timezone.now())
+            .order_by('next_attempt_date')[:batch_size]
+        )
+        if queued_emails:
+            QueuedEmail.objects.filter(pk__in=[queued_email.pk for queued_email in queued_emails]) \
+                .update(next_attempt_date=timezone.now() + timedelta(seconds=claim_timeout))
+    return queued_emails
+
+#wysyła paczkę oczekujących maili jednym połączeniem SMTP; błąd połączenia zapisywany jest jako nieudana próba
+#każdego maila z paczki. Zwraca liczbę wysłanych maili
+def send_queued_emails(batch_size=None, connection=None):
+    batch_size = batch_size or getattr(settings, 'EMAIL_QUEUE_BATCH_SIZE', 100)
+    max_attempts = getattr(settings, 'EMAIL_QUEUE_MAX_ATTEMPTS', 5)
+    retry_delay = getattr(settings, 'EMAIL_QUEUE_RETRY_DELAY', 60)
+    queued_emails = _claim_queued_emails(batch_size, getattr(settings, 'EMAIL_QUEUE_CLAIM_TIMEOUT', 300))
+    if not queued_emails:
+        return 0
+    connection = connection or get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as err:
+        for queued_email in queued_emails:
+            _record_failed_attempt(queued_email, err, max_attempts, retry_delay)
+        return 0
+    sent_count = 0
+    try:
+        for queued_email in queued_emails:
+            email_message = EmailMessage(queued_email.subject, queued_email.message, queued_email.from_email,
+                                         [queued_email.recipient], connection=connection)
+            try:
+                email_message.send(fail_silently=False)
+            except Exception as err:
+                _record_failed_attempt(queued_email, err, max_attempts, retry_delay)
+                continue
+            queued_email.attempts += 1
+            queued_email.status = 'S'
+            queued_email.sent_date = timezone.now()
+            queued_email.message = ''
+            queued_email.save(update_fields=['attempts', 'status', 'sent_date', 'message'])
+            sent_count += 1
+    finally:
+        connection.close()
+    return sent_count
+
+#treść maili zawiera tokeny aktywacji konta i resetu hasła, więc wysłane maile tracą treść od razu, a stare wiersze
+#SENT i FAILED (nieudane maile zachowują treść do diagnostyki) usuwane są tą funkcją. Zwraca liczbę usuniętych maili
+def purge_queued_emails(older_than):
+    deleted, _ = QueuedEmail.objects.filter(status__in=['S', 'F'], created_date__lt=timezone.now() - older_than).delete()
+    return deleted
+
 #w mailu jest odnośnik do nieistniejącego frontendu, z poziomu którego wychodziłby request POST do API
 def send_activation_email(user, token):
     uuid = str(user.pk)
@@ -20,13 +100,7 @@ Aby aktywować konto i ustawić hasło, kliknij w link i wprowadź hasło:
 Jeśli nie próbowałeś aktywować konta – zignoruj tę wiadomość.
     """.strip()
 
-    send_mail(
-        subject,
-        message,
-        settings.EMAIL_HOST_USER,
-        [user.email],
-        fail_silently=False,
-    )
+    queue_email(subject, message, user.email)
 
 def send_reset_password_email(user, token):
     uuid = str(user.pk)
@@ -45,10 +119,4 @@ def send_reset_password_email(user, token):
     Jeśli nie próbowałeś aktywować konta – zignoruj tę wiadomość.
         """.strip()
 
-    send_mail(
-        subject,
-        message,
-        settings.EMAIL_HOST_USER,
-        [user.email],
-        fail_silently=False,
-    )
\ No newline at end of file
+    queue_email(subject, message, user.email)
\ No newline at end of file
@@ -0,0 +1,17 @@
+from datetime import date
+
+from django.core.management import BaseCommand
+
+from MechanicallyApp.analytics_services import backfill_repair_cost_rollups
+
+class Command(BaseCommand):
+    help = 'Rebuilds daily repair cost rollups from repair reports in HISTORIC status.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=date.fromisoformat, default=None,
+                            help='Only rebuild days from this date (YYYY-MM-DD) onwards. By default all days are rebuilt.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        created = backfill_repair_cost_rollups(since=options['since'], batch_size=options['batch_size'])
+        self.stdout.write(f'Created {created} repair cost rollups.')
@@ -0,0 +1,29 @@
+import sys
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from MechanicallyApp.breached_password_services import build_breached_password_file
+
+class Command(BaseCommand):
+    help = 'Builds the local breached password database from a Pwned Passwords SHA-1 hash list ("HASH:COUNT" lines).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='Path to the downloaded hash list or "-" for standard input.')
+        parser.add_argument('--output', default=None, help='Defaults to settings.BREACHED_PASSWORDS_PATH.')
+        parser.add_argument('--min-count', type=int, default=1,
+                            help='Skip hashes seen fewer times than this in breaches.')
+        parser.add_argument('--chunk-size', type=int, default=5_000_000,
+                            help='Number of hashes sorted in memory at once.')
+
+    def handle(self, *args, **options):
+        output = options['output'] or settings.BREACHED_PASSWORDS_PATH
+        try:
+            if options['source'] == '-':
+                written, skipped = build_breached_password_file(sys.stdin, output, options['min_count'], options['chunk_size'])
+            else:
+                with open(options['source'], encoding='utf-8-sig', errors='replace') as source:
+                    written, skipped = build_breached_password_file(source, output, options['min_count'], options['chunk_size'])
+        except OSError as err:
+            raise CommandError(str(err))
+        self.stdout.write(f'Wrote {written} hashes to {output}, skipped {skipped} lines.')
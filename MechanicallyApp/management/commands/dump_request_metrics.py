@@ -0,0 +1,31 @@
+import json
+
+from django.core.management import BaseCommand
+
+from MechanicallyApp.metrics_services import collect_request_metrics, reset_request_metrics, summarize_route
+
+class Command(BaseCommand):
+    help = ('Prints per-route request histograms collected by RequestProfilingMiddleware. Worker processes publish '
+            'their metrics to the default cache, so a shared cache backend is needed to see data from the web servers.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', action='store_true', help='Print raw histograms as JSON instead of a summary table.')
+        parser.add_argument('--sort', default='p95_ms', choices=('requests', 'avg_ms', 'p95_ms', 'max_ms', 'avg_queries'))
+        parser.add_argument('--reset', action='store_true', help='Clear published metrics after printing them.')
+
+    def handle(self, *args, **options):
+        metrics = collect_request_metrics()
+        if options['json']:
+            self.stdout.write(json.dumps(metrics, indent=2, sort_keys=True))
+        else:
+            summaries = {route: summarize_route(route_metrics) for route, route_metrics in metrics['routes'].items()}
+            self.stdout.write(f"Processes: {metrics['process_count']}")
+            self.stdout.write(f"{'route':<50} {'requests':>8} {'errors':>6} {'avg_ms':>9} {'p50_ms':>8} {'p95_ms':>8} "
+                              f"{'max_ms':>9} {'avg_sql_ms':>10} {'avg_queries':>11}")
+            for route, summary in sorted(summaries.items(), key=lambda item: item[1][options['sort']] or 0, reverse=True):
+                self.stdout.write(f"{route:<50} {summary['requests']:>8} {summary['errors']:>6} {summary['avg_ms']:>9} "
+                                  f"{summary['p50_ms']:>8} {summary['p95_ms']:>8} {summary['max_ms']:>9} "
+                                  f"{summary['avg_sql_ms']:>10} {summary['avg_queries']:>11}")
+        if options['reset']:
+            reset_request_metrics()
+            self.stdout.write('Metrics cleared.')
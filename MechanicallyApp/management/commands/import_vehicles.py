@@ -0,0 +1,28 @@
+import json
+
+from django.core.management import BaseCommand, CommandError
+from rest_framework import serializers
+
+from MechanicallyApp.import_services import import_vehicles, VEHICLE_IMPORT_FORMATS
+
+class Command(BaseCommand):
+    help = 'Imports vehicles from a CSV or NDJSON file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=VEHICLE_IMPORT_FORMATS, default=None)
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+        try:
+            with open(path, encoding='utf-8-sig', errors='replace', newline='') as file:
+                report = import_vehicles(file, file_format, chunk_size=options['chunk_size'])
+        except OSError as err:
+            raise CommandError(str(err))
+        except serializers.ValidationError as err:
+            raise CommandError(str(err.detail))
+        for row_error in report['errors']:
+            self.stderr.write(json.dumps(row_error, ensure_ascii=False))
+        self.stdout.write(f"Created {report['created']} vehicles, rejected {len(report['errors'])} rows.")
@@ -0,0 +1,13 @@
+from django.core.management import BaseCommand
+
+from MechanicallyApp.session_services import purge_expired_sessions
+
+class Command(BaseCommand):
+    help = 'Deletes expired sessions from the database in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_sessions(batch_size=options['batch_size'])
+        self.stdout.write(f'Deleted {deleted} expired sessions.')
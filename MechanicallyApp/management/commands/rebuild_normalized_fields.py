@@ -0,0 +1,13 @@
+from django.core.management import BaseCommand
+
+from MechanicallyApp.autocomplete_services import rebuild_normalized_fields
+
+class Command(BaseCommand):
+    help = 'Fills normalized shadow columns used by autocomplete for existing locations, users and vehicles.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        for model_name, count in rebuild_normalized_fields(batch_size=options['batch_size']).items():
+            self.stdout.write(f'{model_name}: {count}')
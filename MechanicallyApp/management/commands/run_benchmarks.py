@@ -0,0 +1,50 @@
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from MechanicallyApp.benchmark_services import run_benchmarks, find_regressions, find_scaling_regressions, \
+    load_baseline, write_baseline, BENCHMARK_ROLES, BENCHMARK_BASELINE_PATH
+
+class Command(BaseCommand):
+    help = ('Seeds synthetic fleets in a throwaway test database and measures query count, p50/p95 latency and peak '
+            'memory of every endpoint for every role. Fails when a result crosses the baseline thresholds.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000], help='Fleet sizes (number of vehicles) to benchmark.')
+        parser.add_argument('--repeat', type=int, default=10, help='Measured requests per endpoint and role.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--roles', nargs='+', default=list(BENCHMARK_ROLES), choices=BENCHMARK_ROLES)
+        parser.add_argument('--baseline', default=BENCHMARK_BASELINE_PATH, help='Baseline JSON file with thresholds.')
+        parser.add_argument('--write-baseline', default=None, help='Write results of the largest fleet to this file.')
+        parser.add_argument('--latency-tolerance', type=float, default=0.5, help='Allowed relative p95 latency increase.')
+        parser.add_argument('--memory-tolerance', type=float, default=0.5, help='Allowed relative peak memory increase.')
+        parser.add_argument('--keepdb', action='store_true', help='Keep the test database between runs.')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_database_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            results = run_benchmarks(sizes=options['sizes'], repeat=options['repeat'], seed=options['seed'], roles=options['roles'])
+        finally:
+            connection.creation.destroy_test_db(old_database_name, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        for size, size_results in sorted(results.items()):
+            self.stdout.write(f'\n{size} vehicles')
+            self.stdout.write(f"{'endpoint':<60}{'status':>8}{'queries':>9}{'p50 ms':>10}{'p95 ms':>10}{'peak KB':>10}")
+            for key, metrics in size_results.items():
+                self.stdout.write(f"{key:<60}{metrics['status']:>8}{metrics['queries']:>9}{metrics['p50_ms']:>10}"
+                                  f"{metrics['p95_ms']:>10}{metrics['peak_kb']:>10}")
+
+        largest_results = results[max(results)]
+        if options['write_baseline']:
+            write_baseline(options['write_baseline'], largest_results)
+            self.stdout.write(f"Baseline written to {options['write_baseline']}.")
+
+        regressions = find_scaling_regressions(results)
+        if options['baseline']:
+            regressions += find_regressions(largest_results, load_baseline(options['baseline']),
+                                            options['latency_tolerance'], options['memory_tolerance'])
+        if regressions:
+            raise CommandError('Benchmark regressions:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('No benchmark regressions.'))
@@ -0,0 +1,51 @@
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from MechanicallyApp.seed_services import seed_fleet, seeded_fleet_exists, clear_seeded_fleet, SEED_PASSWORD
+
+class Command(BaseCommand):
+    help = ('Generates a deterministic synthetic fleet (locations, users of every role, vehicles and their failure, '
+            'repair and rejection histories) for local load testing.')
+
+    size_options = (
+        ('cities', 'cities'),
+        ('branches', 'branches'),
+        ('workshops', 'workshops'),
+        ('standard_users', 'standard'),
+        ('mechanics', 'mechanic'),
+        ('managers', 'manager'),
+        ('admins', 'admin'),
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vehicles', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; the same seed always produces the same data.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Number of vehicles generated and inserted per batch.')
+        parser.add_argument('--password', default=SEED_PASSWORD, help='Password set for every generated user.')
+        parser.add_argument('--clear', action='store_true', help='Remove previously generated data before seeding.')
+        parser.add_argument('--force', action='store_true', help='Allow --clear when DEBUG is off.')
+        for option, _ in self.size_options:
+            parser.add_argument(f"--{option.replace('_', '-')}", type=int, default=None,
+                                help=f"Override the number of {option.replace('_', ' ')} derived from --vehicles.")
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            if not settings.DEBUG and not options['force']:
+                raise CommandError('--clear deletes every vehicle whose VIN starts with SFL, with its reports, and is only '
+                                   'allowed with DEBUG on. Pass --force to clear anyway.')
+            clear_seeded_fleet()
+        elif seeded_fleet_exists():
+            raise CommandError('Generated data already exists. Use --clear to replace it.')
+
+        sizes = {size_key: options[option] for option, size_key in self.size_options if options[option] is not None}
+        if any(value < 1 for value in sizes.values()) or options['vehicles'] < 0 or options['batch_size'] < 1:
+            raise CommandError('Sizes and batch size must be positive numbers.')
+
+        start = time.perf_counter()
+        counts = seed_fleet(vehicles=options['vehicles'], seed=options['seed'], batch_size=options['batch_size'],
+                            password=options['password'], sizes=sizes)
+        for name, count in counts.items():
+            self.stdout.write(f"{name.replace('_', ' ')}: {count}")
+        self.stdout.write(self.style.SUCCESS(f'Fleet generated in {time.perf_counter() - start:.1f}s.'))
@@ -0,0 +1,29 @@
+import time
+from datetime import timedelta
+
+from django.core.management import BaseCommand
+
+from MechanicallyApp.mail_services import send_queued_emails, purge_queued_emails
+
+class Command(BaseCommand):
+    help = 'Sends queued emails in batches over a single SMTP connection.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--loop', action='store_true', help='Keep polling the queue instead of exiting when it is empty.')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to wait between polls when the queue is empty.')
+        parser.add_argument('--purge-older-than', type=int, default=None, metavar='DAYS',
+                            help='Delete sent and failed emails queued more than DAYS days ago.')
+
+    def handle(self, *args, **options):
+        if options['purge_older_than'] is not None:
+            deleted = purge_queued_emails(timedelta(days=options['purge_older_than']))
+            self.stdout.write(f'Deleted {deleted} sent and failed emails.')
+        while True:
+            sent_count = send_queued_emails(batch_size=options['batch_size'])
+            while sent_count:
+                self.stdout.write(f'Sent {sent_count} emails.')
+                sent_count = send_queued_emails(batch_size=options['batch_size'])
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,159 @@
+import os
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+#górne granice przedziałów histogramów czasu (w milisekundach) oraz liczby zapytań SQL na żądanie
+DURATION_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+REQUEST_METRICS_SLOT_COUNT_KEY = 'request_metrics:slots'
+REQUEST_METRICS_TIMEOUT = 60*60*24
+
+def _empty_histogram(buckets):
+    return {'count': 0, 'sum': 0, 'max': 0, 'buckets': [0]*(len(buckets)+1)}
+
+def _observe(histogram, buckets, value):
+    histogram['count'] += 1
+    histogram['sum'] += value
+    histogram['max'] = max(histogram['max'], value)
+    for index, upper_bound in enumerate(buckets):
+        if value <= upper_bound:
+            histogram['buckets'][index] += 1
+            return
+    histogram['buckets'][-1] += 1
+
+def _merge_histogram(target, source):
+    target['count'] += source['count']
+    target['sum'] += source['sum']
+    target['max'] = max(target['max'], source['max'])
+    target['buckets'] = [a + b for a, b in zip(target['buckets'], source['buckets'])]
+
+#szacuje percentyl jako górną granicę przedziału, w którym się mieści (dla ostatniego przedziału - maksimum)
+def histogram_percentile(histogram, buckets, percentile):
+    if not histogram['count']:
+        return None
+    rank = histogram['count']*percentile/100
+    seen = 0
+    for index, bucket_count in enumerate(histogram['buckets']):
+        seen += bucket_count
+        if seen >= rank:
+            return buckets[index] if index < len(buckets) else histogram['max']
+    return histogram['max']
+
+def _empty_route():
+    return {
+        'requests': 0,
+        'errors': 0,
+        'total_ms': _empty_histogram(DURATION_BUCKETS_MS),
+        'sql_ms': _empty_histogram(DURATION_BUCKETS_MS),
+        'queries': _empty_histogram(QUERY_COUNT_BUCKETS),
+    }
+
+def merge_routes(target, source):
+    for route, metrics in source.items():
+        merged = target.setdefault(route, _empty_route())
+        merged['requests'] += metrics['requests']
+        merged['errors'] += metrics['errors']
+        for name in ('total_ms', 'sql_ms', 'queries'):
+            _merge_histogram(merged[name], metrics[name])
+    return target
+
+def _slot_key(slot):
+    return f'request_metrics:slot:{slot}'
+
+#numer slotu przydzielany jest atomowym incr (redis/memcached), więc równolegle startujące procesy nie nadpisują
+#sobie wpisów w indeksie, jak przy odczycie i zapisie wspólnej listy kluczy
+def _allocate_slot():
+    try:
+        return cache.incr(REQUEST_METRICS_SLOT_COUNT_KEY)
+    except ValueError:
+        cache.add(REQUEST_METRICS_SLOT_COUNT_KEY, 0, timeout=None)
+        return cache.incr(REQUEST_METRICS_SLOT_COUNT_KEY)
+
+
+#histogramy zbierane w pamięci procesu, per trasa (metoda + nazwa adresu). Każdy proces co
+#REQUEST_PROFILING_FLUSH_INTERVAL sekund publikuje swoją migawkę w cache, dzięki czemu komenda dump_request_metrics
+#i endpoint dla administratora widzą dane ze wszystkich procesów (przy współdzielonym cache, np. redis/memcached).
+#Proces rejestruje się w indeksie (własny slot z kluczem swojej migawki) dopiero przy pierwszej niepustej migawce
+class RequestMetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+        self._last_publish = time.monotonic()
+        self._slot = None
+        self.process_key = f'request_metrics:process:{socket.gethostname()}:{os.getpid()}'
+
+    def record(self, route, status_code, total_ms, sql_ms, query_count):
+        with self._lock:
+            metrics = self._routes.setdefault(route, _empty_route())
+            metrics['requests'] += 1
+            if status_code >= 500:
+                metrics['errors'] += 1
+            _observe(metrics['total_ms'], DURATION_BUCKETS_MS, total_ms)
+            _observe(metrics['sql_ms'], DURATION_BUCKETS_MS, sql_ms)
+            _observe(metrics['queries'], QUERY_COUNT_BUCKETS, query_count)
+            publish_due = time.monotonic() - self._last_publish >= getattr(settings, 'REQUEST_PROFILING_FLUSH_INTERVAL', 30)
+        if publish_due:
+            self.publish()
+
+    def snapshot(self):
+        with self._lock:
+            return merge_routes({}, self._routes)
+
+    def reset(self):
+        with self._lock:
+            self._routes = {}
+            self._slot = None
+
+    #slot jest przydzielany ponownie, jeśli jego wpis wygasł lub został usunięty (reset_request_metrics)
+    def publish(self):
+        snapshot = self.snapshot()
+        with self._lock:
+            self._last_publish = time.monotonic()
+            slot = self._slot
+        if slot is None or cache.get(_slot_key(slot)) != self.process_key:
+            if not snapshot:
+                return
+            slot = _allocate_slot()
+            with self._lock:
+                self._slot = slot
+        cache.set_many({self.process_key: snapshot, _slot_key(slot): self.process_key}, timeout=REQUEST_METRICS_TIMEOUT)
+
+request_metrics = RequestMetricsRegistry()
+
+def _published_process_keys():
+    slot_count = cache.get(REQUEST_METRICS_SLOT_COUNT_KEY, 0)
+    return list(cache.get_many([_slot_key(slot) for slot in range(1, slot_count + 1)]).values())
+
+#łączy migawki opublikowane przez wszystkie procesy (bez publikowania migawki procesu wywołującego, np. komendy);
+#process_count to liczba procesów, których dane wciąż są w cache
+def collect_request_metrics():
+    snapshots = cache.get_many(_published_process_keys())
+    routes = {}
+    for snapshot in snapshots.values():
+        merge_routes(routes, snapshot)
+    return {'process_count': len(snapshots), 'routes': routes}
+
+def reset_request_metrics():
+    slot_count = cache.get(REQUEST_METRICS_SLOT_COUNT_KEY, 0)
+    cache.delete_many(_published_process_keys() + [_slot_key(slot) for slot in range(1, slot_count + 1)]
+                      + [REQUEST_METRICS_SLOT_COUNT_KEY])
+    request_metrics.reset()
+
+#zwięzłe podsumowanie trasy: liczba żądań, średnie oraz szacowane p50/p95 czasu i liczby zapytań
+def summarize_route(metrics):
+    requests = metrics['requests'] or 1
+    return {
+        'requests': metrics['requests'],
+        'errors': metrics['errors'],
+        'avg_ms': round(metrics['total_ms']['sum']/requests, 2),
+        'p50_ms': histogram_percentile(metrics['total_ms'], DURATION_BUCKETS_MS, 50),
+        'p95_ms': histogram_percentile(metrics['total_ms'], DURATION_BUCKETS_MS, 95),
+        'max_ms': round(metrics['total_ms']['max'], 2),
+        'avg_sql_ms': round(metrics['sql_ms']['sum']/requests, 2),
+        'avg_queries': round(metrics['queries']['sum']/requests, 2),
+        'max_queries': metrics['queries']['max'],
+    }
@@ -0,0 +1,85 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .metrics_services import request_metrics
+
+logger = logging.getLogger('MechanicallyApp.requests')
+
+#stan pomiaru pojedynczego żądania; execute_wrapper zlicza zapytania i czas SQL na wszystkich połączeniach
+class _RequestProfile:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.view_start = None
+        self.view_end = None
+        self.render_end = None
+        self.query_count = 0
+        self.sql_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_seconds += time.perf_counter() - start
+            self.query_count += 1
+
+    def timings(self):
+        end = time.perf_counter()
+        view_end = self.view_end or end
+        timings = {'db': self.sql_seconds*1000, 'total': (end - self.start)*1000}
+        if self.view_start is not None:
+            timings['view'] = (view_end - self.view_start)*1000
+        if self.view_end is not None and self.render_end is not None:
+            timings['serialize'] = (self.render_end - self.view_end)*1000
+        return timings
+
+
+#middleware włączane ustawieniem REQUEST_PROFILING_ENABLED. Dla każdego żądania mierzy liczbę i czas zapytań SQL,
+#czas widoku oraz czas serializacji (renderowania odpowiedzi), dodaje nagłówek Server-Timing, loguje żądania
+#wolniejsze niż REQUEST_PROFILING_SLOW_THRESHOLD_MS i zapisuje pomiary w histogramach per trasa
+class RequestProfilingMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profile = _RequestProfile()
+        request._request_profile = profile
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(profile))
+            response = self.get_response(request)
+        timings = profile.timings()
+        response['Server-Timing'] = ', '.join(
+            [f'db;dur={timings["db"]:.2f};desc="{profile.query_count} queries"'] +
+            [f'{name};dur={timings[name]:.2f}' for name in ('view', 'serialize', 'total') if name in timings])
+
+        resolver_match = getattr(request, 'resolver_match', None)
+        route = f'{request.method} {resolver_match.view_name if resolver_match else "<unresolved>"}'
+        request_metrics.record(route, response.status_code, timings['total'], timings['db'], profile.query_count)
+        if timings['total'] >= getattr(settings, 'REQUEST_PROFILING_SLOW_THRESHOLD_MS', 500):
+            logger.warning('slow_request %s', json.dumps({
+                'route': route,
+                'path': request.path,
+                'status': response.status_code,
+                'user': str(request.user.pk) if getattr(request, 'user', None) and request.user.is_authenticated else None,
+                'queries': profile.query_count,
+                **{f'{name}_ms': round(value, 2) for name, value in timings.items()},
+            }))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._request_profile.view_start = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        profile = request._request_profile
+        profile.view_end = time.perf_counter()
+        response.add_post_render_callback(lambda rendered: setattr(profile, 'render_end', time.perf_counter()))
+        return response
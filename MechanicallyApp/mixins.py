@@ -0,0 +1,90 @@
+import hashlib
+
+from django.db.models import Max, Count
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from .autocomplete_services import autocomplete
+from .serializers import AutocompleteQuerySerializer, BatchRetrieveQuerySerializer
+
+#serializery deklarują atrybuty select_related_fields oraz prefetch_related_fields ze ścieżkami relacji,
+#które odczytują podczas serializacji. Poniższe narzędzia dołączają je do querysetu, dzięki czemu lista N obiektów
+#kosztuje stałą liczbę zapytań zamiast 1+N
+def apply_eager_loading(queryset, serializer_class):
+    select_related_fields = getattr(serializer_class, 'select_related_fields', ())
+    prefetch_related_fields = getattr(serializer_class, 'prefetch_related_fields', ())
+    if select_related_fields:
+        queryset = queryset.select_related(*select_related_fields)
+    if prefetch_related_fields:
+        queryset = queryset.prefetch_related(*prefetch_related_fields)
+    return queryset
+
+
+class EagerLoadingMixin:
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        return apply_eager_loading(queryset, self.get_serializer_class())
+
+
+#obsługa warunkowego GET: ETag oraz Last-Modified wyliczane są jednym zapytaniem agregującym (najpóźniejsze daty zmiany
+#oraz liczba wierszy w querysecie widoku). Widoki zagnieżdżające dane powiązanych obiektów (pojazd, producent, warsztat)
+#podają ich daty zmiany w related_last_modified_fields, więc edycja powiązanego obiektu również zmienia ETag.
+#Jeśli klient ma aktualną wersję, zwracane jest 304 bez serializacji i treści
+class ConditionalGetMixin:
+    last_modified_field = None
+    related_last_modified_fields = ()
+
+    def get_conditional_state(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        if lookup_url_kwarg in self.kwargs:
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        fields = (self.last_modified_field, *self.related_last_modified_fields)
+        state = queryset.aggregate(count=Count('pk'), **{f'last_modified_{index}': Max(field) for index, field in enumerate(fields)})
+        markers = [state[f'last_modified_{index}'] for index in range(len(fields))]
+        fingerprint = f"{self.request.user.pk}:{self.request.get_full_path()}:{':'.join(map(str, markers))}:{state['count']}"
+        etag = '"%s"' % hashlib.md5(fingerprint.encode(), usedforsecurity=False).hexdigest()
+        return etag, max((marker for marker in markers if marker is not None), default=None)
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_conditional_state()
+        last_modified_timestamp = int(last_modified.timestamp()) if last_modified is not None else None
+        not_modified_response = get_conditional_response(request, etag=etag, last_modified=last_modified_timestamp)
+        if not_modified_response is not None:
+            return not_modified_response
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+            if last_modified_timestamp is not None:
+                response['Last-Modified'] = http_date(last_modified_timestamp)
+        return response
+
+
+#tryb autocomplete dla widoków list: pierwsze limit obiektów, których kolumny-cienie autocomplete_fields zaczynają się
+#od zapytania q, bez paginacji. Zakres danych (get_queryset) i pozostałe filtry są takie same jak w widoku listy
+class AutocompleteMixin:
+    autocomplete_fields = ()
+    http_method_names = ['head', 'get']
+
+    def list(self, request, *args, **kwargs):
+        query_serializer = AutocompleteQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        queryset = autocomplete(self.filter_queryset(self.get_queryset()), self.autocomplete_fields,
+                                query_serializer.validated_data['q'], query_serializer.validated_data['limit'])
+        return Response(self.get_serializer(queryset, many=True).data)
+
+
+#pobieranie wielu obiektów naraz (?ids=uuid1,uuid2) dla widoków szczegółów: jedno zapytanie id__in na querysecie
+#widoku (ten sam zakres danych co w get_object), wyniki w kolejności podanych identyfikatorów, a niewidoczne
+#lub nieistniejące identyfikatory zwracane są w not_found
+class BatchRetrieveMixin:
+    http_method_names = ['head', 'get']
+
+    def get(self, request, *args, **kwargs):
+        query_serializer = BatchRetrieveQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        ids = query_serializer.validated_data['ids']
+        objects = {obj.pk: obj for obj in self.filter_queryset(self.get_queryset()).filter(id__in=ids)}
+        return Response({'results': [self.get_serializer(objects[pk]).data for pk in ids if pk in objects],
+                         'not_found': [pk for pk in ids if pk not in objects]})
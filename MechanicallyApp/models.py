@@ -1,8 +1,46 @@
 from django.core.validators import MinLengthValidator
 from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
+from django.utils import timezone
 import uuid
-class User(AbstractUser):
+
+from .normalization import normalize_text
+
+#kolumny-cienie: znormalizowane (małe litery, bez polskich znaków) kopie pól tekstowych, po których działa indeksowane
+#wyszukiwanie prefiksowe (autocomplete). Model deklaruje mapowanie normalized_fields {pole: kolumna-cień}, a kolumny
+#wypełniane są przy save() oraz w bulk_create/bulk_update querysetu, więc import i generator danych nie muszą o nich pamiętać
+class NormalizedFieldsMixin:
+    normalized_fields = {}
+
+    def fill_normalized_fields(self):
+        for field, normalized_field in self.normalized_fields.items():
+            setattr(self, normalized_field, normalize_text(getattr(self, field) or ''))
+
+    def save(self, *args, **kwargs):
+        self.fill_normalized_fields()
+        if kwargs.get('update_fields') is not None:
+            update_fields = set(kwargs['update_fields'])
+            kwargs['update_fields'] = update_fields | {normalized_field for field, normalized_field in self.normalized_fields.items() if field in update_fields}
+        super().save(*args, **kwargs)
+
+class NormalizedFieldsQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.fill_normalized_fields()
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.fill_normalized_fields()
+        fields = list(fields) + [normalized_field for field, normalized_field in self.model.normalized_fields.items() if field in fields]
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+class NormalizedUserManager(UserManager.from_queryset(NormalizedFieldsQuerySet)):
+    pass
+
+class User(NormalizedFieldsMixin, AbstractUser):
     ROLE_CHOICES=(
         ('standard','standard'),
         ('mechanic','mechanic'),
@@ -22,15 +60,35 @@ class User(AbstractUser):
     first_name = models.CharField(max_length=20,validators=[MinLengthValidator(3)])
     last_name = models.CharField(max_length=30,validators=[MinLengthValidator(3)])
     phone_number=models.CharField(max_length=9, unique=True, validators=[MinLengthValidator(9)])
+    first_name_normalized=models.CharField(max_length=20, editable=False, default='')
+    last_name_normalized=models.CharField(max_length=30, editable=False, default='')
+    email_normalized=models.CharField(max_length=254, editable=False, default='')
     REQUIRED_FIELDS = ['email','first_name','last_name']
+    normalized_fields = {'first_name': 'first_name_normalized', 'last_name': 'last_name_normalized', 'email': 'email_normalized'}
+    objects = NormalizedUserManager()
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['first_name_normalized'], name='user_first_name_norm_idx'),
+            models.Index(fields=['last_name_normalized'], name='user_last_name_norm_idx'),
+            models.Index(fields=['email_normalized'], name='user_email_norm_idx'),
+        ]
+
     def __str__(self):
         return self.first_name + " " + self.last_name
 
+    #użytkownik odtworzony z migawki w cache (auth_services) ma skrót sesji wyliczony wcześniej, więc weryfikacja sesji
+    #nie wczytuje hasła z bazy. Po set_password skrót liczony jest ponownie z nowego hasła
+    def get_session_auth_hash(self):
+        if 'password' not in self.__dict__ and hasattr(self, '_session_auth_hash'):
+            return self._session_auth_hash
+        return super().get_session_auth_hash()
+
 class City(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=100)
 
-class Location(models.Model):
+class Location(NormalizedFieldsMixin, models.Model):
     class LocationTypeChoices(models.TextChoices):
         BRANCH='B'
         WORKSHOP='W'
@@ -44,11 +102,21 @@ class Location(models.Model):
     city=models.ForeignKey(City,on_delete=models.CASCADE)
     # noinspection PyUnresolvedReferences
     location_type=models.CharField(max_length=1,choices=LocationTypeChoices.choices)
+    name_normalized=models.CharField(max_length=100, editable=False, default='')
+    last_change_date=models.DateTimeField(auto_now=True)
+    normalized_fields = {'name': 'name_normalized'}
+    objects = NormalizedFieldsQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['location_type', 'name'], name='location_type_name_idx'),
+            models.Index(fields=['name_normalized'], name='location_name_norm_idx'),
+        ]
 
 
 
 
-class Vehicle(models.Model):
+class Vehicle(NormalizedFieldsMixin, models.Model):
 
     class VehicleTypeChoices(models.TextChoices):
         #samochód osobowy
@@ -95,11 +163,22 @@ class Vehicle(models.Model):
     # noinspection PyUnresolvedReferences
     availability=models.CharField(max_length=1, choices=AvailabilityChoices.choices, default=AvailabilityChoices.AVAILABLE)
     location=models.ForeignKey('Location',on_delete=models.SET_NULL, related_name='vehicles', null=True, blank=True)
+    vehicle_model_normalized=models.CharField(max_length=20, editable=False, default='')
+    last_change_date=models.DateTimeField(auto_now=True)
+    normalized_fields = {'vehicle_model': 'vehicle_model_normalized'}
+    objects = NormalizedFieldsQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['location', 'availability'], name='vehicle_location_avail_idx'),
+            models.Index(fields=['vehicle_model_normalized'], name='vehicle_model_norm_idx'),
+        ]
 
 
 class Manufacturer(models.Model):
     id=models.UUIDField(primary_key=True,default=uuid.uuid4,editable=False)
     name=models.CharField(max_length=20,unique=True, validators=[MinLengthValidator(3)])
+    last_change_date=models.DateTimeField(auto_now=True)
     def __str__(self):
         return self.name
 
@@ -129,6 +208,16 @@ class FailureReport(models.Model):
     status=models.CharField(max_length=1,choices=FailureStatusChoices.choices,default=FailureStatusChoices.PENDING)
     last_status_change_date=models.DateTimeField(auto_now=True)
     managed_by=models.ForeignKey('User',on_delete=models.SET_NULL,related_name='managed_failure_reports',null=True, blank=True)
+    version=models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            #indeks pokrywający dla sprawdzenia, czy pojazd ma otwarte zgłoszenie awarii (status P, A lub S)
+            models.Index(fields=['vehicle', 'status'], name='failure_vehicle_status_idx'),
+            models.Index(fields=['workshop', 'status'], name='failure_workshop_status_idx'),
+            models.Index(fields=['managed_by', 'status'], name='failure_manager_status_idx'),
+            models.Index(fields=['report_date', 'id'], name='failure_report_date_idx'),
+        ]
 
 class RepairReport(models.Model):
     class RepairStatusChoices(models.TextChoices):
@@ -140,9 +229,18 @@ class RepairReport(models.Model):
     condition_analysis=models.CharField(max_length=1024)
     repair_action=models.TextField(max_length=1024)
     cost=models.DecimalField(max_digits=8,decimal_places=2)
+    created_date=models.DateTimeField(auto_now_add=True)
     last_change_date=models.DateTimeField(auto_now=True)
     # noinspection PyUnresolvedReferences
     status=models.CharField(max_length=1,choices=RepairStatusChoices.choices,default=RepairStatusChoices.ACTIVE)
+    version=models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status'], name='repair_status_idx'),
+            models.Index(fields=['created_date', 'id'], name='repair_created_idx'),
+            models.Index(fields=['last_change_date', 'id'], name='repair_last_change_idx'),
+        ]
 
 class RepairReportRejection(models.Model):
     id=models.UUIDField(primary_key=True,default=uuid.uuid4,editable=False)
@@ -150,3 +248,56 @@ class RepairReportRejection(models.Model):
     rejection_date=models.DateTimeField(auto_now_add=True)
     title=models.CharField(max_length=100)
     reason=models.CharField(max_length=1024)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['rejection_date', 'id'], name='rejection_date_idx'),
+        ]
+
+#dzienne sumy kosztów zakończonych napraw (repair report w statusie HISTORIC) per pojazd, warsztat i menadżer
+#prowadzący zgłoszenie (menadżer widzi tylko koszty zgłoszeń, którymi zarządza). Wiersze są
+#aktualizowane przyrostowo przy zamknięciu zgłoszenia oraz odtwarzane komendą backfill_repair_cost_rollups, dzięki
+#czemu raporty kosztów czytają wstępnie zagregowane wiersze zamiast łączyć RepairReport z FailureReport i Vehicle
+#rollup_key (dzień, pojazd, warsztat, menadżer; brak warsztatu lub menadżera jako pusty fragment) jest kluczem unikalnym,
+#bo kolumny workshop i managed_by mogą być NULL, a wartości NULL nie naruszają unikalności na MySQL
+class RepairCostRollup(models.Model):
+    id=models.UUIDField(primary_key=True,default=uuid.uuid4,editable=False)
+    rollup_key=models.CharField(max_length=128, unique=True)
+    day=models.DateField()
+    vehicle=models.ForeignKey('Vehicle',on_delete=models.CASCADE, related_name='repair_cost_rollups')
+    manufacturer=models.ForeignKey('Manufacturer',on_delete=models.CASCADE, related_name='repair_cost_rollups')
+    workshop=models.ForeignKey('Location',on_delete=models.SET_NULL, null=True, blank=True, related_name='repair_cost_rollups')
+    managed_by=models.ForeignKey('User',on_delete=models.SET_NULL, null=True, blank=True, related_name='repair_cost_rollups')
+    repair_count=models.PositiveIntegerField(default=0)
+    total_cost=models.DecimalField(max_digits=14,decimal_places=2,default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['vehicle', 'day'], name='repair_cost_vehicle_idx'),
+            models.Index(fields=['manufacturer', 'day'], name='repair_cost_manufacturer_idx'),
+            models.Index(fields=['workshop', 'day'], name='repair_cost_workshop_idx'),
+            models.Index(fields=['managed_by', 'day'], name='repair_cost_manager_idx'),
+        ]
+
+class QueuedEmail(models.Model):
+    class EmailStatusChoices(models.TextChoices):
+        PENDING='P'
+        SENT='S'
+        FAILED='F'
+    id=models.UUIDField(primary_key=True,default=uuid.uuid4,editable=False)
+    subject=models.CharField(max_length=255)
+    message=models.TextField()
+    from_email=models.CharField(max_length=254)
+    recipient=models.EmailField()
+    # noinspection PyUnresolvedReferences
+    status=models.CharField(max_length=1,choices=EmailStatusChoices.choices,default=EmailStatusChoices.PENDING)
+    attempts=models.PositiveSmallIntegerField(default=0)
+    last_error=models.CharField(max_length=1024, blank=True, default='')
+    created_date=models.DateTimeField(auto_now_add=True)
+    next_attempt_date=models.DateTimeField(default=timezone.now)
+    sent_date=models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_date'], name='queued_email_due_idx'),
+        ]
@@ -0,0 +1,9 @@
+import unicodedata
+
+_FOLDED_LETTERS = str.maketrans({'ł': 'l'})
+
+#małe litery bez znaków diakrytycznych ('Łożysko' -> 'lozysko'), tak jak porównuje je kolacja *_ai_ci w MySQL.
+#Litera ł nie rozkłada się w NFKD na literę i znak diakrytyczny, więc zamieniana jest osobno
+def normalize_text(text):
+    text = unicodedata.normalize('NFKD', text.lower().translate(_FOLDED_LETTERS))
+    return ''.join(character for character in text if not unicodedata.combining(character))
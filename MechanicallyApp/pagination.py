@@ -0,0 +1,58 @@
+from django.conf import settings
+from rest_framework import pagination
+from rest_framework.response import Response
+
+#paginacja kursorowa (keyset) - kolejna strona wyznaczana jest przez WHERE na indeksowanej kolumnie, a nie przez OFFSET,
+#dzięki czemu czas odpowiedzi nie rośnie wraz z numerem strony. Pozycję kursora wyznacza pierwsze pole ordering, więc
+#musi to być kolumna niezmienna (data utworzenia, nazwa), inaczej wiersze przeskakiwałyby lub powtarzały się między
+#stronami. Odnośniki do sąsiednich stron zwracane są w nagłówku Link, a ciało odpowiedzi pozostaje zwykłą listą obiektów.
+#Parametr all=1 zwraca jedną stronę maksymalnego rozmiaru (PAGINATION_MAX_PAGE_SIZE) dla klientów, którzy nie czytają
+#nagłówka Link
+class DefaultCursorPagination(pagination.CursorPagination):
+    ordering = ('id',)
+    page_size_query_param = 'page_size'
+    all_query_param = 'all'
+
+    def get_page_size(self, request):
+        if request.query_params.get(self.all_query_param) in ('1', 'true'):
+            return self.max_page_size
+        return super().get_page_size(request)
+
+    @property
+    def max_page_size(self):
+        return getattr(settings, 'PAGINATION_MAX_PAGE_SIZE', 200)
+
+    def get_paginated_response(self, data):
+        links = []
+        next_link = self.get_next_link()
+        previous_link = self.get_previous_link()
+        if next_link is not None:
+            links.append(f'<{next_link}>; rel="next"')
+        if previous_link is not None:
+            links.append(f'<{previous_link}>; rel="prev"')
+        headers = {'Link': ', '.join(links)} if links else None
+        return Response(data, headers=headers)
+
+class ManufacturerCursorPagination(DefaultCursorPagination):
+    ordering = ('name',)
+
+class CityCursorPagination(DefaultCursorPagination):
+    ordering = ('name', 'id')
+
+class LocationCursorPagination(DefaultCursorPagination):
+    ordering = ('name',)
+
+class VehicleCursorPagination(DefaultCursorPagination):
+    ordering = ('vin',)
+
+class UserCursorPagination(DefaultCursorPagination):
+    ordering = ('username',)
+
+class FailureReportCursorPagination(DefaultCursorPagination):
+    ordering = ('-report_date', 'id')
+
+class RepairReportCursorPagination(DefaultCursorPagination):
+    ordering = ('-created_date', 'id')
+
+class RepairReportRejectionCursorPagination(DefaultCursorPagination):
+    ordering = ('-rejection_date', 'id')
@@ -1,5 +1,5 @@
 from rest_framework.permissions import BasePermission
-from MechanicallyApp.models import UserLocationAssignment
+from MechanicallyApp.actor_context import get_actor_context
 
 class DefaultDenyAll(BasePermission):
     def has_permission(self, request, view):
@@ -43,7 +43,7 @@ class IsManagerThatManagesSelectedFailureReport(BasePermission):
             return True
         return False
     def has_object_permission(self, request, view, obj):
-        if obj.managed_by == request.user:
+        if obj.managed_by_id == request.user.pk:
             return True
         return False
 
@@ -55,7 +55,7 @@ class IsStandard(BasePermission):
 
 class IsStandardAssignedToBranch(BasePermission):
     def has_permission(self, request, view):
-        if request.user.is_authenticated and request.user.role == 'standard' and UserLocationAssignment.objects.filter(user=request.user,location__location_type='B').exists():
+        if request.user.is_authenticated and request.user.role == 'standard' and get_actor_context(request).branch_id is not None:
             return True
         return False
 
@@ -67,7 +67,7 @@ class IsMechanic(BasePermission):
 
 class IsMechanicAssignedToWorkshop(BasePermission):
     def has_permission(self, request, view):
-        if request.user.is_authenticated and request.user.role == 'mechanic' and UserLocationAssignment.objects.filter(user=request.user,location__location_type='W').exists():
+        if request.user.is_authenticated and request.user.role == 'mechanic' and get_actor_context(request).workshop_id is not None:
             return True
         return False
 
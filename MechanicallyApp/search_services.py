@@ -0,0 +1,97 @@
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.db import connections
+from django.db.models import Func, FloatField, Value
+
+from .models import FailureReport, RepairReport, RepairReportRejection
+from .normalization import normalize_text
+
+#MySQL domyślnie pomija w indeksie FULLTEXT słowa krótsze niż innodb_ft_min_token_size (3 znaki);
+#indeks zastępczy stosuje tę samą regułę, żeby wyniki nie zależały od bazy
+FULLTEXT_MIN_TOKEN_SIZE = 3
+
+#przeszukiwane kolumny tekstowe i nazwy indeksów FULLTEXT dla każdego typu wyników wyszukiwania
+SEARCH_TARGETS = {
+    'failure_reports': (FailureReport, ('title', 'description'), 'failure_report_fulltext'),
+    'repair_reports': (RepairReport, ('condition_analysis', 'repair_action'), 'repair_report_fulltext'),
+    'rejections': (RepairReportRejection, ('title', 'reason'), 'rejection_fulltext'),
+}
+
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+def tokenize(text):
+    return [token for token in _TOKEN_PATTERN.findall(normalize_text(text)) if len(token) >= FULLTEXT_MIN_TOKEN_SIZE]
+
+
+#MATCH (kolumny) AGAINST (zapytanie IN NATURAL LANGUAGE MODE) - trafność wyniku liczona przez indeks FULLTEXT MySQL
+class FullTextMatch(Func):
+    output_field = FloatField()
+
+    def __init__(self, *fields, query):
+        super().__init__(*fields, Value(query))
+
+    def as_sql(self, compiler, connection, **extra_context):
+        *columns, query = self.get_source_expressions()
+        sql_parts, params = [], []
+        for expression in columns:
+            sql, expression_params = compiler.compile(expression)
+            sql_parts.append(sql)
+            params.extend(expression_params)
+        query_sql, query_params = compiler.compile(query)
+        return f"MATCH ({', '.join(sql_parts)}) AGAINST ({query_sql} IN NATURAL LANGUAGE MODE)", (*params, *query_params)
+
+
+#indeksy FULLTEXT nie są wyrażalne w Meta.indexes, więc na MySQL zakładane są po migracji (sygnał post_migrate)
+def create_fulltext_indexes(using='default', **kwargs):
+    connection = connections[using]
+    if connection.vendor != 'mysql':
+        return
+    quote_name = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        for model, fields, index_name in SEARCH_TARGETS.values():
+            table = model._meta.db_table
+            if index_name in connection.introspection.get_constraints(cursor, table):
+                continue
+            columns = ', '.join(quote_name(model._meta.get_field(field).column) for field in fields)
+            cursor.execute(f'CREATE FULLTEXT INDEX {quote_name(index_name)} ON {quote_name(table)} ({columns})')
+
+
+#indeks odwrócony budowany w pamięci procesu dla baz bez FULLTEXT (SQLite w testach i środowisku deweloperskim).
+#Trafność to suma tf*idf słów zapytania występujących w dokumencie, więc kolejność wyników jest zbliżona do MySQL
+class InvertedIndex:
+    def __init__(self):
+        self.postings = defaultdict(dict)
+        self.document_count = 0
+
+    def add(self, document_id, text):
+        self.document_count += 1
+        for token, count in Counter(tokenize(text)).items():
+            self.postings[token][document_id] = count
+
+    def search(self, query):
+        scores = defaultdict(float)
+        for token in set(tokenize(query)):
+            postings = self.postings.get(token, {})
+            if not postings:
+                continue
+            idf = math.log(1 + self.document_count/len(postings))
+            for document_id, count in postings.items():
+                scores[document_id] += count*idf
+        return sorted(scores.items(), key=lambda item: (-item[1], str(item[0])))
+
+#zwraca listę (obiekt, trafność) najlepiej dopasowanych wierszy querysetu (już zawężonego do uprawnień użytkownika)
+def search(queryset, fields, query, limit):
+    if connections[queryset.db].vendor == 'mysql':
+        queryset = (queryset.annotate(relevance=FullTextMatch(*fields, query=query))
+                    .filter(relevance__gt=0)
+                    .order_by('-relevance', 'pk')[:limit])
+        return [(obj, obj.relevance) for obj in queryset]
+
+    index = InvertedIndex()
+    for pk, *values in queryset.values_list('pk', *fields).iterator(chunk_size=2000):
+        index.add(pk, ' '.join(value or '' for value in values))
+    ranking = index.search(query)[:limit]
+    objects = queryset.in_bulk([pk for pk, relevance in ranking])
+    return [(objects[pk], relevance) for pk, relevance in ranking]
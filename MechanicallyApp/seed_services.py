@@ -0,0 +1,222 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from .analytics_services import backfill_repair_cost_rollups
+from .cache_services import bump_cache_version
+from .models import City, Location, Manufacturer, Vehicle, User, UserLocationAssignment, FailureReport, RepairReport, \
+    RepairReportRejection
+
+SEED_PASSWORD = 'Fleet-seed-password-1'
+
+MANUFACTURER_NAMES = ('Dodge', 'Man', 'Volvo', 'Scania', 'Iveco', 'Renault', 'Mercedes Benz', 'Ford', 'Toyota',
+                      'Skoda', 'Solaris', 'Kia', 'Opel', 'Fiat', 'Autosan', 'Jelcz')
+CITY_NAMES = ('Szczecin', 'Warszawa', 'Kraków', 'Gdańsk', 'Poznań', 'Wrocław', 'Łódź', 'Lublin', 'Białystok',
+              'Katowice', 'Rzeszów', 'Olsztyn', 'Opole', 'Kielce', 'Toruń', 'Zielona Góra')
+STREET_NAMES = ('Długa', 'Krótka', 'Kwiatowa', 'Polna', 'Leśna', 'Ogrodowa', 'Lipowa', 'Słoneczna', 'Szkolna',
+                'Kolejowa', 'Portowa', 'Fabryczna')
+FIRST_NAMES = ('Jan', 'Anna', 'Piotr', 'Katarzyna', 'Tomasz', 'Magdalena', 'Paweł', 'Agnieszka', 'Michał', 'Ewa',
+               'Krzysztof', 'Joanna', 'Marek', 'Zofia', 'Adam', 'Barbara')
+LAST_NAMES = ('Nowak', 'Kowalski', 'Wiśniewski', 'Wójcik', 'Kamiński', 'Lewandowski', 'Zieliński', 'Szymański',
+              'Woźniak', 'Dąbrowski', 'Kozłowski', 'Mazur', 'Krawczyk', 'Piotrowski', 'Grabowski', 'Pawlak')
+VEHICLE_MODELS = ('Charger', 'TGX 18.510', 'FH16', 'R450', 'Stralis', 'Master', 'Sprinter', 'Transit', 'Corolla',
+                  'Octavia', 'Urbino 12', 'Ceed', 'Vivaro', 'Ducato', 'A10', 'C-260')
+FAILURE_TITLES = ('Engine failure', 'Brake issue', 'Flat tyre', 'Gearbox noise', 'Battery drained',
+                  'Broken headlight', 'Coolant leak', 'Steering vibration', 'Air conditioning failure', 'Oil leak')
+REJECTION_TITLES = ('Incomplete repair', 'Wrong part used', 'Issue still present', 'Missing documentation')
+
+VIN_ALPHABET = 'ABCDEFGHJKLMNPRSTUVWXYZ0123456789'
+#wygenerowane pojazdy mają wspólny kod producenta (pierwsze trzy znaki VIN), a użytkownicy i lokalizacje wspólną
+#domenę adresu email, dzięki czemu można je później rozpoznać i usunąć
+SEED_VIN_PREFIX = 'SFL'
+SEED_EMAIL_DOMAIN = 'fleet.example.com'
+LOCATION_NAME_ALPHABET = 'ABCDEFGHIJKLMNOPRSTUWZ'
+
+#stałe prefiksy numerów telefonów gwarantują unikalność w obrębie jednego typu obiektu
+PHONE_PREFIXES = {'B': '1', 'W': '2', 'standard': '3', 'mechanic': '4', 'manager': '5', 'admin': '6'}
+
+def _encode(index, alphabet, length):
+    characters = []
+    for _ in range(length):
+        index, remainder = divmod(index, len(alphabet))
+        characters.append(alphabet[remainder])
+    return ''.join(reversed(characters))
+
+def _phone_number(prefix, index):
+    return '%s%08d' % (prefix, index)
+
+def _vin(rng, index):
+    return SEED_VIN_PREFIX + ''.join(rng.choice(VIN_ALPHABET) for _ in range(6)) + _encode(index, VIN_ALPHABET, 8)
+
+def _past_date(rng, now, max_days):
+    return now - timedelta(days=rng.randint(0, max_days), seconds=rng.randint(0, 86399))
+
+#rozmiary poszczególnych zbiorów danych wyliczane proporcjonalnie do liczby pojazdów
+def fleet_sizes(vehicles):
+    return {
+        'cities': min(len(CITY_NAMES), max(2, vehicles // 500)),
+        'branches': max(2, vehicles // 100),
+        'workshops': max(2, vehicles // 200),
+        'standard': max(2, vehicles // 20),
+        'mechanic': max(2, vehicles // 100),
+        'manager': max(2, vehicles // 200),
+        'admin': 2,
+        'vehicles': vehicles,
+    }
+
+def _seed_reference_data(rng, sizes, batch_size):
+    Manufacturer.objects.bulk_create([Manufacturer(name=name) for name in MANUFACTURER_NAMES], batch_size=batch_size, ignore_conflicts=True)
+    manufacturer_ids = list(Manufacturer.objects.filter(name__in=MANUFACTURER_NAMES).values_list('id', flat=True))
+    cities = City.objects.bulk_create([City(name=name) for name in CITY_NAMES[:sizes['cities']]], batch_size=batch_size)
+
+    locations = []
+    for location_type, count, label in (('B', sizes['branches'], 'ODDZIAL'), ('W', sizes['workshops'], 'WARSZTAT')):
+        for index in range(count):
+            name = '%s %s' % (label, _encode(index, LOCATION_NAME_ALPHABET, 4))
+            locations.append(Location(name=name, phone_number=_phone_number(PHONE_PREFIXES[location_type], index),
+                                      email='%s@%s' % (name.lower().replace(' ', '.'), SEED_EMAIL_DOMAIN),
+                                      street_name=rng.choice(STREET_NAMES), building_number=rng.randint(1, 200),
+                                      unit_number=rng.choice((None, rng.randint(1, 50))), city=cities[len(locations) % len(cities)],
+                                      location_type=location_type))
+    Location.objects.bulk_create(locations, batch_size=batch_size)
+    branches = [location for location in locations if location.location_type == 'B']
+    workshops = [location for location in locations if location.location_type == 'W']
+    return manufacturer_ids, branches, workshops
+
+def _seed_users(rng, sizes, branches, workshops, password, batch_size):
+    password_hash = make_password(password)
+    users = {}
+    assignments = []
+    for role in ('standard', 'mechanic', 'manager', 'admin'):
+        users[role] = []
+        for index in range(sizes[role]):
+            username = '%s%07d' % (role[:3], index)
+            user = User(username=username, email='%s@%s' % (username, SEED_EMAIL_DOMAIN), password=password_hash,
+                        first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES), role=role,
+                        phone_number=_phone_number(PHONE_PREFIXES[role], index), is_new_account=False)
+            users[role].append(user)
+            if role == 'standard':
+                assignments.append(UserLocationAssignment(user=user, location=branches[index % len(branches)]))
+            elif role == 'mechanic':
+                assignments.append(UserLocationAssignment(user=user, location=workshops[index % len(workshops)]))
+    User.objects.bulk_create([user for role_users in users.values() for user in role_users], batch_size=batch_size)
+    UserLocationAssignment.objects.bulk_create(assignments, batch_size=batch_size)
+    return users
+
+#historia pojazdu: zamknięte zgłoszenia (rozwiązane z naprawą HISTORIC albo odrzucone) oraz opcjonalnie jedno otwarte
+#zgłoszenie w statusie PENDING, ASSIGNED lub STOPPED z naprawą ACTIVE albo READY
+def _seed_vehicle_history(rng, now, vehicle, users, workshops, failure_reports, repair_reports, rejections):
+    statuses = ['R'] * rng.randint(0, 2) + ['D'] * rng.choice((0, 0, 1))
+    open_status = rng.choices(('', 'P', 'A', 'S'), weights=(60, 15, 20, 5))[0]
+    if open_status:
+        statuses.append(open_status)
+        vehicle.availability = 'U'
+
+    for failure_status in statuses:
+        report_date = _past_date(rng, now, 30 if failure_status == open_status else 720)
+        status_change_date = min(now, report_date + timedelta(days=rng.randint(0, 14)))
+        workshop = rng.choice(workshops) if failure_status in ('A', 'S', 'R') else None
+        managed_by = None if failure_status == 'P' and rng.random() < 0.5 else rng.choice(users['manager'])
+        failure_report = FailureReport(vehicle=vehicle, title=rng.choice(FAILURE_TITLES), workshop=workshop,
+                                       description='Reported by the driver during a routine inspection.',
+                                       report_author=rng.choice(users['standard']), status=failure_status,
+                                       managed_by=managed_by, report_date=report_date,
+                                       last_status_change_date=status_change_date)
+        failure_reports.append(failure_report)
+        if workshop is None:
+            continue
+
+        repair_status = {'R': 'H', 'S': 'A'}.get(failure_status) or rng.choice(('A', 'R'))
+        repair_report = RepairReport(failure_report=failure_report, status=repair_status,
+                                     condition_analysis='Diagnosed during workshop inspection.',
+                                     repair_action='Replaced the faulty parts.' if repair_status != 'A' else '',
+                                     cost=Decimal(rng.randint(0, 5000000)) / 100 if repair_status != 'A' else Decimal(0),
+                                     created_date=report_date, last_change_date=status_change_date)
+        repair_reports.append(repair_report)
+        for _ in range(rng.choice((0, 0, 0, 1, 2))):
+            rejections.append(RepairReportRejection(repair_report=repair_report, title=rng.choice(REJECTION_TITLES),
+                                                    reason='The reported issue has not been fully resolved.',
+                                                    rejection_date=min(now, report_date + timedelta(days=rng.randint(0, 7)))))
+
+#bulk_create nadpisuje pola auto_now i auto_now_add bieżącą datą, więc wygenerowane daty historyczne są zapamiętywane
+#przed zapisem i przywracane osobnym bulk_update (nie wywołuje pre_save) na właśnie utworzonych obiektach
+def _bulk_create_with_dates(model, objects, date_fields, batch_size):
+    dates = [[getattr(obj, field) for field in date_fields] for obj in objects]
+    model.objects.bulk_create(objects, batch_size=batch_size)
+    for obj, values in zip(objects, dates):
+        for field, value in zip(date_fields, values):
+            setattr(obj, field, value)
+    model.objects.bulk_update(objects, date_fields, batch_size=batch_size)
+
+#generuje deterministyczny (zależny tylko od seed) zbiór danych floty: miasta, oddziały i warsztaty, producentów,
+#pojazdy z poprawnymi numerami VIN, użytkowników każdej roli z przypisaniami do lokalizacji oraz historię zgłoszeń,
+#napraw i odrzuceń we wszystkich statusach. Pojazdy wraz z historią generowane i zapisywane są paczkami po batch_size
+#pojazdów przez bulk_create, więc zużycie pamięci nie zależy od rozmiaru floty. Na końcu przeliczane są dzienne sumy
+#kosztów napraw (RepairCostRollup). Rozmiary poszczególnych zbiorów można nadpisać słownikiem sizes (klucze jak
+#w fleet_sizes). Zakłada, że w bazie nie ma wcześniej wygenerowanych danych
+def seed_fleet(vehicles=1000, seed=0, batch_size=1000, password=SEED_PASSWORD, sizes=None):
+    rng = random.Random(seed)
+    now = timezone.now()
+    sizes = {**fleet_sizes(vehicles), **(sizes or {})}
+    current_year = date.today().year
+    counts = {'failure_reports': 0, 'repair_reports': 0, 'repair_report_rejections': 0}
+
+    with transaction.atomic():
+        manufacturer_ids, branches, workshops = _seed_reference_data(rng, sizes, batch_size)
+        users = _seed_users(rng, sizes, branches, workshops, password, batch_size)
+
+        for chunk_start in range(0, vehicles, batch_size):
+            vehicle_objects = []
+            failure_reports, repair_reports, rejections = [], [], []
+            for index in range(chunk_start, min(vehicles, chunk_start + batch_size)):
+                vehicle = Vehicle(vin=_vin(rng, index), manufacturer_id=rng.choice(manufacturer_ids),
+                                  vehicle_model=rng.choice(VEHICLE_MODELS), year=rng.randint(1995, current_year),
+                                  vehicle_type=rng.choice(Vehicle.VehicleTypeChoices.values),
+                                  fuel_type=rng.choice(Vehicle.FuelTypeChoices.values),
+                                  location=rng.choice(branches) if rng.random() < 0.95 else None)
+                _seed_vehicle_history(rng, now, vehicle, users, workshops, failure_reports, repair_reports, rejections)
+                vehicle_objects.append(vehicle)
+
+            Vehicle.objects.bulk_create(vehicle_objects, batch_size=batch_size)
+            _bulk_create_with_dates(FailureReport, failure_reports, ['report_date', 'last_status_change_date'], batch_size)
+            _bulk_create_with_dates(RepairReport, repair_reports, ['created_date', 'last_change_date'], batch_size)
+            _bulk_create_with_dates(RepairReportRejection, rejections, ['rejection_date'], batch_size)
+            counts['failure_reports'] += len(failure_reports)
+            counts['repair_reports'] += len(repair_reports)
+            counts['repair_report_rejections'] += len(rejections)
+
+        counts['repair_cost_rollups'] = backfill_repair_cost_rollups(batch_size=batch_size)
+
+    #bulk_create nie wysyła sygnałów post_save, więc wersje cache danych słownikowych podbijane są ręcznie
+    for namespace in ('manufacturers', 'cities', 'locations'):
+        bump_cache_version(namespace)
+
+    return {
+        'cities': sizes['cities'],
+        'locations': len(branches) + len(workshops),
+        'manufacturers': len(manufacturer_ids),
+        'users': sum(len(role_users) for role_users in users.values()),
+        'vehicles': vehicles,
+        **counts,
+    }
+
+def seeded_fleet_exists():
+    return User.objects.filter(email__endswith='@' + SEED_EMAIL_DOMAIN).exists()
+
+#usuwa dane wygenerowane przez seed_fleet: pojazdy rozpoznawane są po prefiksie VIN (wraz z historią zgłoszeń),
+#użytkownicy i lokalizacje po domenie adresu email, a miasta po tym, że nie mają już żadnej lokalizacji.
+#Producenci są współdzieleni z danymi rzeczywistymi, więc nie są usuwani. SFL jest poprawnym kodem producenta,
+#więc na bazie z danymi rzeczywistymi mogłyby zostać usunięte prawdziwe pojazdy - komenda seed_fleet pozwala na to
+#tylko przy DEBUG albo z --force
+def clear_seeded_fleet():
+    with transaction.atomic():
+        Vehicle.objects.filter(vin__startswith=SEED_VIN_PREFIX).delete()
+        User.objects.filter(email__endswith='@' + SEED_EMAIL_DOMAIN).delete()
+        seeded_locations = Location.objects.filter(email__endswith='@' + SEED_EMAIL_DOMAIN)
+        city_ids = set(seeded_locations.values_list('city_id', flat=True))
+        seeded_locations.delete()
+        City.objects.filter(pk__in=city_ids, location__isnull=True).delete()
@@ -1,3 +1,5 @@
+import jwt
+from django.conf import settings
 from django.contrib.auth import authenticate
 from django.contrib.auth.tokens import default_token_generator
 from django.contrib.auth.password_validation import validate_password
@@ -11,8 +13,14 @@ from .models import Manufacturer, User, Location, UserLocationAssignment, Vehicl
 from .validators import manufacturer_name_validator, first_name_validator, last_name_validator, phone_number_validator, \
     location_name_validator, vin_validator, vehicle_model_validator, vehicle_year_validator, natural_text_validator, \
     city_name_validator, street_name_validator
-from .generators import generate_username, generate_random_password
+from .generators import generate_username
 from .mail_services import send_activation_email, send_reset_password_email
+from .actor_context import get_actor_context
+from .concurrency import update_versioned
+from .workflow_services import assign_failure_report, reassign_failure_report, reject_repair_report
+from .analytics_services import ANALYTICS_GROUPINGS
+from .search_services import SEARCH_TARGETS, FULLTEXT_MIN_TOKEN_SIZE, tokenize
+from .token_services import decode_token, account_activation_token_generator, check_account_activation_token
 
 class CitySerializer(serializers.ModelSerializer):
     class Meta:
@@ -35,12 +43,20 @@ class LoginSerializer(serializers.Serializer):
             raise serializers.ValidationError('Username or password is incorrect.')
         return data
 
+class RefreshTokenSerializer(serializers.Serializer):
+    refresh=serializers.CharField(write_only=True)
+    def validate_refresh(self, value):
+        try:
+            return decode_token(value, 'refresh')
+        except jwt.InvalidTokenError:
+            raise serializers.ValidationError('Token is invalid or expired.')
+
 # serializer służący do wypisywania, dodawania oraz aktualizowania Location
 class LocationCreateSerializer(serializers.ModelSerializer):
     location_type=serializers.CharField(max_length=1, required=True)
     class Meta:
         model = Location
-        fields = '__all__'
+        exclude = ['name_normalized', 'last_change_date']
         read_only_fields = ['id']
 
     def validate_name(self, value):
@@ -64,6 +80,7 @@ class LocationCreateSerializer(serializers.ModelSerializer):
 
 class LocationRetrieveSerializer(serializers.ModelSerializer):
     city=serializers.CharField(source='city.name',read_only=True)
+    select_related_fields=('city',)
     class Meta:
         model = Location
         fields = ['id','name', 'phone_number', 'email' ,'city', 'street_name','building_number','unit_number']
@@ -142,16 +159,15 @@ class UserCreateSerializer(serializers.ModelSerializer):
         generated_username=generate_username(first_name, last_name)
         while User.objects.filter(username=generated_username).exists():
             generated_username=generate_username(first_name, last_name)
-        generated_password=generate_random_password()
-        while validate_password(generated_password) is not None:
-            generated_password=generate_random_password()
-        user=User.objects.create_user(username=generated_username, password=generated_password, is_active=False, is_new_account=True, **validated_data)
-        token = default_token_generator.make_token(user)
+        #hasło ustawia użytkownik przy aktywacji, więc konto dostaje hasło nieużywalne (bez haszowania i walidacji)
+        user=User.objects.create_user(username=generated_username, password=None, is_active=False, is_new_account=True, **validated_data)
+        token = account_activation_token_generator.make_token(user)
         send_activation_email(user, token=token)
         return user
 
 class UserListSerializer(serializers.ModelSerializer):
-    location=serializers.UUIDField(source='user_location_assignment.location.id', read_only=True)
+    location=serializers.UUIDField(source='user_location_assignment.location_id', read_only=True)
+    select_related_fields=('user_location_assignment',)
     class Meta:
         model = User
         fields = ['id','first_name','last_name','email','phone_number','role','location']
@@ -215,6 +231,7 @@ class UserUpdateSerializer(serializers.ModelSerializer):
         return instance
 
 class UserRetrieveSerializer(serializers.ModelSerializer):
+    select_related_fields=('user_location_assignment__location',)
     class Meta:
         model = User
         fields = ['id','username','first_name','last_name','email','phone_number', 'role', 'is_superuser','is_active','date_joined']
@@ -251,7 +268,7 @@ class AccountActivationSerializer(serializers.Serializer):
             user=User.objects.get(pk=user_id, is_active=False, is_new_account=True)
         except User.DoesNotExist:
             raise serializers.ValidationError({'detail':'Invalid user or token.'})
-        if not default_token_generator.check_token(user, token):
+        if not check_account_activation_token(user, token):
             raise serializers.ValidationError({'detail':'Invalid user or token.'})
 
         if password != confirm_password:
@@ -353,7 +370,7 @@ class PasswordChangeSerializer(serializers.Serializer):
 class ManufacturerSerializer(serializers.ModelSerializer):
     class Meta:
         model = Manufacturer
-        fields = '__all__'
+        fields = ['id', 'name']
         read_only_fields = ['id']
 
     def validate_name(self, value):
@@ -382,6 +399,7 @@ class UserLocationAssignmentSerializer(serializers.Serializer):
 #serializer służący do wypisania informacji o lokacji mechanika/standarda
 class UserNestedLocationAssignmentSerializer(serializers.ModelSerializer):
     location=LocationCreateSerializer(read_only=True)
+    select_related_fields=('location',)
     class Meta:
         model = UserLocationAssignment
         fields = ['location','assign_date']
@@ -391,9 +409,10 @@ class UserNestedLocationAssignmentSerializer(serializers.ModelSerializer):
 class VehicleRetrieveSerializer(serializers.ModelSerializer):
     manufacturer=ManufacturerSerializer(read_only=True)
     branch=LocationCreateSerializer(read_only=True)
+    select_related_fields=('manufacturer',)
     class Meta:
         model=Vehicle
-        fields='__all__'
+        exclude=['vehicle_model_normalized', 'last_change_date']
         read_only_fields=['id','vin','manufacturer','vehicle_model','year','vehicle_type','fuel_type','availability','branch']
 
 #serializer do listowania informacji o pojeździe
@@ -468,7 +487,7 @@ class FailureReportCreateSerializer(serializers.ModelSerializer):
         value=Vehicle.objects.filter(pk=value).first()
         if value is None:
             raise NotFound('There is no vehicle with provided ID assigned to your branch.')
-        user_location_id=UserLocationAssignment.objects.filter(user_id=self.context.get('request').user.id).values_list('location_id',flat=True).first()
+        user_location_id=get_actor_context(self.context.get('request')).location_id
         if user_location_id is None:
             raise NotFound('You are not assigned to any branch.')
         if value.location.id!=user_location_id:
@@ -490,6 +509,7 @@ class FailureReportCreateSerializer(serializers.ModelSerializer):
 
 class FailureReportListSerializer(serializers.ModelSerializer):
     vehicle=VehicleRetrieveSerializer(read_only=True)
+    select_related_fields=('vehicle__manufacturer',)
     class Meta:
         model=FailureReport
         fields=['id','title','vehicle','status','report_date','managed_by']
@@ -497,6 +517,7 @@ class FailureReportListSerializer(serializers.ModelSerializer):
 
 class FailureReportInfoForRepairReportSerializer(serializers.ModelSerializer):
     vehicle=VehicleRetrieveSerializer(read_only=True)
+    select_related_fields=('vehicle__manufacturer',)
     class Meta:
         model=FailureReport
         fields=['id','title','vehicle','description','status','report_date']
@@ -505,10 +526,11 @@ class FailureReportInfoForRepairReportSerializer(serializers.ModelSerializer):
 class FailureReportRetrieveSerializer(serializers.ModelSerializer):
     vehicle=VehicleRetrieveSerializer(read_only=True)
     workshop=LocationCreateSerializer(read_only=True)
+    select_related_fields=('vehicle__manufacturer','workshop')
     class Meta:
         model=FailureReport
         fields='__all__'
-        read_only_fields=['id','title','vehicle','description','workshop','report_date','report_author','status','last_status_change_date']
+        read_only_fields=['id','title','vehicle','description','workshop','report_date','report_author','status','last_status_change_date','version']
 
 class FailureReportAssignSerializer(serializers.Serializer):
     workshop=serializers.PrimaryKeyRelatedField(queryset=Location.objects.all(),required=True)
@@ -521,12 +543,8 @@ class FailureReportAssignSerializer(serializers.Serializer):
     def save(self):
         failure_report=self.context.get('failure_report')
         workshop=self.validated_data.get('workshop')
-        with transaction.atomic():
-            failure_report.workshop=workshop
-            failure_report.status='A'
-            failure_report.save()
-            repair_report=RepairReport.objects.create(failure_report=failure_report,status='A',cost=0)
-            return {'repair_report_id':repair_report.pk}
+        repair_report=assign_failure_report(failure_report,workshop)
+        return {'repair_report_id':repair_report.pk}
 
 
 class FailureReportReassignSerializer(serializers.Serializer):
@@ -541,17 +559,16 @@ class FailureReportReassignSerializer(serializers.Serializer):
     def save(self):
         failure_report = self.context.get('failure_report')
         workshop = self.validated_data.get('workshop')
-        failure_report.workshop = workshop
-        failure_report.status = 'A'
-        failure_report.save()
+        reassign_failure_report(failure_report, workshop)
         return "Report has been reassigned to provided workshop."
 
 class RepairReportRetrieveUpdateSerializer(serializers.ModelSerializer):
     failure_report=FailureReportInfoForRepairReportSerializer(read_only=True)
+    select_related_fields=('failure_report__vehicle__manufacturer',)
     class Meta:
         model=RepairReport
-        fields=['id','failure_report','condition_analysis','repair_action','cost','last_change_date','status']
-        read_only_fields=['id','failure_report','last_change_date','status']
+        fields=['id','failure_report','condition_analysis','repair_action','cost','last_change_date','status','version']
+        read_only_fields=['id','failure_report','last_change_date','status','version']
 
     def validate_cost(self,value):
         if value<0:
@@ -563,10 +580,14 @@ class RepairReportRetrieveUpdateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({'detail':'Repair report cannot be modified if not in ACTIVE status.'})
         return super().validate(data)
 
+    def update(self, instance, validated_data):
+        return update_versioned(instance, predicates={'status': 'A'}, **validated_data)
+
 class RepairReportListSerializer(serializers.ModelSerializer):
     title=serializers.CharField(source='failure_report.title',read_only=True)
     vehicle=serializers.UUIDField(source='failure_report.vehicle_id',read_only=True)
     report_date=serializers.DateTimeField(source='failure_report.report_date',read_only=True)
+    select_related_fields=('failure_report',)
     class Meta:
         model=RepairReport
         fields=['id','title','status','vehicle','report_date']
@@ -604,6 +625,105 @@ class RepairReportRejectionSerializer(serializers.ModelSerializer):
         title=self.validated_data.get('title')
         reason=self.validated_data.get('reason')
         repair_report=self.context.get('repair_report')
-        rejection=RepairReportRejection.objects.create(title=title,repair_report=repair_report,reason=reason)
-        rejection.save()
-        return rejection
\ No newline at end of file
+        return reject_repair_report(repair_report,title,reason)
+
+class RepairCostAnalyticsQuerySerializer(serializers.Serializer):
+    group_by=serializers.ChoiceField(choices=ANALYTICS_GROUPINGS, default='month')
+    limit=serializers.IntegerField(min_value=1, default=50)
+
+    def validate_limit(self, value):
+        return min(value, getattr(settings, 'PAGINATION_MAX_PAGE_SIZE', 200))
+
+
+class RepairCostSummaryRowSerializer(serializers.Serializer):
+    key=serializers.CharField()
+    name=serializers.CharField(allow_null=True)
+    repair_count=serializers.IntegerField()
+    total_cost=serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class RepairCostSummarySerializer(serializers.Serializer):
+    group_by=serializers.CharField()
+    repair_count=serializers.IntegerField()
+    total_cost=serializers.DecimalField(max_digits=14, decimal_places=2)
+    results=RepairCostSummaryRowSerializer(many=True)
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    q=serializers.CharField(max_length=256)
+    types=serializers.CharField(required=False, default=','.join(SEARCH_TARGETS))
+    limit=serializers.IntegerField(min_value=1, default=20)
+
+    def validate_q(self, value):
+        if not tokenize(value):
+            raise serializers.ValidationError(f'Search query must contain at least one word of {FULLTEXT_MIN_TOKEN_SIZE} or more characters.')
+        return value
+
+    def validate_types(self, value):
+        types=[search_type.strip() for search_type in value.split(',') if search_type.strip()]
+        if not types or any(search_type not in SEARCH_TARGETS for search_type in types):
+            raise serializers.ValidationError(f"Types must be a comma separated list of: {', '.join(SEARCH_TARGETS)}.")
+        return list(dict.fromkeys(types))
+
+    def validate_limit(self, value):
+        return min(value, getattr(settings, 'PAGINATION_MAX_PAGE_SIZE', 200))
+
+
+class AutocompleteQuerySerializer(serializers.Serializer):
+    q=serializers.CharField(max_length=100)
+    limit=serializers.IntegerField(min_value=1, default=10)
+
+    def validate_limit(self, value):
+        return min(value, getattr(settings, 'AUTOCOMPLETE_MAX_RESULTS', 50))
+
+
+class VehicleVinLookupSerializer(serializers.Serializer):
+    vin=serializers.CharField(max_length=17)
+
+    def validate_vin(self, value):
+        value=value.upper()
+        vin_validator(value)
+        return value
+
+
+class VehicleBatchVinLookupSerializer(serializers.Serializer):
+    vins=serializers.CharField()
+
+    def validate_vins(self, value):
+        vins=list(dict.fromkeys(vin.strip().upper() for vin in value.split(',') if vin.strip()))
+        max_size=getattr(settings, 'BATCH_LOOKUP_MAX_SIZE', 100)
+        if not vins:
+            raise serializers.ValidationError('Provide at least one VIN.')
+        if len(vins) > max_size:
+            raise serializers.ValidationError(f'No more than {max_size} VINs can be looked up at once.')
+        invalid_vins=[]
+        for vin in vins:
+            try:
+                vin_validator(vin)
+            except serializers.ValidationError:
+                invalid_vins.append(vin)
+        if invalid_vins:
+            raise serializers.ValidationError(f"VIN must be in correct format: {', '.join(invalid_vins)}.")
+        return vins
+
+
+class BatchRetrieveQuerySerializer(serializers.Serializer):
+    ids=serializers.CharField()
+
+    def validate_ids(self, value):
+        ids=list(dict.fromkeys(pk.strip().lower() for pk in value.split(',') if pk.strip()))
+        max_size=getattr(settings, 'BATCH_LOOKUP_MAX_SIZE', 100)
+        if not ids:
+            raise serializers.ValidationError('Provide at least one id.')
+        if len(ids) > max_size:
+            raise serializers.ValidationError(f'No more than {max_size} objects can be retrieved at once.')
+        uuid_field=serializers.UUIDField()
+        valid_ids, invalid_ids=[], []
+        for pk in ids:
+            try:
+                valid_ids.append(uuid_field.to_internal_value(pk))
+            except serializers.ValidationError:
+                invalid_ids.append(pk)
+        if invalid_ids:
+            raise serializers.ValidationError(f"Ids must be valid UUIDs: {', '.join(invalid_ids)}.")
+        return list(dict.fromkeys(valid_ids))
@@ -0,0 +1,18 @@
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+
+#usuwa wygasłe sesje z tabeli django_session partiami po batch_size kluczy (indeks na expire_date), zamiast jednego
+#DELETE na całej tabeli jak w clearsessions, więc czyszczenie nie blokuje logowania. Wpisy sesji w cache
+#wygasają same, z tym samym czasem życia co sesja
+def purge_expired_sessions(batch_size=1000, now=None):
+    now = now or timezone.now()
+    expired_sessions = Session.objects.filter(expire_date__lt=now).order_by('expire_date')
+    deleted = 0
+    while True:
+        session_keys = list(expired_sessions.values_list('session_key', flat=True)[:batch_size])
+        if not session_keys:
+            break
+        deleted += Session.objects.filter(session_key__in=session_keys).delete()[0]
+        if len(session_keys) < batch_size:
+            break
+    return deleted
@@ -0,0 +1,36 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .auth_services import invalidate_user_snapshot
+from .cache_services import bump_cache_version
+from .models import Manufacturer, City, Location, User, UserLocationAssignment
+from .token_services import revoke_user_tokens
+
+CACHE_NAMESPACES = {
+    Manufacturer: 'manufacturers',
+    City: 'cities',
+    Location: 'locations',
+}
+
+@receiver([post_save, post_delete], sender=Manufacturer)
+@receiver([post_save, post_delete], sender=City)
+@receiver([post_save, post_delete], sender=Location)
+def invalidate_reference_data_cache(sender, **kwargs):
+    bump_cache_version(CACHE_NAMESPACES[sender])
+
+#każdy zapis użytkownika (zmiana roli, dezaktywacja, zmiana hasła) unieważnia jego migawkę używaną przy uwierzytelnianiu
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_snapshot_cache(sender, instance, **kwargs):
+    invalidate_user_snapshot(instance.pk)
+
+#tokeny niosą rolę i lokalizację w claims, więc zapis użytkownika (poza samym last_login przy logowaniu) oraz zmiana
+#przypisania do lokalizacji odwołują wszystkie jego wcześniej wystawione tokeny
+@receiver([post_save, post_delete], sender=User)
+def revoke_user_tokens_on_change(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    revoke_user_tokens(instance.pk)
+
+@receiver([post_save, post_delete], sender=UserLocationAssignment)
+def revoke_user_tokens_on_assignment_change(sender, instance, **kwargs):
+    revoke_user_tokens(instance.user_id)
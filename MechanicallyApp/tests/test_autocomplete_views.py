@@ -0,0 +1,100 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from MechanicallyApp.models import User, Manufacturer, Vehicle, Location, UserLocationAssignment, City
+
+
+class AutocompleteTestCase(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(first_name="Piotr", last_name="Testowy", username="piotes1111", email="testowy@gmail.com",
+                                              password="test1234", role="admin", phone_number="987654321", is_new_account=False)
+        self.standard = User.objects.create_user(first_name="Łukasz", last_name="Żółkiewski", username="lukzol1111", email="Lukasz.Zolkiewski@gmail.com",
+                                                 password="test1234", role="standard", phone_number="987654322", is_new_account=False)
+        self.standard2 = User.objects.create_user(first_name="Jan", last_name="Kowalski", username="jankow1111", email="jan.kowalski@gmail.com",
+                                                  password="test1234", role="standard", phone_number="987654323", is_new_account=False)
+        self.standard3 = User.objects.create_user(first_name="Janina", last_name="Kowalczyk", username="jankow2222", email="janina@gmail.com",
+                                                  password="test1234", role="standard", phone_number="987654324", is_new_account=False)
+        city = City.objects.create(name='Szczecin')
+        self.branch = Location.objects.create(name='ŚRÓDMIEŚCIE', phone_number='123456789', email="test@gmail.com", city=city,
+                                              street_name='Parkowa', building_number=1, location_type='B')
+        self.branch2 = Location.objects.create(name='SIEDZIBA', phone_number='163456789', email="test2@gmail.com", city=city,
+                                               street_name='Parkowa', building_number=1, location_type='B')
+        UserLocationAssignment.objects.create(user=self.standard, location=self.branch)
+        UserLocationAssignment.objects.create(user=self.standard2, location=self.branch)
+        manufacturer = Manufacturer.objects.create(name='MAN')
+        self.vehicle = Vehicle.objects.create(vin='5GZCZ63B93S896664', vehicle_type='TR', year=2018, vehicle_model="TGX 18.510",
+                                              fuel_type='D', location=self.branch, manufacturer=manufacturer)
+        self.vehicle2 = Vehicle.objects.create(vin='5GZCZ63B93S896665', vehicle_type='TR', year=2019, vehicle_model="TGS 26.440",
+                                               fuel_type='D', location=self.branch2, manufacturer=manufacturer)
+
+    def autocomplete(self, user, url_name, **params):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get(reverse(url_name), params)
+
+    def test_shadow_columns_are_normalized_on_save_and_bulk_create(self):
+        self.assertEqual(self.standard.first_name_normalized, 'lukasz')
+        self.assertEqual(self.standard.last_name_normalized, 'zolkiewski')
+        self.assertEqual(self.standard.email_normalized, 'lukasz.zolkiewski@gmail.com')
+        self.assertEqual(Location.objects.get(pk=self.branch.pk).name_normalized, 'srodmiescie')
+        vehicle = Vehicle.objects.bulk_create([Vehicle(vin='5GZCZ63B93S896666', vehicle_type='CO', year=2020, vehicle_model='Urbino 12',
+                                                       manufacturer=self.vehicle.manufacturer)])[0]
+        self.assertEqual(Vehicle.objects.get(pk=vehicle.pk).vehicle_model_normalized, 'urbino 12')
+
+    def test_location_autocomplete_ignores_case_and_diacritics(self):
+        response = self.autocomplete(self.standard, 'location-autocomplete', q='sro')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([location['id'] for location in response.json()], [str(self.branch.id)])
+
+    def test_user_autocomplete_matches_first_and_last_name_prefixes(self):
+        response = self.autocomplete(self.admin, 'user-autocomplete', q='jan kow')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([user['id'] for user in response.json()], [str(self.standard3.id), str(self.standard2.id)])
+        response = self.autocomplete(self.admin, 'user-autocomplete', q='Żółk')
+        self.assertEqual([user['id'] for user in response.json()], [str(self.standard.id)])
+
+    def test_user_autocomplete_respects_list_scope(self):
+        with self.assertNumQueries(2):
+            response = self.autocomplete(self.standard, 'user-autocomplete', q='jan')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([user['id'] for user in response.json()], [str(self.standard2.id)])
+
+    def test_autocomplete_returns_at_most_limit_results(self):
+        response = self.autocomplete(self.admin, 'user-autocomplete', q='jan', limit=1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 1)
+
+    def test_vehicle_autocomplete_respects_list_scope(self):
+        response = self.autocomplete(self.standard, 'vehicle-autocomplete', q='tg')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([vehicle['id'] for vehicle in response.json()], [str(self.vehicle.id)])
+        response = self.autocomplete(self.admin, 'vehicle-autocomplete', q='tgs 26')
+        self.assertEqual([vehicle['id'] for vehicle in response.json()], [str(self.vehicle2.id)])
+
+    def test_autocomplete_requires_query(self):
+        response = self.autocomplete(self.admin, 'user-autocomplete')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_autocomplete_does_not_accept_post(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.post(reverse('location-autocomplete'), {'name': 'NOWA'})
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_rebuild_command_fills_shadow_columns(self):
+        User.objects.filter(pk=self.standard.pk).update(first_name_normalized='', last_name_normalized='')
+        call_command('rebuild_normalized_fields', stdout=StringIO())
+        self.standard.refresh_from_db()
+        self.assertEqual((self.standard.first_name_normalized, self.standard.last_name_normalized), ('lukasz', 'zolkiewski'))
+
+    def test_shadow_columns_are_not_exposed_by_detail_endpoints(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        vehicle = client.get(reverse('vehicle-detail', kwargs={'pk': self.vehicle.pk})).json()
+        location = client.get(reverse('location-detail', kwargs={'pk': self.branch.pk})).json()
+        self.assertNotIn('vehicle_model_normalized', vehicle)
+        self.assertNotIn('name_normalized', location)
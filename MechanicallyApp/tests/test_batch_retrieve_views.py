@@ -0,0 +1,106 @@
+import uuid
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from MechanicallyApp.models import User, Manufacturer, Vehicle, Location, UserLocationAssignment, FailureReport, \
+    RepairReport, City
+
+
+class BatchRetrieveTestCase(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(first_name="Piotr", last_name="Testowy", username="piotes1111", email="testowy@gmail.com",
+                                              password="test1234", role="admin", phone_number="987654321", is_new_account=False)
+        self.standard = User.objects.create_user(first_name="Jan", last_name="Nowak", username="jannow1111", email="testowy2@gmail.com",
+                                                 password="test1234", role="standard", phone_number="987654322", is_new_account=False)
+        self.standard2 = User.objects.create_user(first_name="Adam", last_name="Kowalski", username="adakow1111", email="testowy3@gmail.com",
+                                                  password="test1234", role="standard", phone_number="987654323", is_new_account=False)
+        self.manager = User.objects.create_user(first_name="Szymon", last_name="Chasowski", username="szycha1111", email="testowy4@gmail.com",
+                                                password="test1234", role="manager", phone_number="987654324", is_new_account=False)
+        self.mechanic = User.objects.create_user(first_name="Karol", last_name="Nawrak", username="karnaw1111", email="testowy5@gmail.com",
+                                                 password="test1234", role="mechanic", phone_number="987654325", is_new_account=False)
+        city = City.objects.create(name='Szczecin')
+        self.branch = Location.objects.create(name='SIEDZIBA', phone_number='123456789', email="test@gmail.com", city=city,
+                                              street_name='Parkowa', building_number=1, location_type='B')
+        self.workshop = Location.objects.create(name='WARSZTAT', phone_number='133456789', email="test2@gmail.com", city=city,
+                                                street_name='Parkowa', building_number=1, location_type='W')
+        self.workshop2 = Location.objects.create(name='WARSZTAT B', phone_number='544333222', email="test3@gmail.com", city=city,
+                                                 street_name='Parkowa', building_number=1, location_type='W')
+        UserLocationAssignment.objects.create(user=self.standard, location=self.branch)
+        UserLocationAssignment.objects.create(user=self.mechanic, location=self.workshop)
+        manufacturer = Manufacturer.objects.create(name='DODGE')
+        self.vehicle = Vehicle.objects.create(vin='5GZCZ63B93S896664', vehicle_type='PC', year=2018, vehicle_model="SRT Hellcat",
+                                              fuel_type='P', availability='U', location=self.branch, manufacturer=manufacturer)
+        self.vehicle2 = Vehicle.objects.create(vin='5GZCZ63B93S896665', vehicle_type='PC', year=2019, vehicle_model="Charger",
+                                               fuel_type='P', availability='A', manufacturer=manufacturer)
+        old_report = FailureReport.objects.create(vehicle=self.vehicle, title='Old failure', description='Already resolved',
+                                                  report_author=self.standard, status='R', workshop=self.workshop2, managed_by=self.manager)
+        self.failure_report = FailureReport.objects.create(vehicle=self.vehicle, title='Engine failure', description='Engine is not starting',
+                                                           report_author=self.standard, status='A', workshop=self.workshop, managed_by=self.manager)
+        other_report = FailureReport.objects.create(vehicle=self.vehicle2, title='Brakes', description='Brakes are squeaking',
+                                                    report_author=self.standard, status='A', workshop=self.workshop2)
+        self.history_repair = RepairReport.objects.create(failure_report=old_report, cost=100, status='H')
+        self.repair_report = RepairReport.objects.create(failure_report=self.failure_report, cost=0, status='A')
+        self.other_repair = RepairReport.objects.create(failure_report=other_report, cost=0, status='A')
+
+    def get(self, user, url_name, ids):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get(reverse(url_name), {'ids': ','.join(str(pk) for pk in ids)})
+
+    def test_vehicles_are_returned_in_requested_order_with_one_query(self):
+        missing_id = uuid.uuid4()
+        with self.assertNumQueries(1):
+            response = self.get(self.admin, 'vehicle-batch', [self.vehicle2.pk, missing_id, self.vehicle.pk])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([vehicle['id'] for vehicle in response.json()['results']], [str(self.vehicle2.pk), str(self.vehicle.pk)])
+        self.assertEqual(response.json()['results'][0]['manufacturer']['name'], 'DODGE')
+        self.assertEqual(response.json()['not_found'], [str(missing_id)])
+
+    def test_vehicles_are_scoped_like_detail_view(self):
+        response = self.get(self.standard, 'vehicle-batch', [self.vehicle.pk, self.vehicle2.pk])
+        self.assertEqual([vehicle['id'] for vehicle in response.json()['results']], [str(self.vehicle.pk)])
+        self.assertEqual(response.json()['not_found'], [str(self.vehicle2.pk)])
+        response = self.get(self.mechanic, 'vehicle-batch', [self.vehicle.pk, self.vehicle2.pk])
+        self.assertEqual([vehicle['id'] for vehicle in response.json()['results']], [str(self.vehicle.pk)])
+
+    def test_users_are_scoped_like_detail_view(self):
+        with self.assertNumQueries(2):
+            response = self.get(self.standard, 'user-batch', [self.standard.pk, self.standard2.pk, self.admin.pk])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([user['id'] for user in response.json()['results']], [str(self.standard.pk)])
+        self.assertEqual(response.json()['results'][0]['user_location_assignment']['location']['id'], str(self.branch.pk))
+        response = self.get(self.manager, 'user-batch', [self.standard.pk, self.standard2.pk, self.admin.pk])
+        self.assertEqual([user['id'] for user in response.json()['results']], [str(self.standard.pk), str(self.standard2.pk)])
+        self.assertEqual(response.json()['not_found'], [str(self.admin.pk)])
+
+    def test_failure_reports_are_available_only_for_managers_and_admins(self):
+        response = self.get(self.manager, 'failure-report-batch', [self.failure_report.pk])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['results'][0]['vehicle']['id'], str(self.vehicle.pk))
+        response = self.get(self.standard, 'failure-report-batch', [self.failure_report.pk])
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_repair_reports_are_scoped_like_detail_view(self):
+        ids = [self.repair_report.pk, self.history_repair.pk, self.other_repair.pk]
+        response = self.get(self.mechanic, 'repair-report-batch', ids)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([report['id'] for report in response.json()['results']], [str(self.repair_report.pk), str(self.history_repair.pk)])
+        self.assertEqual(response.json()['not_found'], [str(self.other_repair.pk)])
+        response = self.get(self.manager, 'repair-report-batch', ids)
+        self.assertEqual([report['id'] for report in response.json()['results']], [str(self.repair_report.pk), str(self.history_repair.pk)])
+
+    def test_invalid_ids_and_too_many_ids_are_rejected(self):
+        response = self.get(self.admin, 'vehicle-batch', [self.vehicle.pk, 'not-a-uuid'])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('not-a-uuid', str(response.json()))
+        with self.settings(BATCH_LOOKUP_MAX_SIZE=1):
+            response = self.get(self.admin, 'vehicle-batch', [self.vehicle.pk, self.vehicle2.pk])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_endpoint_does_not_accept_modifications(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.patch(reverse('vehicle-batch'), {'vehicle_model': 'Challenger'})
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
@@ -0,0 +1,23 @@
+from django.test import TestCase, tag
+from django.urls import URLPattern
+
+from MechanicallyApp import urls
+from MechanicallyApp.benchmark_services import BENCHMARK_CASES, run_benchmarks, find_regressions, \
+    find_scaling_regressions, load_baseline, BENCHMARK_BASELINE_PATH
+
+
+@tag('benchmark')
+class EndpointBenchmarkTestCase(TestCase):
+    def test_every_url_has_benchmark_case(self):
+        url_names = {pattern.name for pattern in urls.urlpatterns if isinstance(pattern, URLPattern)}
+        self.assertEqual(url_names - {case.url_name for case in BENCHMARK_CASES}, set())
+
+    def test_endpoints_do_not_cross_baseline_query_counts(self):
+        results = run_benchmarks(sizes=(60, 120), repeat=1)
+        self.assertEqual(find_scaling_regressions(results), [])
+        self.assertEqual(find_regressions(results[120], load_baseline(BENCHMARK_BASELINE_PATH)), [])
+
+    def test_status_change_is_reported_as_regression(self):
+        results = {'GET vehicle-detail mechanic': {'status': 404, 'queries': 3}}
+        baseline = {'GET vehicle-detail mechanic': {'status': 200, 'queries': 5}}
+        self.assertEqual(find_regressions(results, baseline), ['GET vehicle-detail mechanic: status 404, baseline 200'])
@@ -0,0 +1,91 @@
+import hashlib
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from MechanicallyApp.breached_password_services import build_breached_password_file, is_password_breached, RECORD_SIZE
+from MechanicallyApp.checks import check_breached_password_database
+from MechanicallyApp.models import User
+
+BREACHED_PASSWORD = 'Kaliniak1234562134'
+
+
+def sha1_line(password, count=10):
+    return f'{hashlib.sha1(password.encode()).hexdigest().upper()}:{count}\n'
+
+
+class BreachedPasswordTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'breached_passwords.bin')
+        self.lines = [sha1_line(f'password{i}') for i in range(20)] + [sha1_line(BREACHED_PASSWORD), sha1_line('password3'),
+                                                                        'not a hash\n', '\n', sha1_line('rarely-used', count=1)]
+        build_breached_password_file(self.lines, self.path, min_count=2, chunk_size=4)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_file_contains_sorted_unique_digests(self):
+        with open(self.path, 'rb') as file:
+            content = file.read()
+        records = [content[offset:offset + RECORD_SIZE] for offset in range(0, len(content), RECORD_SIZE)]
+        self.assertEqual(len(records), 21)
+        self.assertEqual(records, sorted(set(records)))
+
+    def test_lookup_finds_only_breached_passwords(self):
+        self.assertTrue(is_password_breached(BREACHED_PASSWORD, self.path))
+        self.assertTrue(is_password_breached('password0', self.path))
+        self.assertTrue(is_password_breached('password19', self.path))
+        self.assertFalse(is_password_breached('rarely-used', self.path))
+        self.assertFalse(is_password_breached('Wykopanyziemniak21', self.path))
+
+    def test_rebuilt_file_is_picked_up_by_running_process(self):
+        self.assertFalse(is_password_breached('Wykopanyziemniak21', self.path))
+        build_breached_password_file(self.lines + [sha1_line('Wykopanyziemniak21')], self.path)
+        self.assertTrue(is_password_breached('Wykopanyziemniak21', self.path))
+
+    def test_validator_rejects_breached_password(self):
+        with override_settings(BREACHED_PASSWORDS_PATH=self.path):
+            with self.assertRaisesMessage(DjangoValidationError, 'This password has appeared in a data breach and cannot be used.'):
+                validate_password(BREACHED_PASSWORD)
+            validate_password('Wykopanyziemniak21')
+
+    def test_validator_allows_passwords_when_database_is_missing(self):
+        with override_settings(BREACHED_PASSWORDS_PATH=os.path.join(self.directory.name, 'missing.bin')):
+            with self.assertLogs('MechanicallyApp.passwords', level='WARNING'):
+                validate_password(BREACHED_PASSWORD)
+
+    def test_password_change_rejects_breached_password(self):
+        user = User.objects.create_user(first_name="Jan", last_name="Nowak", username="jannow1111", email="testowy@gmail.com",
+                                        password="test123456789", role="standard", phone_number="987654321", is_new_account=False)
+        client = APIClient()
+        client.force_authenticate(user)
+        with override_settings(BREACHED_PASSWORDS_PATH=self.path):
+            response = client.post(reverse('user-password-change'), {'old_password': 'test123456789', 'new_password': BREACHED_PASSWORD,
+                                                                     'confirm_password': BREACHED_PASSWORD})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('data breach', str(response.json()))
+
+    def test_build_command_reports_written_hashes(self):
+        source = os.path.join(self.directory.name, 'pwned-passwords.txt')
+        with open(source, 'w') as file:
+            file.writelines(self.lines)
+        output = os.path.join(self.directory.name, 'command.bin')
+        out = StringIO()
+        call_command('build_breached_password_file', source, output=output, min_count=2, stdout=out)
+        self.assertIn('Wrote 21 hashes', out.getvalue())
+        self.assertEqual(os.path.getsize(output), 21*RECORD_SIZE)
+
+    def test_deploy_check_reports_missing_database(self):
+        with override_settings(BREACHED_PASSWORDS_PATH=os.path.join(self.directory.name, 'missing.bin')):
+            errors = check_breached_password_database(None)
+        self.assertEqual([error.id for error in errors], ['MechanicallyApp.E001'])
+        with override_settings(BREACHED_PASSWORDS_PATH=self.path):
+            self.assertEqual(check_breached_password_database(None), [])
@@ -0,0 +1,106 @@
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from MechanicallyApp.auth_services import get_user_snapshot
+from MechanicallyApp.models import User, Manufacturer
+
+
+class CachedAuthenticationTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        shared_cache = override_settings(CACHES={**settings.CACHES, 'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory.name}})
+        shared_cache.enable()
+        self.addCleanup(shared_cache.disable)
+        cache.clear()
+        self.admin = User.objects.create_user(first_name="Piotr", last_name="Testowy", username="piotes1111", email="testowy@gmail.com",
+                                              password="test1234", role="admin", phone_number="987654321", is_new_account=False)
+        self.manager = User.objects.create_user(first_name="Szymon", last_name="Chasowski", username="szycha1111", email="testowy2@gmail.com",
+                                                password="test1234", role="manager", phone_number="987654322", is_new_account=False)
+        self.manufacturer = Manufacturer.objects.create(name='DODGE')
+
+    def login(self, user):
+        client = APIClient()
+        self.assertTrue(client.login(username=user.username, password='test1234'))
+        return client
+
+    def user_queries(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        return response, [query['sql'] for query in context.captured_queries if User._meta.db_table in query['sql']]
+
+    def test_authenticated_requests_do_not_query_user_table(self):
+        client = self.login(self.manager)
+        url = reverse('manufacturer-detail', kwargs={'pk': self.manufacturer.pk})
+        client.get(url)
+        response, queries = self.user_queries(client, url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(queries, [])
+
+    def test_snapshot_contains_only_fields_needed_for_authorization(self):
+        snapshot = get_user_snapshot(str(self.manager.pk))
+        self.assertEqual(set(snapshot), {'id', 'role', 'is_superuser', 'is_active', 'session_auth_hash'})
+        self.assertEqual(snapshot['session_auth_hash'], self.manager.get_session_auth_hash())
+
+    def test_deactivation_takes_effect_immediately(self):
+        client = self.login(self.manager)
+        url = reverse('manufacturer-detail', kwargs={'pk': self.manufacturer.pk})
+        self.assertEqual(client.get(url).status_code, status.HTTP_200_OK)
+        admin_client = self.login(self.admin)
+        response = admin_client.post(reverse('user-status', kwargs={'pk': self.manager.pk}), {'status': 'inactive'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_role_change_takes_effect_immediately(self):
+        client = self.login(self.manager)
+        self.assertEqual(client.get(reverse('fleet-dashboard')).status_code, status.HTTP_200_OK)
+        self.manager.role = 'standard'
+        self.manager.save()
+        self.assertEqual(client.get(reverse('fleet-dashboard')).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_password_change_logs_out_other_sessions(self):
+        client = self.login(self.manager)
+        other_client = self.login(self.manager)
+        response = client.post(reverse('user-password-change'), {'old_password': 'test1234', 'new_password': 'Kaliniak1234562134',
+                                                                 'confirm_password': 'Kaliniak1234562134'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(other_client.get(reverse('fleet-dashboard')).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_remaining_user_fields_are_loaded_on_demand(self):
+        client = self.login(self.manager)
+        response = client.get(reverse('user-profile'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['email'], 'testowy2@gmail.com')
+
+    def test_evicted_version_does_not_revive_stale_snapshot(self):
+        self.assertTrue(get_user_snapshot(str(self.manager.pk))['is_active'])
+        self.manager.is_active = False
+        self.manager.save()
+        cache.delete(f'user_snapshot:{self.manager.pk}:version')
+        self.assertFalse(get_user_snapshot(str(self.manager.pk))['is_active'])
+
+    def test_process_local_cache_reads_user_from_database(self):
+        client = self.login(self.manager)
+        url = reverse('manufacturer-detail', kwargs={'pk': self.manufacturer.pk})
+        with override_settings(CACHES={**settings.CACHES, 'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            client.get(url)
+            response, queries = self.user_queries(client, url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 1)
+
+    def test_sessions_created_with_model_backend_remain_valid(self):
+        client = self.login(self.manager)
+        session = client.session
+        session[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+        session.save()
+        response = client.get(reverse('manufacturer-detail', kwargs={'pk': self.manufacturer.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,72 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from MechanicallyApp.models import User, Vehicle, FailureReport, RepairReport
+from MechanicallyApp.seed_services import seed_fleet
+
+
+class FleetDashboardTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        seed_fleet(vehicles=60, seed=3)
+        self.admin=User.objects.filter(role='admin').order_by('username').first()
+        self.manager=User.objects.filter(role='manager', managed_failure_reports__repair_report__isnull=False).distinct().order_by('username').first()
+        self.standard=User.objects.filter(role='standard').order_by('username').first()
+
+    def get_dashboard(self, user):
+        client=APIClient()
+        client.force_authenticate(user)
+        return client.get(reverse('fleet-dashboard'))
+
+    def test_admin_dashboard_counts_match_database(self):
+        with self.assertNumQueries(3):
+            response=self.get_dashboard(self.admin)
+        assert response.status_code == status.HTTP_200_OK
+        dashboard=response.json()
+        self.assertEqual(dashboard['vehicles']['total'], Vehicle.objects.count())
+        for location in dashboard['vehicles']['by_location']:
+            vehicles=Vehicle.objects.filter(location_id=location['location'])
+            self.assertEqual(location['total'], vehicles.count())
+            self.assertEqual(location['availability'], {availability: vehicles.filter(availability=availability).count()
+                                                        for availability in set(vehicles.values_list('availability', flat=True))})
+            self.assertEqual(sum(location['fuel_type'].values()), location['total'])
+            self.assertEqual(sum(location['vehicle_type'].values()), location['total'])
+        self.assertEqual(dashboard['failure_reports']['total'], FailureReport.objects.count())
+        for workshop in dashboard['failure_reports']['by_workshop']:
+            for report_status, count in workshop['status'].items():
+                self.assertEqual(count, FailureReport.objects.filter(workshop_id=workshop['workshop'], status=report_status).count())
+        self.assertEqual(dashboard['repair_reports']['status'], {report_status: RepairReport.objects.filter(status=report_status).count()
+                                                                 for report_status in set(RepairReport.objects.values_list('status', flat=True))})
+
+    def test_manager_dashboard_counts_only_repair_reports_of_managed_failure_reports(self):
+        response=self.get_dashboard(self.manager)
+        assert response.status_code == status.HTTP_200_OK
+        dashboard=response.json()
+        self.assertEqual(dashboard['repair_reports']['total'], RepairReport.objects.filter(failure_report__managed_by=self.manager).count())
+        self.assertLess(dashboard['repair_reports']['total'], RepairReport.objects.count())
+        self.assertEqual(dashboard['vehicles']['total'], Vehicle.objects.count())
+
+    def test_dashboard_is_cached(self):
+        self.get_dashboard(self.admin)
+        with self.assertNumQueries(0):
+            response=self.get_dashboard(self.admin)
+        assert response.status_code == status.HTTP_200_OK
+        self.assertEqual(response.json()['vehicles']['total'], Vehicle.objects.count())
+
+    @override_settings(DASHBOARD_CACHE_TIMEOUT=0)
+    def test_dashboard_is_not_cached_when_timeout_is_zero(self):
+        self.get_dashboard(self.admin)
+        with self.assertNumQueries(3):
+            self.get_dashboard(self.admin)
+
+    def test_standard_user_cannot_read_dashboard(self):
+        response=self.get_dashboard(self.standard)
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_dashboard_rejects_options(self):
+        client=APIClient()
+        client.force_authenticate(self.admin)
+        response=client.options(reverse('fleet-dashboard'))
+        assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
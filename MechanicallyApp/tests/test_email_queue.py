@@ -0,0 +1,102 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from MechanicallyApp.mail_services import queue_email, send_queued_emails
+from MechanicallyApp.models import QueuedEmail
+
+
+class EmailQueueTestCase(TestCase):
+    def test_queued_emails_are_sent_in_one_batch(self):
+        for i in range(3):
+            queue_email('Temat', 'Treść wiadomości', f'testowy{i}@gmail.com')
+        self.assertEqual(len(mail.outbox), 0)
+
+        call_command('send_queued_emails')
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(QueuedEmail.objects.filter(status='S').count(), 3)
+        self.assertFalse(QueuedEmail.objects.filter(sent_date__isnull=True).exists())
+
+    def test_batch_size_limits_number_of_sent_emails(self):
+        for i in range(3):
+            queue_email('Temat', 'Treść wiadomości', f'testowy{i}@gmail.com')
+
+        self.assertEqual(send_queued_emails(batch_size=2), 2)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(QueuedEmail.objects.filter(status='P').count(), 1)
+
+    def test_emails_scheduled_in_future_are_not_sent(self):
+        queued_email = queue_email('Temat', 'Treść wiadomości', 'testowy@gmail.com')
+        QueuedEmail.objects.filter(pk=queued_email.pk).update(next_attempt_date=timezone.now() + timedelta(minutes=5))
+
+        self.assertEqual(send_queued_emails(), 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_failed_email_is_retried_with_backoff(self):
+        queued_email = queue_email('Temat', 'Treść wiadomości', 'testowy@gmail.com')
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError('Connection refused')):
+            self.assertEqual(send_queued_emails(), 0)
+        queued_email.refresh_from_db()
+        self.assertEqual(queued_email.status, 'P')
+        self.assertEqual(queued_email.attempts, 1)
+        self.assertEqual(queued_email.last_error, 'Connection refused')
+        self.assertGreater(queued_email.next_attempt_date, timezone.now())
+
+    def test_email_is_marked_as_failed_after_max_attempts(self):
+        queued_email = queue_email('Temat', 'Treść wiadomości', 'testowy@gmail.com')
+        QueuedEmail.objects.filter(pk=queued_email.pk).update(attempts=4)
+        with self.settings(EMAIL_QUEUE_MAX_ATTEMPTS=5), \
+                mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError('Connection refused')):
+            send_queued_emails()
+        queued_email.refresh_from_db()
+        self.assertEqual(queued_email.status, 'F')
+        self.assertEqual(queued_email.attempts, 5)
+
+    def test_connection_failure_is_recorded_for_whole_batch(self):
+        for i in range(2):
+            queue_email('Temat', 'Treść wiadomości', f'testowy{i}@gmail.com')
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.open', side_effect=OSError('Connection refused')):
+            self.assertEqual(send_queued_emails(), 0)
+        self.assertEqual(len(mail.outbox), 0)
+        for queued_email in QueuedEmail.objects.all():
+            self.assertEqual((queued_email.status, queued_email.attempts, queued_email.last_error), ('P', 1, 'Connection refused'))
+            self.assertGreater(queued_email.next_attempt_date, timezone.now())
+
+    def test_claimed_emails_are_not_sent_by_another_worker(self):
+        queue_email('Temat', 'Treść wiadomości', 'testowy@gmail.com')
+        concurrent_results = []
+        send = mail.EmailMessage.send
+        def send_while_another_worker_polls(message, *args, **kwargs):
+            concurrent_results.append(send_queued_emails())
+            return send(message, *args, **kwargs)
+        with mock.patch('django.core.mail.EmailMessage.send', autospec=True, side_effect=send_while_another_worker_polls):
+            self.assertEqual(send_queued_emails(), 1)
+        self.assertEqual(concurrent_results, [0])
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_sent_email_message_is_cleared(self):
+        queued_email = queue_email('Temat', 'token=abc', 'testowy@gmail.com')
+        send_queued_emails()
+        queued_email.refresh_from_db()
+        self.assertEqual((queued_email.status, queued_email.message), ('S', ''))
+        self.assertEqual(mail.outbox[0].body, 'token=abc')
+
+    def test_purge_deletes_old_sent_and_failed_emails(self):
+        old_sent = queue_email('Temat', 'Treść wiadomości', 'testowy1@gmail.com')
+        old_failed = queue_email('Temat', 'Treść wiadomości', 'testowy2@gmail.com')
+        old_pending = queue_email('Temat', 'Treść wiadomości', 'testowy3@gmail.com')
+        recent_sent = queue_email('Temat', 'Treść wiadomości', 'testowy4@gmail.com')
+        QueuedEmail.objects.filter(pk=old_sent.pk).update(status='S', created_date=timezone.now() - timedelta(days=40))
+        QueuedEmail.objects.filter(pk=old_failed.pk).update(status='F', created_date=timezone.now() - timedelta(days=40))
+        QueuedEmail.objects.filter(pk=old_pending.pk).update(created_date=timezone.now() - timedelta(days=40),
+                                                            next_attempt_date=timezone.now() + timedelta(days=1))
+        QueuedEmail.objects.filter(pk=recent_sent.pk).update(status='S')
+        out = StringIO()
+        call_command('send_queued_emails', purge_older_than=30, stdout=out)
+        self.assertIn('Deleted 2 sent and failed emails.', out.getvalue())
+        self.assertEqual(set(QueuedEmail.objects.values_list('pk', flat=True)), {old_pending.pk, recent_sent.pk})
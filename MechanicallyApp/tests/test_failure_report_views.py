@@ -1,10 +1,17 @@
+from unittest import mock
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from MechanicallyApp.models import User, Manufacturer, Vehicle, Location, UserLocationAssignment, FailureReport, \
     RepairReport, City
 from rest_framework import status
 from django.urls import reverse
 from rest_framework.test import APIClient
 
+from MechanicallyApp.concurrency import update_versioned
+from MechanicallyApp.pagination import FailureReportCursorPagination
+
 
 class FailureReportTestCase(TestCase):
     def setUp(self):
@@ -403,6 +410,73 @@ class FailureReportTestCase(TestCase):
         failure_reports = response.json()
         self.assertEqual(len(failure_reports), 4)
 
+    def test_failure_report_list_is_paginated_with_cursor(self):
+        client = APIClient()
+        client.force_authenticate(self.manager)
+
+        response = client.get(reverse('failure-report-list'), {'page_size': 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first_page = response.json()
+        self.assertEqual(len(first_page), 3)
+        self.assertIn('rel="next"', response['Link'])
+
+        next_link = response['Link'].split(';')[0].strip('<>')
+        response = client.get(next_link)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        second_page = response.json()
+        self.assertEqual(len(second_page), 1)
+        self.assertNotIn('rel="next"', response['Link'])
+        self.assertIn('rel="prev"', response['Link'])
+        ids = [report['id'] for report in first_page + second_page]
+        self.assertEqual(len(set(ids)), 4)
+
+    def test_failure_report_list_is_paginated_by_default(self):
+        client = APIClient()
+        client.force_authenticate(self.manager)
+
+        with mock.patch.object(FailureReportCursorPagination, 'page_size', 2):
+            response = client.get(reverse('failure-report-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 2)
+        self.assertIn('rel="next"', response['Link'])
+
+    def test_failure_report_list_all_returns_one_page_of_max_size(self):
+        client = APIClient()
+        client.force_authenticate(self.manager)
+
+        with mock.patch.object(FailureReportCursorPagination, 'page_size', 2):
+            response = client.get(reverse('failure-report-list'), {'all': 1})
+        self.assertEqual(len(response.json()), 4)
+        with self.settings(PAGINATION_MAX_PAGE_SIZE=3):
+            response = client.get(reverse('failure-report-list'), {'all': 1})
+        self.assertEqual(len(response.json()), 3)
+
+    def test_failure_report_list_page_size_is_capped(self):
+        client = APIClient()
+        client.force_authenticate(self.manager)
+
+        with self.settings(PAGINATION_MAX_PAGE_SIZE=2):
+            response = client.get(reverse('failure-report-list'), {'page_size': 1000})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 2)
+
+    def test_failure_report_list_query_count_does_not_grow_with_rows(self):
+        client = APIClient()
+        client.force_authenticate(self.manager)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse('failure-report-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        initial_query_count = len(queries)
+
+        for vehicle in (self.vehicle2, self.vehicle4, self.vehicle5):
+            FailureReport.objects.create(vehicle=vehicle, title="Engine failure", description="Engine is not starting properly",
+                                         report_author=self.standard, status='P')
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse('failure-report-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 7)
+        self.assertEqual(len(queries), initial_query_count)
+
     def test_manager_can_retrieve_failure_report(self):
         client = APIClient()
         client.force_authenticate(self.manager)
@@ -497,6 +571,7 @@ class FailureReportTestCase(TestCase):
         # Check that failure report was updated
         failure_report = FailureReport.objects.get(id=self.failure_report1.id)
         self.assertEqual(failure_report.status, 'D')  # DISMISSED
+        self.assertEqual(failure_report.version, self.failure_report1.version + 1)
 
     def test_manager_cannot_dismiss_failure_report_not_managed_by_himself(self):
         client = APIClient()
@@ -533,6 +608,24 @@ class FailureReportTestCase(TestCase):
         self.assertEqual(veh.availability,'A')
         self.assertIn('Failure report has been resolved.',str(response.json()))
 
+    def test_resolving_failure_report_reads_one_row_and_updates_only_changed_columns(self):
+        client = APIClient()
+        client.force_authenticate(self.manager)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(reverse('failure-report-action',kwargs={'pk':self.failure_report4.pk}),data={
+                "action":"resolve"
+            })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        statements = [query['sql'] for query in queries.captured_queries]
+        selects = [sql for sql in statements if sql.startswith('SELECT')]
+        updates = [sql for sql in statements if sql.startswith('UPDATE') and 'repaircostrollup' not in sql]
+        #drugi SELECT odczytuje tylko koszt naprawy i klucze potrzebne do wiersza RepairCostRollup
+        self.assertEqual(len(selects), 2)
+        self.assertIn('"cost"', selects[1])
+        self.assertNotIn('"condition_analysis"', selects[1])
+        self.assertEqual(len(updates), 3)
+        self.assertNotIn('"description"', ' '.join(updates))
+
     def test_manager_cannot_resolve_failure_report_managed_by_other_manager(self):
         client = APIClient()
         client.force_authenticate(self.manager2)
@@ -558,6 +651,7 @@ class FailureReportTestCase(TestCase):
         response = client.post(reverse('failure-report-action', kwargs={'pk': self.failure_report4.pk}),data={"action":"resolve"})
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('Repair report is not in READY status.', str(response.json()))
+        self.assertEqual(FailureReport.objects.get(pk=self.failure_report4.pk).status, 'A')
         self.repair_report3.status = 'R'
         self.repair_report3.save()
 
@@ -644,6 +738,27 @@ class FailureReportTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('Failure report is already managed by another manager.', str(response.json()))
 
+    def test_concurrent_obtain_of_failure_report_returns_conflict(self):
+        failure_report=FailureReport.objects.create(
+            vehicle=self.vehicle2,
+            title="Engine failure",
+            description="Engine is not starting properly",
+            report_author=self.standard,
+            status='P')
+        stale_failure_report=FailureReport.objects.get(pk=failure_report.pk)
+        update_versioned(failure_report, managed_by=self.manager)
+
+        client = APIClient()
+        client.force_authenticate(self.manager2)
+        with mock.patch.object(FailureReport.objects, 'get', return_value=stale_failure_report):
+            response=client.post(reverse('failure-report-management',kwargs={'pk':failure_report.pk}), data={
+                "action":"obtain"
+            })
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        failure_report = FailureReport.objects.get(id=failure_report.id)
+        self.assertEqual(failure_report.managed_by, self.manager)
+        self.assertEqual(failure_report.version, 1)
+
     def test_manager_cannot_manage_resolved_failure_report(self):
         client = APIClient()
         client.force_authenticate(self.manager2)
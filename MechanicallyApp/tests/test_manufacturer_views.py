@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.test import TestCase
 from MechanicallyApp.models import User, Manufacturer
 from rest_framework import status
@@ -82,4 +83,34 @@ class ManufacturerTestCase(TestCase):
         response=client.delete(reverse('manufacturer-detail', kwargs={'pk': manufacturer.pk}))
         assert response.status_code == status.HTTP_204_NO_CONTENT
         response2=client.get(reverse('manufacturer-detail', kwargs={'pk': manufacturer.pk}))
-        assert response2.status_code == status.HTTP_404_NOT_FOUND
\ No newline at end of file
+        assert response2.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_manufacturer_list_is_served_from_cache(self):
+        cache.clear()
+        user=User.objects.get(username="jannow1111")
+        client=APIClient()
+        client.force_authenticate(user)
+        response=client.get(reverse('manufacturer-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            cached_response=client.get(reverse('manufacturer-list'))
+        self.assertEqual(cached_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(cached_response.json(), response.json())
+
+    def test_manufacturer_list_cache_is_invalidated_on_change(self):
+        cache.clear()
+        standard=User.objects.get(username="jannow1111")
+        admin=User.objects.get(username="piotes1111")
+        client=APIClient()
+        client.force_authenticate(standard)
+        self.assertEqual(len(client.get(reverse('manufacturer-list')).json()), 3)
+        self.assertEqual(len(client.get(reverse('manufacturer-list'), {'page_size': 1}).json()), 1)
+
+        admin_client=APIClient()
+        admin_client.force_authenticate(admin)
+        admin_client.post(reverse('manufacturer-list'), {'name': 'FORD'})
+        self.assertEqual(len(client.get(reverse('manufacturer-list')).json()), 4)
+
+        manufacturer=Manufacturer.objects.get(name='FORD')
+        admin_client.delete(reverse('manufacturer-detail', kwargs={'pk': manufacturer.pk}))
+        self.assertEqual(len(client.get(reverse('manufacturer-list')).json()), 3)
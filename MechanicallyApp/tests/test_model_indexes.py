@@ -0,0 +1,32 @@
+from django.test import TestCase
+from MechanicallyApp.models import User, Manufacturer, Vehicle, Location, FailureReport, City
+
+
+class ModelIndexTestCase(TestCase):
+    def setUp(self):
+        self.standard = User.objects.create_user(first_name="Jan", last_name="Nowak", username="jannow1111",
+                                                 email="testowy2@gmail.com", password="test1234", role="standard",
+                                                 phone_number="987654322", is_new_account=False)
+        self.city = City.objects.create(name='Szczecin')
+        self.man = Manufacturer.objects.create(name='MAN')
+        self.branch = Location.objects.create(name='SIEDZIBA', phone_number='123456789', email="test@gmail.com",
+                                              city=self.city, street_name='Parkowa', building_number=1, location_type='B')
+        self.workshop = Location.objects.create(name='WARSZTAT', phone_number='133456789', email="test2@gmail.com",
+                                                city=self.city, street_name='Parkowa', building_number=1, location_type='W')
+        self.vehicle = Vehicle.objects.create(vin='5GZCZ63B93S896564', vehicle_type='CO', year=2019,
+                                              vehicle_model="Lion City", fuel_type='D', availability='A',
+                                              location=self.branch, manufacturer=self.man)
+        FailureReport.objects.create(vehicle=self.vehicle, title="Brake issue", description="Brakes are making noise",
+                                     report_author=self.standard, status='A', workshop=self.workshop)
+
+    def test_open_failure_report_check_uses_vehicle_status_index(self):
+        plan = FailureReport.objects.filter(vehicle_id=self.vehicle.id, status__in=['P', 'A', 'S']).explain()
+        self.assertIn('failure_vehicle_status_idx', plan)
+
+    def test_workshop_failure_reports_use_workshop_status_index(self):
+        plan = FailureReport.objects.filter(workshop_id=self.workshop.id, status='A').explain()
+        self.assertIn('failure_workshop_status_idx', plan)
+
+    def test_branch_vehicles_by_availability_use_location_availability_index(self):
+        plan = Vehicle.objects.filter(location_id=self.branch.id, availability='A').explain()
+        self.assertIn('vehicle_location_avail_idx', plan)
@@ -0,0 +1,123 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from MechanicallyApp import analytics_services
+from MechanicallyApp.analytics_services import record_repair_cost
+from MechanicallyApp.models import User, RepairReport, RepairCostRollup, FailureReport
+from MechanicallyApp.seed_services import seed_fleet
+
+
+class RepairCostAnalyticsTestCase(TestCase):
+    def setUp(self):
+        seed_fleet(vehicles=60, seed=5)
+        self.admin=User.objects.filter(role='admin').order_by('username').first()
+        self.standard=User.objects.filter(role='standard').order_by('username').first()
+
+    def get_analytics(self, user, **params):
+        client=APIClient()
+        client.force_authenticate(user)
+        return client.get(reverse('repair-cost-analytics'), params)
+
+    def test_backfill_matches_historic_repair_reports(self):
+        historic=RepairReport.objects.filter(status='H')
+        self.assertTrue(historic.exists())
+        rollups=RepairCostRollup.objects.aggregate(repair_count=Sum('repair_count'), total_cost=Sum('total_cost'))
+        self.assertEqual(rollups['repair_count'], historic.count())
+        self.assertEqual(rollups['total_cost'], historic.aggregate(total_cost=Sum('cost'))['total_cost'])
+
+    def test_resolving_failure_report_adds_repair_cost_to_rollup(self):
+        repair_report=RepairReport.objects.filter(status='R', failure_report__status='A', failure_report__managed_by__isnull=False)\
+            .select_related('failure_report').order_by('id').first()
+        failure_report=repair_report.failure_report
+        RepairReport.objects.filter(pk=repair_report.pk).update(cost=Decimal('123.45'))
+        client=APIClient()
+        client.force_authenticate(failure_report.managed_by)
+        response=client.post(reverse('failure-report-action', kwargs={'pk': failure_report.pk}), data={'action': 'resolve'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        rollup=RepairCostRollup.objects.get(day=timezone.localdate(), vehicle_id=failure_report.vehicle_id, workshop_id=failure_report.workshop_id)
+        self.assertEqual(rollup.repair_count, 1)
+        self.assertEqual(rollup.total_cost, Decimal('123.45'))
+        self.assertEqual(rollup.manufacturer_id, failure_report.vehicle.manufacturer_id)
+
+    def test_admin_can_read_repair_costs_by_manufacturer(self):
+        with self.assertNumQueries(2):
+            response=self.get_analytics(self.admin, group_by='manufacturer')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        summary=response.json()
+        expected=RepairReport.objects.filter(status='H').values('failure_report__vehicle__manufacturer_id')\
+            .annotate(total_cost=Sum('cost'))
+        expected={str(row['failure_report__vehicle__manufacturer_id']): row['total_cost'] for row in expected}
+        self.assertEqual({row['key']: Decimal(row['total_cost']) for row in summary['results']}, expected)
+        costs=[Decimal(row['total_cost']) for row in summary['results']]
+        self.assertEqual(costs, sorted(costs, reverse=True))
+        self.assertEqual(Decimal(summary['total_cost']), sum(expected.values()))
+
+    def test_repair_costs_by_month_respect_date_range(self):
+        date_from=timezone.localdate()-timedelta(days=120)
+        response=self.get_analytics(self.admin, group_by='month', date_from=date_from.isoformat())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        summary=response.json()
+        expected=RepairCostRollup.objects.filter(day__gte=date_from).aggregate(repair_count=Sum('repair_count'))['repair_count'] or 0
+        self.assertEqual(summary['repair_count'], expected)
+        self.assertEqual(sum(row['repair_count'] for row in summary['results']), expected)
+        self.assertTrue(all(row['key'] >= date_from.replace(day=1).isoformat() for row in summary['results']))
+
+    def test_repair_costs_by_vehicle_are_limited(self):
+        response=self.get_analytics(self.admin, group_by='vehicle', limit=2)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()['results']), 2)
+
+    def test_invalid_grouping_is_rejected(self):
+        response=self.get_analytics(self.admin, group_by='city')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_standard_user_cannot_read_repair_costs(self):
+        response=self.get_analytics(self.standard)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_backfill_command_since_date_keeps_older_rollups(self):
+        since=timezone.localdate()-timedelta(days=30)
+        older=RepairCostRollup.objects.filter(day__lt=since)
+        older_ids=set(older.values_list('id', flat=True))
+        RepairCostRollup.objects.filter(day__gte=since).delete()
+        call_command('backfill_repair_cost_rollups', '--since', since.isoformat(), stdout=StringIO())
+        self.assertEqual(set(RepairCostRollup.objects.filter(day__lt=since).values_list('id', flat=True)), older_ids)
+        self.assertEqual(RepairCostRollup.objects.aggregate(total_cost=Sum('total_cost'))['total_cost'],
+                         RepairReport.objects.filter(status='H').aggregate(total_cost=Sum('cost'))['total_cost'])
+
+    def test_manager_reads_only_costs_of_managed_reports(self):
+        manager=User.objects.filter(role='manager', managed_failure_reports__repair_report__status='H').order_by('username').first()
+        response=self.get_analytics(manager, group_by='vehicle', limit=1000)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        summary=response.json()
+        historic=RepairReport.objects.filter(status='H')
+        self.assertEqual(Decimal(summary['total_cost']),
+                         historic.filter(failure_report__managed_by=manager).aggregate(total_cost=Sum('cost'))['total_cost'])
+        self.assertLess(Decimal(summary['total_cost']), historic.aggregate(total_cost=Sum('cost'))['total_cost'])
+
+    def test_concurrent_rollup_creation_without_workshop_and_manager_is_merged(self):
+        repair_report=RepairReport.objects.filter(status='H').order_by('id').first()
+        FailureReport.objects.filter(pk=repair_report.failure_report_id).update(workshop=None, managed_by=None)
+        RepairCostRollup.objects.all().delete()
+        add_to_rollup=analytics_services._add_to_rollup
+        missed_updates=[0, 0]
+        #dwa pierwsze UPDATE-y nie widzą wiersza, jak dwa procesy zamykające zgłoszenia jednocześnie
+        with mock.patch.object(analytics_services, '_add_to_rollup',
+                               side_effect=lambda *args: missed_updates.pop() if missed_updates else add_to_rollup(*args)):
+            record_repair_cost(RepairReport.objects.filter(pk=repair_report.pk))
+            record_repair_cost(RepairReport.objects.filter(pk=repair_report.pk))
+        rollup=RepairCostRollup.objects.get()
+        self.assertIsNone(rollup.workshop_id)
+        self.assertIsNone(rollup.managed_by_id)
+        self.assertEqual(rollup.repair_count, 2)
+        self.assertEqual(rollup.total_cost, repair_report.cost*2)
@@ -1,4 +1,10 @@
+import csv
+import json
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from MechanicallyApp.export_services import iterate_rows
 from MechanicallyApp.models import User, Manufacturer, Vehicle, Location, UserLocationAssignment, FailureReport, \
     RepairReport, RepairReportRejection, City
 from rest_framework import status
@@ -319,6 +325,15 @@ class RepairReportTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.json()['id'],str(self.repair_report2.pk))
 
+    def test_mechanic_location_assignment_is_resolved_once_per_request(self):
+        client=APIClient()
+        client.force_authenticate(user=self.mechanic)
+        with CaptureQueriesContext(connection) as queries:
+            response=client.get(reverse('repair-report-detail',kwargs={'pk':self.repair_report2.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        assignment_queries=[query for query in queries if 'userlocationassignment' in query['sql'].lower()]
+        self.assertEqual(len(assignment_queries), 1)
+
     def test_mechanic_can_list_workshop_repair_reports(self):
         client=APIClient()
         client.force_authenticate(user=self.mechanic)
@@ -400,6 +415,8 @@ class RepairReportTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         rr=RepairReport.objects.get(pk=self.repair_report5.pk)
         self.assertEqual(rr.status,'R')
+        self.assertEqual(rr.version,self.repair_report5.version+1)
+        self.assertGreater(rr.last_change_date,self.repair_report5.last_change_date)
 
     def test_manager_can_reject_repair_report(self):
         client=APIClient()
@@ -437,6 +454,19 @@ class RepairReportTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.json()), 6)
 
+    def test_repair_report_pages_are_stable_when_reports_change(self):
+        client=APIClient()
+        client.force_authenticate(user=self.admin)
+        response = client.get(reverse('repair-report-list'), {'page_size': 2})
+        seen = [report['id'] for report in response.json()]
+        RepairReport.objects.get(pk=seen[0]).save()
+        while 'rel="next"' in response.get('Link', ''):
+            response = client.get(response['Link'].split(';')[0].strip('<>'))
+            seen += [report['id'] for report in response.json()]
+            RepairReport.objects.get(pk=seen[-1]).save()
+        self.assertEqual(len(seen), 6)
+        self.assertEqual(len(set(seen)), 6)
+
     def test_manager_can_list_all_repair_reports_he_manages(self):
         client=APIClient()
         client.force_authenticate(user=self.manager)
@@ -450,6 +480,59 @@ class RepairReportTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.json()), 1)
 
+    def test_admin_can_export_all_repair_reports_as_csv(self):
+        client=APIClient()
+        client.force_authenticate(user=self.admin)
+        response = client.get(reverse('repair-report-export'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual({row['id'] for row in rows}, {str(pk) for pk in RepairReport.objects.values_list('id', flat=True)})
+
+    def test_manager_can_export_only_repair_reports_he_manages_as_ndjson(self):
+        client=APIClient()
+        client.force_authenticate(user=self.manager2)
+        response = client.get(reverse('repair-report-export'), {'file_format': 'ndjson'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['id'], str(self.repair_report1.pk))
+        self.assertEqual(rows[0]['failure_report_title'], self.repair_report1.failure_report.title)
+
+    def test_repair_report_rejections_export_is_scoped_to_manager(self):
+        client=APIClient()
+        client.force_authenticate(user=self.manager)
+        response = client.get(reverse('repair-report-rejection-export'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(list(csv.DictReader(b''.join(response.streaming_content).decode().splitlines()))), 2)
+
+        client=APIClient()
+        client.force_authenticate(user=self.manager2)
+        response = client.get(reverse('repair-report-rejection-export'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(list(csv.DictReader(b''.join(response.streaming_content).decode().splitlines()))), 0)
+
+    def test_export_rows_are_fetched_in_keyset_batches(self):
+        with CaptureQueriesContext(connection) as queries:
+            rows = list(iterate_rows(RepairReport.objects.all(), ('id', 'status'), chunk_size=2))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(len({row[0] for row in rows}), 6)
+        self.assertEqual(len(queries), 4)
+
+    def test_export_rejects_unknown_format(self):
+        client=APIClient()
+        client.force_authenticate(user=self.admin)
+        response = client.get(reverse('failure-report-export'), {'file_format': 'xml'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_mechanic_cannot_export_repair_reports(self):
+        client=APIClient()
+        client.force_authenticate(user=self.mechanic)
+        response = client.get(reverse('repair-report-export'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
     def test_manager_can_retrieve_repair_report_he_manages(self):
         client=APIClient()
         client.force_authenticate(user=self.manager2)
@@ -457,6 +540,54 @@ class RepairReportTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.json()['id'],str(self.repair_report1.pk))
 
+    def test_repair_report_detail_supports_conditional_get(self):
+        client=APIClient()
+        client.force_authenticate(user=self.manager2)
+        url = reverse('repair-report-detail', kwargs={'pk': self.repair_report1.pk})
+        response = client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+        mechanic_client=APIClient()
+        mechanic_client.force_authenticate(user=self.mechanic)
+        mechanic_client.patch(url, data={'cost': "400"})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_repair_report_detail_etag_changes_with_nested_manufacturer(self):
+        client=APIClient()
+        client.force_authenticate(user=self.manager2)
+        url = reverse('repair-report-detail', kwargs={'pk': self.repair_report1.pk})
+        etag = client.get(url)['ETag']
+        manufacturer = self.repair_report1.failure_report.vehicle.manufacturer
+        manufacturer.name = 'RENAMED'
+        manufacturer.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['failure_report']['vehicle']['manufacturer']['name'], 'RENAMED')
+
+    def test_repair_report_rejection_list_supports_conditional_get(self):
+        client=APIClient()
+        client.force_authenticate(user=self.manager)
+        response = client.get(reverse('repair-report-rejection-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        response = client.get(reverse('repair-report-rejection-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        RepairReportRejection.objects.create(repair_report=self.repair_report5, title="rejection title3", reason="rejection reason3")
+        response = client.get(reverse('repair-report-rejection-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 3)
+
     def test_manager_cannot_retrieve_repair_report_he_not_manages(self):
         client=APIClient()
         client.force_authenticate(user=self.manager2)
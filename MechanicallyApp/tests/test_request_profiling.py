@@ -0,0 +1,115 @@
+import json
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from MechanicallyApp.metrics_services import (reset_request_metrics, histogram_percentile, collect_request_metrics, request_metrics,
+                                              RequestMetricsRegistry, DURATION_BUCKETS_MS)
+from MechanicallyApp.models import User, Manufacturer
+
+
+@override_settings(REQUEST_PROFILING_ENABLED=True, REQUEST_PROFILING_SLOW_THRESHOLD_MS=100000)
+class RequestProfilingTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_request_metrics()
+        self.admin=User.objects.create_user(first_name="Piotr", last_name="Testowy", username="piotes1111", email="testowy@gmail.com", password="test1234", role="admin", phone_number="987654321", is_new_account=False)
+        self.standard=User.objects.create_user(first_name="Jan", last_name="Nowak", username="jannow1111", email="testowy2@gmail.com", password="test1234", role="standard", phone_number="987654322", is_new_account=False)
+        Manufacturer.objects.create(name='DODGE')
+
+    def tearDown(self):
+        reset_request_metrics()
+
+    def test_response_contains_server_timing_header(self):
+        client=APIClient()
+        client.force_authenticate(self.standard)
+        response=client.get(reverse('manufacturer-detail', kwargs={'pk': Manufacturer.objects.get(name='DODGE').pk}))
+        assert response.status_code == status.HTTP_200_OK
+        timings={entry.split(';')[0].strip(): entry for entry in response['Server-Timing'].split(',')}
+        self.assertEqual(set(timings), {'db', 'view', 'serialize', 'total'})
+        self.assertIn('queries"', timings['db'])
+
+    def test_server_timing_header_is_absent_when_profiling_is_disabled(self):
+        with override_settings(REQUEST_PROFILING_ENABLED=False):
+            client=APIClient()
+            client.force_authenticate(self.standard)
+            response=client.get(reverse('manufacturer-list'))
+        assert response.status_code == status.HTTP_200_OK
+        self.assertNotIn('Server-Timing', response)
+
+    def test_slow_request_is_logged(self):
+        client=APIClient()
+        client.force_authenticate(self.standard)
+        with override_settings(REQUEST_PROFILING_SLOW_THRESHOLD_MS=0), self.assertLogs('MechanicallyApp.requests', level='WARNING') as logs:
+            client.get(reverse('manufacturer-list'))
+        record=json.loads(logs.output[0].split('slow_request ', 1)[1])
+        self.assertEqual(record['route'], 'GET manufacturer-list')
+        self.assertEqual(record['status'], 200)
+        self.assertEqual(record['user'], str(self.standard.pk))
+
+    def test_admin_can_read_request_metrics(self):
+        client=APIClient()
+        client.force_authenticate(self.standard)
+        for _ in range(3):
+            client.get(reverse('manufacturer-list'))
+        client.force_authenticate(self.admin)
+        response=client.get(reverse('request-metrics'), {'histograms': 'true'})
+        assert response.status_code == status.HTTP_200_OK
+        route=response.json()['routes']['GET manufacturer-list']
+        self.assertEqual(route['requests'], 3)
+        self.assertEqual(route['errors'], 0)
+        self.assertEqual(sum(route['histograms']['total_ms']['buckets']), 3)
+
+    def test_standard_user_cannot_read_request_metrics(self):
+        client=APIClient()
+        client.force_authenticate(self.standard)
+        response=client.get(reverse('request-metrics'))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_dump_request_metrics_command_prints_routes_and_resets(self):
+        client=APIClient()
+        client.force_authenticate(self.standard)
+        client.get(reverse('manufacturer-list'))
+        request_metrics.publish()
+        out=StringIO()
+        call_command('dump_request_metrics', '--json', '--reset', stdout=out)
+        metrics=json.loads(out.getvalue().rsplit('Metrics cleared.', 1)[0])
+        self.assertEqual(metrics['routes']['GET manufacturer-list']['requests'], 1)
+        out=StringIO()
+        call_command('dump_request_metrics', '--json', stdout=out)
+        self.assertEqual(json.loads(out.getvalue())['routes'], {})
+
+    def test_collecting_metrics_does_not_register_the_reading_process(self):
+        client=APIClient()
+        client.force_authenticate(self.standard)
+        client.get(reverse('manufacturer-list'))
+        request_metrics.publish()
+        reader=RequestMetricsRegistry()
+        reader.process_key='request_metrics:process:dump:1'
+        reader.publish()
+        for _ in range(3):
+            self.assertEqual(collect_request_metrics()['process_count'], 1)
+
+    def test_each_process_publishes_under_its_own_slot(self):
+        workers=[]
+        for pid in range(3):
+            worker=RequestMetricsRegistry()
+            worker.process_key=f'request_metrics:process:worker:{pid}'
+            worker.record('GET manufacturer-list', 200, 5, 1, 1)
+            workers.append(worker)
+        for worker in workers:
+            worker.publish()
+        for worker in workers:
+            worker.publish()
+        metrics=collect_request_metrics()
+        self.assertEqual(metrics['process_count'], 3)
+        self.assertEqual(metrics['routes']['GET manufacturer-list']['requests'], 3)
+
+    def test_histogram_percentile_returns_bucket_upper_bound(self):
+        histogram={'count': 4, 'sum': 0, 'max': 20000, 'buckets': [1, 1, 1] + [0]*(len(DURATION_BUCKETS_MS)-3) + [1]}
+        self.assertEqual(histogram_percentile(histogram, DURATION_BUCKETS_MS, 50), 10)
+        self.assertEqual(histogram_percentile(histogram, DURATION_BUCKETS_MS, 95), 20000)
@@ -0,0 +1,106 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from MechanicallyApp.models import User, Manufacturer, Vehicle, Location, UserLocationAssignment, FailureReport, \
+    RepairReport, RepairReportRejection, City
+from MechanicallyApp.search_services import FullTextMatch, InvertedIndex, normalize_text, tokenize
+
+
+class SearchTestCase(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(first_name="Piotr", last_name="Testowy", username="piotes1111", email="testowy@gmail.com",
+                                              password="test1234", role="admin", phone_number="987654321", is_new_account=False)
+        self.standard = User.objects.create_user(first_name="Jan", last_name="Nowak", username="jannow1111", email="testowy2@gmail.com",
+                                                 password="test1234", role="standard", phone_number="987654322", is_new_account=False)
+        self.manager = User.objects.create_user(first_name="Szymon", last_name="Chasowski", username="szycha1111", email="testowy3@gmail.com",
+                                                password="test1234", role="manager", phone_number="987654323", is_new_account=False)
+        self.manager2 = User.objects.create_user(first_name="Remek", last_name="Winnicki", username="remwin1111", email="testowy4@gmail.com",
+                                                 password="test1234", role="manager", phone_number="987654324", is_new_account=False)
+        self.mechanic = User.objects.create_user(first_name="Karol", last_name="Nawrak", username="karnaw1111", email="testowy5@gmail.com",
+                                                 password="test1234", role="mechanic", phone_number="987654325", is_new_account=False)
+        city = City.objects.create(name='Szczecin')
+        self.workshop = Location.objects.create(name='WARSZTAT', phone_number='133456789', email="test2@gmail.com", city=city,
+                                                street_name='Parkowa', building_number=1, location_type='W')
+        self.workshop2 = Location.objects.create(name='WARSZTAT B', phone_number='544333222', email="test3@gmail.com", city=city,
+                                                 street_name='Parkowa', building_number=1, location_type='W')
+        UserLocationAssignment.objects.create(user=self.mechanic, location=self.workshop)
+        vehicle = Vehicle.objects.create(vin='5GZCZ63B93S896664', vehicle_type='PC', year=2018, vehicle_model="SRT Hellcat",
+                                         fuel_type='P', availability='U', manufacturer=Manufacturer.objects.create(name='DODGE'))
+
+        self.bearing_report = FailureReport.objects.create(vehicle=vehicle, title='Łożysko koła', description='Głośne łożysko przedniego koła',
+                                                           report_author=self.standard, status='A', workshop=self.workshop, managed_by=self.manager)
+        self.engine_report = FailureReport.objects.create(vehicle=vehicle, title='Engine failure', description='Engine is not starting, engine light is on',
+                                                          report_author=self.standard, status='A', workshop=self.workshop2, managed_by=self.manager2)
+        self.engine_noise_report = FailureReport.objects.create(vehicle=vehicle, title='Strange noise', description='Noise from the engine bay',
+                                                                report_author=self.standard, status='P')
+        self.bearing_repair = RepairReport.objects.create(failure_report=self.bearing_report, condition_analysis='Zużyte łożysko',
+                                                          repair_action='Wymieniono łożysko', cost=100, status='R')
+        self.engine_repair = RepairReport.objects.create(failure_report=self.engine_report, condition_analysis='Engine sensor broken',
+                                                         repair_action='Replaced the sensor', cost=200, status='R')
+        self.rejection = RepairReportRejection.objects.create(repair_report=self.bearing_repair, title='Incomplete repair',
+                                                              reason='Lozysko is still noisy')
+
+    def search(self, user, **params):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get(reverse('search'), params)
+
+    def test_admin_results_are_ranked_by_relevance(self):
+        response = self.search(self.admin, q='engine')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()
+        self.assertEqual([report['id'] for report in results['failure_reports']], [str(self.engine_report.id), str(self.engine_noise_report.id)])
+        self.assertGreater(results['failure_reports'][0]['relevance'], results['failure_reports'][1]['relevance'])
+        self.assertEqual([report['id'] for report in results['repair_reports']], [str(self.engine_repair.id)])
+        self.assertEqual(results['rejections'], [])
+
+    def test_search_ignores_case_and_polish_diacritics(self):
+        response = self.search(self.admin, q='LOZYSKO')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()
+        self.assertEqual([report['id'] for report in results['failure_reports']], [str(self.bearing_report.id)])
+        self.assertEqual([report['id'] for report in results['repair_reports']], [str(self.bearing_repair.id)])
+        self.assertEqual([rejection['id'] for rejection in results['rejections']], [str(self.rejection.id)])
+
+    def test_manager_finds_only_repair_reports_of_managed_failure_reports(self):
+        response = self.search(self.manager, q='engine')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()
+        self.assertEqual(len(results['failure_reports']), 2)
+        self.assertEqual(results['repair_reports'], [])
+
+    def test_mechanic_finds_only_reports_from_his_workshop(self):
+        response = self.search(self.mechanic, q='engine lozysko')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()
+        self.assertEqual(results['failure_reports'], [])
+        self.assertEqual([report['id'] for report in results['repair_reports']], [str(self.bearing_repair.id)])
+        self.assertEqual([rejection['id'] for rejection in results['rejections']], [str(self.rejection.id)])
+
+    def test_search_can_be_limited_to_selected_types(self):
+        response = self.search(self.admin, q='engine', types='repair_reports', limit=1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.json()), {'query', 'repair_reports'})
+
+    def test_search_rejects_invalid_parameters(self):
+        self.assertEqual(self.search(self.admin, q='on').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.search(self.admin, q='engine', types='vehicles').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_standard_user_cannot_search(self):
+        self.assertEqual(self.search(self.standard, q='engine').status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_text_is_normalized_like_mysql_accent_insensitive_collation(self):
+        self.assertEqual(normalize_text('Łożysko ŹRÓDŁO'), 'lozysko zrodlo')
+        self.assertEqual(tokenize('Wymieniono 2 łożyska, OK'), ['wymieniono', 'lozyska'])
+
+    def test_inverted_index_scores_documents_by_term_frequency(self):
+        index = InvertedIndex()
+        index.add(1, 'brake brake pads')
+        index.add(2, 'brake fluid')
+        index.add(3, 'engine oil')
+        self.assertEqual([document_id for document_id, score in index.search('brake')], [1, 2])
+
+    def test_full_text_match_compiles_to_match_against(self):
+        sql = str(FailureReport.objects.annotate(relevance=FullTextMatch('title', 'description', query='engine')).query)
+        self.assertIn('MATCH ("MechanicallyApp_failurereport"."title", "MechanicallyApp_failurereport"."description") AGAINST (engine IN NATURAL LANGUAGE MODE)', sql)
@@ -0,0 +1,66 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command, CommandError
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from MechanicallyApp.models import User, Vehicle, Location, FailureReport, RepairReport, RepairReportRejection, \
+    UserLocationAssignment
+from MechanicallyApp.validators import vin_validator
+
+
+class SeedFleetTestCase(TestCase):
+    def seed(self, **options):
+        call_command('seed_fleet', stdout=StringIO(), **options)
+
+    def test_seed_fleet_generates_every_role_and_status(self):
+        self.seed(vehicles=200, batch_size=64)
+        self.assertEqual(Vehicle.objects.count(), 200)
+        self.assertEqual(set(User.objects.values_list('role', flat=True)), {'standard', 'mechanic', 'manager', 'admin'})
+        self.assertEqual(set(Location.objects.values_list('location_type', flat=True)), {'B', 'W'})
+        self.assertEqual(set(FailureReport.objects.values_list('status', flat=True)), {'P', 'A', 'S', 'D', 'R'})
+        self.assertEqual(set(RepairReport.objects.values_list('status', flat=True)), {'A', 'R', 'H'})
+        self.assertTrue(RepairReportRejection.objects.exists())
+        self.assertFalse(UserLocationAssignment.objects.filter(user__role='standard').exclude(location__location_type='B').exists())
+        self.assertFalse(UserLocationAssignment.objects.filter(user__role='mechanic').exclude(location__location_type='W').exists())
+        for vin in Vehicle.objects.values_list('vin', flat=True):
+            vin_validator(vin)
+
+    def test_seed_fleet_is_deterministic(self):
+        with transaction.atomic():
+            self.seed(vehicles=50, seed=7)
+            first_run = list(Vehicle.objects.order_by('vin').values_list('vin', 'vehicle_model', 'availability'))
+            transaction.set_rollback(True)
+        self.seed(vehicles=50, seed=7)
+        self.assertEqual(list(Vehicle.objects.order_by('vin').values_list('vin', 'vehicle_model', 'availability')), first_run)
+
+    def test_seed_fleet_keeps_historical_dates_without_touching_auto_now(self):
+        self.seed(vehicles=100, seed=3)
+        month_ago=timezone.now()-timedelta(days=31)
+        self.assertTrue(FailureReport.objects.filter(report_date__lt=month_ago, last_status_change_date__lt=month_ago).exists())
+        self.assertTrue(RepairReport.objects.filter(created_date__lt=month_ago, last_change_date__lt=month_ago).exists())
+        self.assertTrue(RepairReportRejection.objects.filter(rejection_date__lt=month_ago).exists())
+        self.assertTrue(RepairReport._meta.get_field('last_change_date').auto_now)
+        self.assertTrue(RepairReport._meta.get_field('created_date').auto_now_add)
+
+    def test_seed_fleet_size_overrides(self):
+        self.seed(vehicles=20, workshops=3, managers=4)
+        self.assertEqual(Location.objects.filter(location_type='W').count(), 3)
+        self.assertEqual(User.objects.filter(role='manager').count(), 4)
+
+    def test_seed_fleet_requires_clear_to_seed_again(self):
+        self.seed(vehicles=20)
+        with self.assertRaises(CommandError):
+            self.seed(vehicles=20)
+        self.seed(vehicles=30, clear=True, force=True)
+        self.assertEqual(Vehicle.objects.count(), 30)
+
+    def test_clear_is_refused_without_debug_or_force(self):
+        self.seed(vehicles=20)
+        with self.assertRaisesMessage(CommandError, 'Pass --force to clear anyway.'):
+            self.seed(vehicles=20, clear=True)
+        self.assertEqual(Vehicle.objects.count(), 20)
+        with override_settings(DEBUG=True):
+            self.seed(vehicles=10, clear=True)
+        self.assertEqual(Vehicle.objects.count(), 10)
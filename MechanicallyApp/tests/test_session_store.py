@@ -0,0 +1,70 @@
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from MechanicallyApp.models import User, Manufacturer
+from MechanicallyApp.session_services import purge_expired_sessions
+
+
+class SessionStoreTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        shared_session_cache = override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cached_db', CACHES={
+            **settings.CACHES, 'sessions': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory.name}})
+        shared_session_cache.enable()
+        self.addCleanup(shared_session_cache.disable)
+        self.manager = User.objects.create_user(first_name="Szymon", last_name="Chasowski", username="szycha1111", email="testowy@gmail.com",
+                                                password="test1234", role="manager", phone_number="987654321", is_new_account=False)
+        self.manufacturer = Manufacturer.objects.create(name='DODGE')
+
+    def login(self):
+        client = APIClient()
+        self.assertTrue(client.login(username=self.manager.username, password='test1234'))
+        return client
+
+    def test_authenticated_request_reads_session_from_cache(self):
+        client = self.login()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(reverse('manufacturer-detail', kwargs={'pk': self.manufacturer.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse([query for query in context.captured_queries if Session._meta.db_table in query['sql']])
+
+    def test_session_falls_back_to_database_when_cache_is_empty(self):
+        client = self.login()
+        caches['sessions'].clear()
+        response = client.get(reverse('manufacturer-detail', kwargs={'pk': self.manufacturer.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_logout_removes_session_from_cache_and_database(self):
+        client = self.login()
+        self.assertEqual(Session.objects.count(), 1)
+        client.post(reverse('logout'))
+        self.assertEqual(Session.objects.count(), 0)
+        response = client.get(reverse('manufacturer-detail', kwargs={'pk': self.manufacturer.pk}))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_expired_sessions_are_purged_in_batches(self):
+        now = timezone.now()
+        Session.objects.bulk_create([Session(session_key=f'expired{i:033d}', session_data='', expire_date=now - timedelta(hours=1)) for i in range(5)]
+                                    + [Session(session_key='active'.ljust(40, '0'), session_data='', expire_date=now + timedelta(hours=1))])
+        with self.assertNumQueries(6):
+            self.assertEqual(purge_expired_sessions(batch_size=2, now=now), 5)
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['active'.ljust(40, '0')])
+
+    def test_purge_command_reports_deleted_sessions(self):
+        Session.objects.create(session_key='expired'.ljust(40, '0'), session_data='', expire_date=timezone.now() - timedelta(days=1))
+        out = StringIO()
+        call_command('purge_expired_sessions', stdout=out)
+        self.assertIn('Deleted 1 expired sessions.', out.getvalue())
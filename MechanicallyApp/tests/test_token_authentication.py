@@ -0,0 +1,139 @@
+import tempfile
+from datetime import timedelta
+
+import jwt
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from MechanicallyApp.models import User, Manufacturer, Vehicle, Location, UserLocationAssignment, City
+from MechanicallyApp.token_services import decode_token, revoke_user_tokens
+
+
+class TokenAuthenticationTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        token_denylist = override_settings(CACHES={**settings.CACHES, 'tokens': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory.name,
+            'OPTIONS': {'MAX_ENTRIES': 1_000_000}}})
+        token_denylist.enable()
+        self.addCleanup(token_denylist.disable)
+        cache.clear()
+        self.admin = User.objects.create_user(first_name="Piotr", last_name="Testowy", username="piotes1111", email="testowy@gmail.com",
+                                              password="test1234", role="admin", phone_number="987654321", is_new_account=False)
+        self.standard = User.objects.create_user(first_name="Jan", last_name="Nowak", username="jannow1111", email="testowy2@gmail.com",
+                                                 password="test1234", role="standard", phone_number="987654322", is_new_account=False)
+        city = City.objects.create(name='Szczecin')
+        self.branch = Location.objects.create(name='SIEDZIBA', phone_number='123456789', email="test@gmail.com", city=city,
+                                              street_name='Parkowa', building_number=1, location_type='B')
+        UserLocationAssignment.objects.create(user=self.standard, location=self.branch)
+        manufacturer = Manufacturer.objects.create(name='DODGE')
+        self.vehicle = Vehicle.objects.create(vin='5GZCZ63B93S896664', vehicle_type='PC', year=2018, vehicle_model="SRT Hellcat",
+                                              fuel_type='P', availability='U', location=self.branch, manufacturer=manufacturer)
+
+    def obtain_tokens(self, user):
+        response = APIClient().post(reverse('token-obtain'), {'username': user.username, 'password': 'test1234'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def bearer_client(self, access):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        return client
+
+    def test_token_claims_carry_role_and_location(self):
+        tokens = self.obtain_tokens(self.standard)
+        payload = decode_token(tokens['access'], 'access')
+        self.assertEqual((payload['sub'], payload['role'], payload['loc'], payload['loc_type']),
+                         (str(self.standard.pk), 'standard', str(self.branch.pk), 'B'))
+        self.assertEqual(tokens['access_expires_in'], int(settings.JWT_ACCESS_TOKEN_LIFETIME.total_seconds()))
+
+    def test_access_token_authenticates_without_database_queries(self):
+        client = self.bearer_client(self.obtain_tokens(self.standard)['access'])
+        url = reverse('assigned-location')
+        with self.assertNumQueries(1):
+            response = client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        client.get(reverse('manufacturer-list'))
+        with self.assertNumQueries(0):
+            response = client.get(reverse('manufacturer-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_refresh_token_cannot_be_used_as_access_token(self):
+        client = self.bearer_client(self.obtain_tokens(self.standard)['refresh'])
+        response = client.get(reverse('manufacturer-list'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_expired_or_forged_tokens_are_rejected(self):
+        expired = jwt.encode({'sub': str(self.admin.pk), 'type': 'access', 'jti': 'x', 'iat': 0, 'exp': timezone.now() - timedelta(seconds=1),
+                              'role': 'admin', 'su': False, 'loc': None, 'loc_type': None}, settings.JWT_SIGNING_KEY, algorithm='HS256')
+        forged = jwt.encode({'sub': str(self.admin.pk), 'type': 'access', 'jti': 'x', 'iat': 0, 'exp': timezone.now() + timedelta(minutes=1),
+                             'role': 'admin', 'su': True, 'loc': None, 'loc_type': None}, 'other-key', algorithm='HS256')
+        for token in (expired, forged):
+            response = self.bearer_client(token).get(reverse('manufacturer-list'))
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+            self.assertEqual(response.json()['detail'], 'Token is invalid or expired.')
+
+    def test_refresh_rotates_tokens_and_revokes_used_refresh_token(self):
+        tokens = self.obtain_tokens(self.admin)
+        response = APIClient().post(reverse('token-refresh'), {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.bearer_client(response.json()['access']).get(reverse('manufacturer-list')).status_code, status.HTTP_200_OK)
+        response = APIClient().post(reverse('token-refresh'), {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_revoke_invalidates_refresh_and_access_token(self):
+        tokens = self.obtain_tokens(self.admin)
+        client = self.bearer_client(tokens['access'])
+        response = client.post(reverse('token-revoke'), {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(client.get(reverse('manufacturer-list')).status_code, status.HTTP_403_FORBIDDEN)
+        response = APIClient().post(reverse('token-refresh'), {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_deactivation_revokes_issued_tokens(self):
+        tokens = self.obtain_tokens(self.standard)
+        admin_client = APIClient()
+        admin_client.force_authenticate(self.admin)
+        response = admin_client.post(reverse('user-status', kwargs={'pk': self.standard.pk}), {'status': 'inactive'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.bearer_client(tokens['access']).get(reverse('manufacturer-list')).status_code, status.HTTP_403_FORBIDDEN)
+        response = APIClient().post(reverse('token-refresh'), {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_location_reassignment_revokes_issued_tokens(self):
+        tokens = self.obtain_tokens(self.standard)
+        UserLocationAssignment.objects.filter(user=self.standard).delete()
+        UserLocationAssignment.objects.create(user=self.standard, location=self.branch)
+        self.assertEqual(self.bearer_client(tokens['access']).get(reverse('manufacturer-list')).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_token_user_can_create_failure_report(self):
+        client = self.bearer_client(self.obtain_tokens(self.standard)['access'])
+        response = client.post(reverse('failure-report-list'), {'vehicle': self.vehicle.pk, 'title': 'Engine failure',
+                                                                'description': 'Engine is not starting properly.'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_token_obtain_rejects_invalid_credentials(self):
+        response = APIClient().post(reverse('token-obtain'), {'username': self.admin.username, 'password': 'wrong-password'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_revocation_survives_cache_churn(self):
+        tokens = self.obtain_tokens(self.standard)
+        revoke_user_tokens(self.standard.pk)
+        for i in range(400):
+            cache.set(f'unrelated:{i}', i)
+        self.assertEqual(self.bearer_client(tokens['access']).get(reverse('manufacturer-list')).status_code, status.HTTP_403_FORBIDDEN)
+        response = APIClient().post(reverse('token-refresh'), {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_token_authentication_is_refused_without_shared_denylist(self):
+        tokens = self.obtain_tokens(self.standard)
+        with override_settings(CACHES={**settings.CACHES, 'tokens': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            response = APIClient().post(reverse('token-obtain'), {'username': self.standard.username, 'password': 'test1234'})
+            self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+            response = self.bearer_client(tokens['access']).get(reverse('manufacturer-list'))
+            self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
@@ -2,10 +2,12 @@ from django.contrib.auth import authenticate
 from django.contrib.auth.tokens import default_token_generator
 from django.test import TestCase
 from MechanicallyApp.models import User, Location, UserLocationAssignment, City
+from MechanicallyApp.token_services import account_activation_token_generator
 from rest_framework import status
 from django.urls import reverse
 from rest_framework.test import APIClient
 from django.core import mail
+from django.core.management import call_command
 
 class UserTestCase(TestCase):
     def setUp(self):
@@ -169,6 +171,8 @@ class UserTestCase(TestCase):
         assert response.status_code == status.HTTP_201_CREATED
         created_account=User.objects.get(first_name="Jakub")
         assert created_account.role=="standard" and created_account.is_active==False
+        self.assertEqual(len(mail.outbox), 0)
+        call_command('send_queued_emails')
         self.assertEqual(len(mail.outbox), 1)
 
     def test_admin_can_create_mechanic(self):
@@ -188,6 +192,8 @@ class UserTestCase(TestCase):
         self.assertEqual(created_account.role,'mechanic')
         self.assertEqual(created_account.is_active, False)
         assert created_account.role=="mechanic" and created_account.is_active==False
+        self.assertEqual(len(mail.outbox), 0)
+        call_command('send_queued_emails')
         self.assertEqual(len(mail.outbox), 1)
 
     def test_admin_can_create_manager(self):
@@ -204,6 +210,8 @@ class UserTestCase(TestCase):
         assert response.status_code == status.HTTP_201_CREATED
         created_account=User.objects.get(first_name="Jakub")
         assert created_account.role=="manager" and created_account.is_active==False
+        self.assertEqual(len(mail.outbox), 0)
+        call_command('send_queued_emails')
         self.assertEqual(len(mail.outbox), 1)
 
     def test_admin_cannot_create_admin(self):
@@ -234,6 +242,8 @@ class UserTestCase(TestCase):
         assert response.status_code == status.HTTP_201_CREATED
         created_account = User.objects.get(first_name="Jakub")
         assert created_account.role == "admin" and created_account.is_active == False
+        self.assertEqual(len(mail.outbox), 0)
+        call_command('send_queued_emails')
         self.assertEqual(len(mail.outbox), 1)
 
     def test_standard_can_retrieve_own_account_and_branch_coworkers(self):
@@ -669,15 +679,21 @@ class UserTestCase(TestCase):
     def test_user_can_activate_his_account(self):
 
         client=APIClient()
-        response=client.post(reverse('user-activation'),data={'user':self.fresh_account.id, 'token':default_token_generator.make_token(self.fresh_account),'password':'Kaliniak1234562134','confirm_password':'Kaliniak1234562134'})
+        response=client.post(reverse('user-activation'),data={'user':self.fresh_account.id, 'token':account_activation_token_generator.make_token(self.fresh_account),'password':'Kaliniak1234562134','confirm_password':'Kaliniak1234562134'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         user=authenticate(username=self.fresh_account.username, password='Kaliniak1234562134')
         self.assertEqual(user, User.objects.get(pk=self.fresh_account.pk))
 
+    def test_user_can_activate_his_account_with_token_sent_before_activation_tokens(self):
+        client=APIClient()
+        response=client.post(reverse('user-activation'),data={'user':self.fresh_account.id, 'token':default_token_generator.make_token(self.fresh_account),'password':'Kaliniak1234562134','confirm_password':'Kaliniak1234562134'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(User.objects.get(pk=self.fresh_account.pk).is_active)
+
     def test_user_cannot_activate_his_account_without_proper_token(self):
 
         client = APIClient()
-        response = client.post(reverse('user-activation'), data={'user': self.fresh_account.id,'token': default_token_generator.make_token(self.standard1), 'password': 'Kaliniak123456','confirm_password': 'Kaliniak123456'})
+        response = client.post(reverse('user-activation'), data={'user': self.fresh_account.id,'token': account_activation_token_generator.make_token(self.standard1), 'password': 'Kaliniak123456','confirm_password': 'Kaliniak123456'})
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('Invalid user or token.',str(response.json()))
 
@@ -685,7 +701,7 @@ class UserTestCase(TestCase):
 
         client = APIClient()
         response = client.post(reverse('user-activation'), data={'user': self.fresh_account.id,
-                                                                 'token': default_token_generator.make_token(
+                                                                 'token': account_activation_token_generator.make_token(
                                                                      self.fresh_account), 'password': 'test123',
                                                                  'confirm_password': 'test123'})
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -695,7 +711,7 @@ class UserTestCase(TestCase):
 
         client = APIClient()
         response = client.post(reverse('user-activation'), data={'user': self.fresh_account.id,
-                                                                 'token': default_token_generator.make_token(
+                                                                 'token': account_activation_token_generator.make_token(
                                                                      self.fresh_account), 'password': 'password12345',
                                                                  'confirm_password': 'password12345'})
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -705,7 +721,7 @@ class UserTestCase(TestCase):
 
         client = APIClient()
         response = client.post(reverse('user-activation'), data={'user': self.fresh_account.id,
-                                                                 'token': default_token_generator.make_token(
+                                                                 'token': account_activation_token_generator.make_token(
                                                                      self.fresh_account), 'password': '123456789123',
                                                                  'confirm_password': '123456789123'})
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -715,7 +731,7 @@ class UserTestCase(TestCase):
 
         client = APIClient()
         response = client.post(reverse('user-activation'), data={'user': self.fresh_account.id,
-                                                                 'token': default_token_generator.make_token(
+                                                                 'token': account_activation_token_generator.make_token(
                                                                      self.fresh_account), 'password': '123-rZRn}ZPh(dYi)i7qpQcv&*FD-veL,M{{[DvjPRkrKV}TvQkra)}/-EYbSN#eH_iKCb:V%!+2ACyPj}0FqvWxihr(y(m8+vEmq}r5XTvtU.L8WG.7B/6CMeE=A[{gf7t:f,)pv}}kDrzx!hbXh+zbpaY%.w2Hn!K[&-@{eG}GwzP(Rk16P_.RHZ}7hjU{e]y@$Vv61D_m!bHN5d*#b+%@AAk0Ujr9FR2{{#q3/3PYhQS1d/3$EM:g&75RxZ6!W,',
                                                                  'confirm_password': '123-rZRn}ZPh(dYi)i7qpQcv&*FD-veL,M{{[DvjPRkrKV}TvQkra)}/-EYbSN#eH_iKCb:V%!+2ACyPj}0FqvWxihr(y(m8+vEmq}r5XTvtU.L8WG.7B/6CMeE=A[{gf7t:f,)pv}}kDrzx!hbXh+zbpaY%.w2Hn!K[&-@{eG}GwzP(Rk16P_.RHZ}7hjU{e]y@$Vv61D_m!bHN5d*#b+%@AAk0Ujr9FR2{{#q3/3PYhQS1d/3$EM:g&75RxZ6!W,'})
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -724,12 +740,28 @@ class UserTestCase(TestCase):
     def test_user_cannot_activate_his_account_with_different_password_fields(self):
         client = APIClient()
         response = client.post(reverse('user-activation'), data={'user': self.fresh_account.id,
-                                                                 'token': default_token_generator.make_token(
+                                                                 'token': account_activation_token_generator.make_token(
                                                                      self.fresh_account), 'password': 'Kaliniak123456',
                                                                  'confirm_password': 'Kaliniak654321'})
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('Passwords do not match.', str(response.json()))
 
+    def test_created_account_has_unusable_password_and_emailed_token_activates_it(self):
+        client = APIClient()
+        client.force_authenticate(self.admin1)
+        response = client.post(reverse('user-list'), data={"first_name": "Jakub", "last_name": "Nowicki", "email": "delivered@resend.dev",
+                                                           "phone_number": "628327263", "role": "standard"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        created_account = User.objects.get(first_name="Jakub")
+        self.assertFalse(created_account.has_usable_password())
+        call_command('send_queued_emails')
+        token = mail.outbox[0].body.split('token=')[1].split()[0]
+        data = {'user': created_account.id, 'token': token, 'password': 'Kaliniak1234562134', 'confirm_password': 'Kaliniak1234562134'}
+        response = APIClient().post(reverse('user-activation'), data=data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(authenticate(username=created_account.username, password='Kaliniak1234562134'), created_account)
+        response = APIClient().post(reverse('user-activation'), data=data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
     def test_admin_can_set_inactive_account(self):
         client = APIClient()
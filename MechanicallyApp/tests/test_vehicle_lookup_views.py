@@ -0,0 +1,92 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from MechanicallyApp.models import User, Manufacturer, Vehicle, Location, UserLocationAssignment, FailureReport, City
+
+
+class VehicleByVinTestCase(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(first_name="Piotr", last_name="Testowy", username="piotes1111", email="testowy@gmail.com",
+                                              password="test1234", role="admin", phone_number="987654321", is_new_account=False)
+        self.standard = User.objects.create_user(first_name="Jan", last_name="Nowak", username="jannow1111", email="testowy2@gmail.com",
+                                                 password="test1234", role="standard", phone_number="987654322", is_new_account=False)
+        self.mechanic = User.objects.create_user(first_name="Karol", last_name="Nawrak", username="karnaw1111", email="testowy3@gmail.com",
+                                                 password="test1234", role="mechanic", phone_number="987654323", is_new_account=False)
+        city = City.objects.create(name='Szczecin')
+        self.branch = Location.objects.create(name='SIEDZIBA', phone_number='123456789', email="test@gmail.com", city=city,
+                                              street_name='Parkowa', building_number=1, location_type='B')
+        self.workshop = Location.objects.create(name='WARSZTAT', phone_number='133456789', email="test2@gmail.com", city=city,
+                                                street_name='Parkowa', building_number=1, location_type='W')
+        UserLocationAssignment.objects.create(user=self.standard, location=self.branch)
+        UserLocationAssignment.objects.create(user=self.mechanic, location=self.workshop)
+        self.manufacturer = Manufacturer.objects.create(name='DODGE')
+        self.vehicle = Vehicle.objects.create(vin='5GZCZ63B93S896664', vehicle_type='PC', year=2018, vehicle_model="SRT Hellcat",
+                                              fuel_type='P', availability='U', location=self.branch, manufacturer=self.manufacturer)
+        self.vehicle2 = Vehicle.objects.create(vin='5GZCZ63B93S896665', vehicle_type='PC', year=2019, vehicle_model="Charger",
+                                               fuel_type='P', availability='A', manufacturer=self.manufacturer)
+        FailureReport.objects.create(vehicle=self.vehicle, title='Old failure', description='Already resolved',
+                                     report_author=self.standard, status='R', workshop=self.workshop)
+        self.open_report = FailureReport.objects.create(vehicle=self.vehicle, title='Engine failure', description='Engine is not starting',
+                                                        report_author=self.standard, status='A', workshop=self.workshop)
+
+    def get(self, user, url, params=None):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get(url, params)
+
+    def test_vehicle_is_returned_with_open_failure_report_and_workshop_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.get(self.admin, reverse('vehicle-by-vin', kwargs={'vin': self.vehicle.vin}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        vehicle = response.json()
+        self.assertEqual(vehicle['id'], str(self.vehicle.id))
+        self.assertEqual(vehicle['manufacturer']['name'], 'DODGE')
+        self.assertEqual(vehicle['open_failure_report']['id'], str(self.open_report.id))
+        self.assertEqual(vehicle['open_failure_report']['workshop'], {'id': str(self.workshop.id), 'name': 'WARSZTAT'})
+
+    def test_vehicle_without_open_failure_report(self):
+        response = self.get(self.admin, reverse('vehicle-by-vin', kwargs={'vin': self.vehicle2.vin.lower()}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.json()['open_failure_report'])
+
+    def test_invalid_vin_is_rejected_without_querying_vehicles(self):
+        with self.assertNumQueries(0):
+            response = self.get(self.admin, reverse('vehicle-by-vin', kwargs={'vin': 'IOQ00000000000000'}))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unknown_vin_returns_not_found(self):
+        response = self.get(self.admin, reverse('vehicle-by-vin', kwargs={'vin': '5GZCZ63B93S896666'}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_standard_user_cannot_look_up_vehicle_from_other_branch(self):
+        response = self.get(self.standard, reverse('vehicle-by-vin', kwargs={'vin': self.vehicle2.vin}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.get(self.standard, reverse('vehicle-by-vin', kwargs={'vin': self.vehicle.vin}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_mechanic_looks_up_only_vehicles_reported_to_his_workshop(self):
+        response = self.get(self.mechanic, reverse('vehicle-by-vin-list'), {'vins': f'{self.vehicle.vin},{self.vehicle2.vin}'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([vehicle['vin'] for vehicle in response.json()['results']], [self.vehicle.vin])
+        self.assertEqual(response.json()['not_found'], [self.vehicle2.vin])
+
+    def test_bulk_lookup_returns_vehicles_in_requested_order(self):
+        with self.assertNumQueries(1):
+            response = self.get(self.admin, reverse('vehicle-by-vin-list'), {'vins': f'{self.vehicle2.vin}, {self.vehicle.vin},5GZCZ63B93S896666'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([vehicle['vin'] for vehicle in response.json()['results']], [self.vehicle2.vin, self.vehicle.vin])
+        self.assertEqual(response.json()['not_found'], ['5GZCZ63B93S896666'])
+
+    def test_bulk_lookup_rejects_invalid_vins_and_too_many_vins(self):
+        response = self.get(self.admin, reverse('vehicle-by-vin-list'), {'vins': f'{self.vehicle.vin},SHORT'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('SHORT', str(response.json()))
+        with self.settings(BATCH_LOOKUP_MAX_SIZE=1):
+            response = self.get(self.admin, reverse('vehicle-by-vin-list'), {'vins': f'{self.vehicle.vin},{self.vehicle2.vin}'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_vehicle_list_can_be_filtered_by_vin(self):
+        response = self.get(self.admin, reverse('vehicle-list'), {'vin': self.vehicle2.vin})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([vehicle['id'] for vehicle in response.json()], [str(self.vehicle2.id)])
@@ -1,4 +1,9 @@
+import json
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
+from MechanicallyApp import import_services
 from MechanicallyApp.models import User, Manufacturer, Vehicle, Location, UserLocationAssignment, FailureReport, \
     RepairReport, City
 from rest_framework import status
@@ -138,6 +143,17 @@ class VehicleTestCase(TestCase):
         self.assertEqual(response.status_code,status.HTTP_200_OK)
         self.assertEqual(response.json()['id'],str(self.vehicle5.pk))
 
+    def test_mechanic_sees_vehicle_with_several_failure_reports_in_his_workshop_once(self):
+        FailureReport.objects.create(vehicle=self.vehicle5, title="Brake issue", description="Brakes are making noise",
+                                     workshop=self.workshop, status='R')
+        client=APIClient()
+        client.force_authenticate(self.mechanic)
+        response=client.get(reverse('vehicle-list'))
+        self.assertEqual(response.status_code,status.HTTP_200_OK)
+        self.assertEqual(len(response.json()),1)
+        response=client.get(reverse('vehicle-detail',kwargs={'pk':self.vehicle5.pk}))
+        self.assertEqual(response.status_code,status.HTTP_200_OK)
+
     def test_mechanic_cannot_retrieve_vehicle_which_has_failure_reports_related_only_to_other_workshops(self):
         client=APIClient()
         client.force_authenticate(self.mechanic)
@@ -339,4 +355,80 @@ class VehicleTestCase(TestCase):
         response = client.delete(reverse('vehicle-detail', kwargs={'pk': vehicle2.pk}))
         assert response.status_code == status.HTTP_204_NO_CONTENT
         response2 = client.get(reverse('vehicle-detail', kwargs={'pk': vehicle2.pk}))
-        assert response2.status_code == status.HTTP_404_NOT_FOUND
\ No newline at end of file
+        assert response2.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_manager_can_import_vehicles_from_csv(self):
+        client = APIClient()
+        client.force_authenticate(self.manager)
+        content = (
+            "vin,manufacturer,vehicle_model,year,vehicle_type,fuel_type,location,availability\n"
+            f"1HGCM82633A004352,{self.dodge.pk},Charger,2020,PC,P,{self.branch.pk},A\n"
+            f"1HGCM82633A004353,{self.man.pk},Lion City,2019,CO,D,,\n"
+            f"1HGCM82633A004352,{self.dodge.pk},Charger,2020,PC,P,,\n"
+            f"5GZCZ63B93S896664,{self.dodge.pk},Charger,2020,PC,P,,\n"
+            f"1HGCM82633A004354,{self.dodge.pk},Charger,1800,XX,P,{self.workshop.pk},\n"
+        )
+        response = client.post(reverse('vehicle-import'), {'file': SimpleUploadedFile('vehicles.csv', content.encode())}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        report = response.json()
+        self.assertEqual(report['created'], 2)
+        self.assertEqual([row_error['row'] for row_error in report['errors']], [3, 4, 5])
+        self.assertIn('vin', report['errors'][0]['errors'])
+        self.assertIn('vin', report['errors'][1]['errors'])
+        self.assertEqual(set(report['errors'][2]['errors']), {'year', 'vehicle_type', 'location'})
+        vehicle = Vehicle.objects.get(vin='1HGCM82633A004353')
+        self.assertEqual(vehicle.availability, 'A')
+        self.assertIsNone(vehicle.location_id)
+
+    def test_admin_can_import_vehicles_from_ndjson(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        rows = [
+            {'vin': '1HGCM82633A004352', 'manufacturer': str(self.dodge.pk), 'vehicle_model': 'Charger', 'year': 2020,
+             'vehicle_type': 'PC', 'fuel_type': 'P', 'location': str(self.branch.pk)},
+            {'vin': '1HGCM82633A004353', 'manufacturer': 'b54d7467-2eaa-4e1b-8be2-3fb091d7639e', 'vehicle_model': 'Charger',
+             'year': 2020, 'vehicle_type': 'PC', 'fuel_type': 'P'},
+        ]
+        content = '\n'.join(json.dumps(row) for row in rows) + '\nnot json\n'
+        response = client.post(reverse('vehicle-import'), {'file': SimpleUploadedFile('vehicles.ndjson', content.encode())}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        report = response.json()
+        self.assertEqual(report['created'], 1)
+        self.assertEqual(report['errors'][0], {'row': 2, 'errors': {'manufacturer': ['There is no manufacturer with provided ID.']}})
+        self.assertEqual(report['errors'][1]['row'], 3)
+        self.assertTrue(Vehicle.objects.filter(vin='1HGCM82633A004352', location=self.branch).exists())
+
+    def import_with_stale_vin_lookups(self, stale_lookups):
+        client = APIClient()
+        client.force_authenticate(self.manager)
+        content = (
+            "vin,manufacturer,vehicle_model,year,vehicle_type,fuel_type\n"
+            f"1HGCM82633A004352,{self.dodge.pk},Charger,2020,PC,P\n"
+            f"5GZCZ63B93S896664,{self.dodge.pk},Charger,2020,PC,P\n"
+        )
+        existing_vins = import_services._existing_vins
+        #wyszukiwanie nie widzi pojazdu z tym samym VIN, jak przy imporcie równoległym
+        with mock.patch.object(import_services, '_existing_vins',
+                               side_effect=lambda vins: set() if stale_lookups.pop() else existing_vins(vins)):
+            response = client.post(reverse('vehicle-import'), {'file': SimpleUploadedFile('vehicles.csv', content.encode())}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def test_import_revalidates_chunk_after_concurrent_duplicate_vin(self):
+        report = self.import_with_stale_vin_lookups([False, True])
+        self.assertEqual(report['created'], 1)
+        self.assertEqual(report['errors'], [{'row': 2, 'errors': {'vin': ['Vehicle with this vin already exists.']}}])
+        self.assertTrue(Vehicle.objects.filter(vin='1HGCM82633A004352').exists())
+
+    def test_import_reports_rows_of_chunk_that_keeps_conflicting(self):
+        report = self.import_with_stale_vin_lookups([True, True])
+        self.assertEqual(report['created'], 0)
+        self.assertEqual([row_error['row'] for row_error in report['errors']], [1, 2])
+        self.assertEqual(report['errors'][0]['errors'], {'detail': ['Row could not be saved because of a concurrent change.']})
+        self.assertFalse(Vehicle.objects.filter(vin='1HGCM82633A004352').exists())
+
+    def test_standard_user_cannot_import_vehicles(self):
+        client = APIClient()
+        client.force_authenticate(self.standard)
+        response = client.post(reverse('vehicle-import'), {'file': SimpleUploadedFile('vehicles.csv', b'vin\n')}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,122 @@
+import uuid
+
+import jwt
+from django.conf import settings
+from django.contrib.auth.tokens import PasswordResetTokenGenerator, default_token_generator
+from django.core.cache import caches
+from django.utils import timezone
+
+from .actor_context import ActorContext
+from .auth_services import build_deferred_user
+from .cache_services import is_shared_cache
+from .exceptions import TokenAuthenticationUnavailable
+from .models import UserLocationAssignment
+
+#claims wymagane w każdym tokenie; rola i lokalizacja (loc, loc_type - puste dla użytkowników bez przypisania)
+#pozwalają sprawdzić uprawnienia bez zapytań do bazy
+REQUIRED_TOKEN_CLAIMS = ('sub', 'type', 'jti', 'iat', 'exp', 'role', 'su')
+
+def _token_lifetime(token_type):
+    if token_type == 'access':
+        return settings.JWT_ACCESS_TOKEN_LIFETIME
+    return settings.JWT_REFRESH_TOKEN_LIFETIME
+
+def _denied_token_key(jti):
+    return f'token_denylist:jti:{jti}'
+
+def _revoked_user_key(user_id):
+    return f'token_denylist:user:{user_id}'
+
+#cache locmem jest osobny w każdym procesie i usuwa najstarsze wpisy po przekroczeniu MAX_ENTRIES, a dummy nie
+#przechowuje niczego - odwołany token znów byłby ważny, więc z takim backendem tokeny nie są wystawiane ani przyjmowane
+def token_denylist_is_shared():
+    return is_shared_cache(caches[settings.TOKEN_DENYLIST_CACHE_ALIAS])
+
+def _token_denylist():
+    if not token_denylist_is_shared():
+        raise TokenAuthenticationUnavailable()
+    return caches[settings.TOKEN_DENYLIST_CACHE_ALIAS]
+
+def _encode_token(claims, token_type, now):
+    payload = {
+        **claims,
+        'type': token_type,
+        'jti': uuid.uuid4().hex,
+        'iat': now.timestamp(),
+        'exp': now + _token_lifetime(token_type),
+    }
+    return jwt.encode(payload, settings.JWT_SIGNING_KEY, algorithm=settings.JWT_ALGORITHM)
+
+#para tokenów (krótko żyjący access oraz refresh) z rolą i przypisaną lokalizacją użytkownika w claims
+def issue_token_pair(user):
+    _token_denylist()
+    location_id, location_type = None, None
+    if user.role in ('standard', 'mechanic'):
+        assignment = UserLocationAssignment.objects.filter(user_id=user.pk).values_list('location_id', 'location__location_type').first()
+        if assignment is not None:
+            location_id, location_type = assignment
+    claims = {
+        'sub': str(user.pk),
+        'role': user.role,
+        'su': user.is_superuser,
+        'loc': str(location_id) if location_id is not None else None,
+        'loc_type': location_type,
+    }
+    now = timezone.now()
+    return {
+        'access': _encode_token(claims, 'access', now),
+        'refresh': _encode_token(claims, 'refresh', now),
+        'access_expires_in': int(_token_lifetime('access').total_seconds()),
+    }
+
+#weryfikuje podpis, czas ważności i typ tokenu, a następnie listę odwołanych tokenów: pojedynczy token (jti) oraz
+#wszystkie tokeny użytkownika wystawione przed odwołaniem - oba klucze odczytywane są jednym get_many z cache
+def decode_token(token, token_type):
+    payload = jwt.decode(token, settings.JWT_SIGNING_KEY, algorithms=[settings.JWT_ALGORITHM],
+                         options={'require': list(REQUIRED_TOKEN_CLAIMS)})
+    if payload['type'] != token_type:
+        raise jwt.InvalidTokenError(f'Expected {token_type} token.')
+    denied = _token_denylist().get_many([_denied_token_key(payload['jti']), _revoked_user_key(payload['sub'])])
+    if _denied_token_key(payload['jti']) in denied:
+        raise jwt.InvalidTokenError('Token has been revoked.')
+    revoked_before = denied.get(_revoked_user_key(payload['sub']))
+    if revoked_before is not None and payload['iat'] <= revoked_before:
+        raise jwt.InvalidTokenError('Token has been revoked.')
+    return payload
+
+#wpis na liście odwołanych tokenów żyje tylko do końca ważności tokenu, więc lista pozostaje niewielka
+def revoke_token(payload):
+    remaining = int(payload['exp'] - timezone.now().timestamp()) + 1
+    if remaining > 0:
+        _token_denylist().set(_denied_token_key(payload['jti']), True, timeout=remaining)
+
+#wywoływane przy każdym zapisie użytkownika, więc bez wspólnej listy nic nie robi - żaden token nie mógł zostać wystawiony
+def revoke_user_tokens(user_id):
+    if token_denylist_is_shared():
+        _token_denylist().set(_revoked_user_key(user_id), timezone.now().timestamp(),
+                              timeout=int(_token_lifetime('refresh').total_seconds()) + 1)
+
+def build_user_from_token(payload):
+    return build_deferred_user({'id': uuid.UUID(payload['sub']), 'role': payload['role'], 'is_superuser': payload['su'], 'is_active': True})
+
+def build_actor_context_from_token(payload):
+    location_id = uuid.UUID(payload['loc']) if payload.get('loc') is not None else None
+    return ActorContext(role=payload['role'], location_id=location_id, location_type=payload.get('loc_type'))
+
+
+#token aktywacji konta nie zależy od hasła (nowe konto ma hasło nieużywalne), tylko od stanu konta i adresu email:
+#staje się nieważny po aktywacji, po zmianie adresu email oraz po czasie PASSWORD_RESET_TIMEOUT
+class AccountActivationTokenGenerator(PasswordResetTokenGenerator):
+    key_salt = 'MechanicallyApp.token_services.AccountActivationTokenGenerator'
+
+    def _make_hash_value(self, user, timestamp):
+        return f'{user.pk}{user.email}{user.is_active}{user.is_new_account}{timestamp}'
+
+account_activation_token_generator = AccountActivationTokenGenerator()
+
+#maile aktywacyjne wysłane przed wprowadzeniem AccountActivationTokenGenerator zawierają token default_token_generator
+#(zależny od losowego hasła nadawanego wtedy kontom). Są one nadal przyjmowane - same wygasają po PASSWORD_RESET_TIMEOUT,
+#więc po tym czasie od wdrożenia tę ścieżkę można usunąć
+def check_account_activation_token(user, token):
+    return account_activation_token_generator.check_token(user, token) or \
+        (user.has_usable_password() and default_token_generator.check_token(user, token))
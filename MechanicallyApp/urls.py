@@ -3,13 +3,22 @@ from . import views
 urlpatterns = [
     path('login', views.UserLoginAPIView.as_view(), name='login'),
     path('logout', views.UserLogoutAPIView.as_view(), name='logout'),
+    path('token', views.TokenObtainAPIView.as_view(), name='token-obtain'),
+    path('token/refresh', views.TokenRefreshAPIView.as_view(), name='token-refresh'),
+    path('token/revoke', views.TokenRevokeAPIView.as_view(), name='token-revoke'),
     path('manufacturers',views.ManufacturerListCreateAPIView.as_view(), name='manufacturer-list'),
     path('cities',views.CityListCreateAPIView.as_view(), name='city-list'),
     path('cities/<uuid:pk>',views.CityRetrieveUpdateDestroyAPIView.as_view(), name='city-detail'),
     path('manufacturers/<uuid:pk>',views.ManufacturerRetrieveUpdateDestroyAPIView.as_view(), name='manufacturer-detail'),
     path('locations',views.LocationListCreateAPIView.as_view(), name='location-list'),
+    path('locations/autocomplete',views.LocationAutocompleteAPIView.as_view(), name='location-autocomplete'),
     path('locations/<uuid:pk>',views.LocationRetrieveUpdateDestroyAPIView.as_view(), name='location-detail'),
     path('vehicles',views.VehicleListCreateAPIView.as_view(), name='vehicle-list'),
+    path('vehicles/import',views.VehicleImportAPIView.as_view(), name='vehicle-import'),
+    path('vehicles/autocomplete',views.VehicleAutocompleteAPIView.as_view(), name='vehicle-autocomplete'),
+    path('vehicles/batch',views.VehicleBatchRetrieveAPIView.as_view(), name='vehicle-batch'),
+    path('vehicles/by-vin',views.VehicleByVinAPIView.as_view(), name='vehicle-by-vin-list'),
+    path('vehicles/by-vin/<str:vin>',views.VehicleByVinAPIView.as_view(), name='vehicle-by-vin'),
     path('vehicles/<uuid:pk>',views.VehicleRetrieveUpdateDestroyAPIView.as_view(), name='vehicle-detail'),
     path('users/activation', views.AccountActivationAPIView.as_view(), name='user-activation'),
     path('users/<uuid:pk>/status',views.UserChangeStatusAPIView.as_view(), name='user-status'),
@@ -17,15 +26,22 @@ urlpatterns = [
     path('users/password-reset-request', views.ResetPasswordRequestAPIView.as_view(), name='user-reset-password-request'),
     path('users/password-change', views.PasswordChangeAPIView.as_view(), name='user-password-change'),
     path('users', views.UserListCreateAPIView.as_view(), name='user-list'),
+    path('users/autocomplete', views.UserAutocompleteAPIView.as_view(), name='user-autocomplete'),
+    path('users/batch', views.UserBatchRetrieveAPIView.as_view(), name='user-batch'),
     path('users/me', views.UserProfileAPIView.as_view(), name='user-profile'),
     path('users/me/location', views.UserLocationAPIView.as_view(), name='assigned-location'),
     path('users/<uuid:pk>', views.UserRetrieveUpdateDestroyAPIView.as_view(), name='user-detail'),
     path('users/<uuid:pk>/assignment',views.UserAssignmentAPIView.as_view(), name='user-assignment'),
     path('failure-reports',views.FailureReportListCreateAPIView.as_view(), name='failure-report-list'),
+    path('failure-reports/export',views.FailureReportExportAPIView.as_view(), name='failure-report-export'),
+    path('failure-reports/batch',views.FailureReportBatchRetrieveAPIView.as_view(), name='failure-report-batch'),
     path('failure-reports/<uuid:pk>',views.FailureReportRetrieveAPIView.as_view(), name='failure-report-detail'),
     path('failure-reports/<uuid:pk>/management', views.FailureReportManagementAPIView.as_view(), name='failure-report-management'),
     path('failure-reports/<uuid:pk>/action',views.FailureReportActionAPIView.as_view(), name='failure-report-action'),
     path('repair-reports',views.RepairReportListAPIView.as_view(), name='repair-report-list'),
+    path('repair-reports/export',views.RepairReportExportAPIView.as_view(), name='repair-report-export'),
+    path('repair-reports/rejections/export',views.RepairReportRejectionExportAPIView.as_view(), name='repair-report-rejection-export'),
+    path('repair-reports/batch',views.RepairReportBatchRetrieveAPIView.as_view(), name='repair-report-batch'),
     path('repair-reports/<uuid:pk>',views.RepairReportRetrieveUpdateAPIView.as_view(), name='repair-report-detail'),
     path('repair-reports/my-workshop', views.RepairReportsInWorkshopListAPIView.as_view(), name='workshop-repair-report-list'),
     path('repair-reports/related-repairs/<uuid:vehicle_id>',views.RelatedVehicleRepairReportsListAPIView.as_view(), name='related-repair-report-list'),
@@ -33,4 +49,8 @@ urlpatterns = [
     path('repair-reports/<uuid:pk>/rejections', views.RepairReportRejectAPIView.as_view(), name='repair-report-reject'),
     path('repair-reports/rejections',views.RepairReportRejectionListAPIView.as_view(), name='repair-report-rejection-list'),
     path('repair-reports/rejections/<uuid:pk>',views.RepairReportRejectionRetrieveAPIView.as_view(), name='repair-report-rejection-detail'),
+    path('dashboard',views.FleetDashboardAPIView.as_view(), name='fleet-dashboard'),
+    path('analytics/repair-costs',views.RepairCostAnalyticsAPIView.as_view(), name='repair-cost-analytics'),
+    path('search',views.SearchAPIView.as_view(), name='search'),
+    path('metrics/requests',views.RequestMetricsAPIView.as_view(), name='request-metrics'),
 ]
\ No newline at end of file
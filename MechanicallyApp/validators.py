@@ -1,8 +1,14 @@
 from datetime import date
+import logging
 import re
 from rest_framework import serializers
+from django.conf import settings
 from django.core.exceptions import ValidationError as DjangoValidationError
 
+from .breached_password_services import is_password_breached
+
+logger = logging.getLogger('MechanicallyApp.passwords')
+
 def first_name_validator(first_name):
     if not re.match('^[A-ZĄĆĘŁŃÓŚŹŻ][a-ząćęłńóśźż]{2,}$', first_name):
         raise serializers.ValidationError('First name must start with capital letter and contain only letters.')
@@ -56,3 +62,27 @@ class MaximumLengthValidator:
     def validate(self, password, user=None):
         if len(password) > self.max_length:
            raise DjangoValidationError(f'Password must be less than {self.max_length} characters.', code='password_to_long', params={'max_length': self.max_length})
+
+#odrzuca hasła z lokalnej bazy wyciekniętych haseł (komenda build_breached_password_file) bez zapytań do zewnętrznego API.
+#Brak pliku bazy nie blokuje ustawiania haseł - jak przy niedostępnym API, pozostają pozostałe walidatory (m.in. CommonPasswordValidator),
+#a "manage.py check --deploy" zgłasza go jako błąd (MechanicallyApp.checks)
+class BreachedPasswordValidator:
+    def __init__(self, path=None):
+        self.path = path
+        self.unavailable_path = None
+
+    def validate(self, password, user=None):
+        path = self.path or settings.BREACHED_PASSWORDS_PATH
+        try:
+            breached = is_password_breached(password, path)
+        except (OSError, ValueError) as err:
+            if self.unavailable_path != path:
+                logger.warning('Breached password database is unavailable: %s', err)
+                self.unavailable_path = path
+            return
+        self.unavailable_path = None
+        if breached:
+            raise DjangoValidationError('This password has appeared in a data breach and cannot be used.', code='password_breached')
+
+    def get_help_text(self):
+        return 'Your password cannot be a password that has appeared in a known data breach.'
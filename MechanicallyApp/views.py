@@ -1,10 +1,13 @@
+import codecs
+
 from django.contrib.auth import authenticate, login, logout
-from django.db import transaction
+from django.http import StreamingHttpResponse
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.throttling import ScopedRateThrottle
 
 from .models import Manufacturer, Location, UserLocationAssignment, Vehicle, User, FailureReport, RepairReport, \
-    RepairReportRejection, City
+    RepairReportRejection, City, RepairCostRollup
 from .serializers import ManufacturerSerializer, LocationCreateSerializer, \
     UserNestedLocationAssignmentSerializer, \
     VehicleCreateUpdateSerializer, VehicleRetrieveSerializer, VehicleListSerializer, AccountActivationSerializer, \
@@ -16,18 +19,37 @@ from .serializers import ManufacturerSerializer, LocationCreateSerializer, \
     FailureReportReassignSerializer, \
     RepairReportRetrieveUpdateSerializer, RepairReportListSerializer, LocationUpdateSerializer, LocationListSerializer, \
     RepairReportRejectionSerializer, RepairReportRejectionListSerializer, RepairReportRejectionRetrieveSerializer, \
-    PasswordChangeSerializer, LoginSerializer, CitySerializer, LocationRetrieveSerializer
+    PasswordChangeSerializer, LoginSerializer, CitySerializer, LocationRetrieveSerializer, \
+    RepairCostAnalyticsQuerySerializer, RepairCostSummarySerializer, SearchQuerySerializer, VehicleVinLookupSerializer, \
+    VehicleBatchVinLookupSerializer, RefreshTokenSerializer
 from rest_framework import generics, status
 from rest_framework.views import APIView
 from .permissions import IsManager, IsAdmin, \
     IsAdminOrSuperuserAndTargetUserHasLowerRole, IsStandardAssignedToBranch, IsMechanicAssignedToWorkshop, \
     IsManagerThatManagesSelectedFailureReport, IsAccountOwner
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.exceptions import NotFound, ValidationError
-from django.db.models import Q
+from django.db.models import Q, Exists, OuterRef
 from django_filters import rest_framework as external_filters
 from .filters import LocationFilter, VehicleFilter, UserFilter, FailureReportFilter, RepairReportFilter, \
-    RepairReportRejectionFilter
+    RepairReportRejectionFilter, RepairCostRollupFilter
+from .actor_context import get_actor_context
+from .cache_services import CachedListMixin
+from .export_services import EXPORT_FORMATS, FAILURE_REPORT_EXPORT_FIELDS, REPAIR_REPORT_EXPORT_FIELDS, \
+    REPAIR_REPORT_REJECTION_EXPORT_FIELDS, stream_export
+from .import_services import import_vehicles
+from .dashboard_services import fleet_dashboard
+from .analytics_services import repair_cost_summary
+from .search_services import SEARCH_TARGETS, search
+from .lookup_services import lookup_vehicles_by_vin
+from .token_services import issue_token_pair, revoke_token
+from .metrics_services import collect_request_metrics, request_metrics, summarize_route, DURATION_BUCKETS_MS, QUERY_COUNT_BUCKETS
+from .mixins import EagerLoadingMixin, ConditionalGetMixin, AutocompleteMixin, BatchRetrieveMixin, apply_eager_loading
+from .workflow_services import dismiss_failure_report, resolve_failure_report, obtain_failure_report, \
+    release_failure_report, set_repair_report_ready, set_repair_report_active
+from .pagination import ManufacturerCursorPagination, CityCursorPagination, LocationCursorPagination, \
+    VehicleCursorPagination, UserCursorPagination, FailureReportCursorPagination, RepairReportCursorPagination, \
+    RepairReportRejectionCursorPagination
 
 
 #dodawać i edytować Manufacturera może administrator, reszta może wypisywać
@@ -37,7 +59,7 @@ class UserLoginAPIView(APIView):
     http_method_names = ['post']
     throttle_classes = [ScopedRateThrottle]
     throttle_scope = 'login'
-    def post(self, request):
+    def authenticate_credentials(self, request):
         serializer=LoginSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         username = serializer.validated_data.get('username')
@@ -49,9 +71,49 @@ class UserLoginAPIView(APIView):
         user=authenticate(request, username=username, password=password)
         if user is None:
             raise ValidationError({'detail':'Username or password is incorrect.'})
+        return user
+
+    def post(self, request):
+        user = self.authenticate_credentials(request)
         login(request, user)
         return Response({'message': 'Login successful.'}, status=status.HTTP_200_OK)
 
+#logowanie bez sesji dla aplikacji mobilnych i usług: zwraca krótko żyjący token dostępu (nagłówek Authorization: Bearer)
+#oraz token odświeżania
+class TokenObtainAPIView(UserLoginAPIView):
+    def post(self, request):
+        user = self.authenticate_credentials(request)
+        return Response(issue_token_pair(user), status=status.HTTP_200_OK)
+
+#wymiana tokenu odświeżania na nową parę tokenów; stary token odświeżania trafia na listę odwołanych, a rola
+#i lokalizacja w nowych tokenach odczytywane są ponownie z bazy
+class TokenRefreshAPIView(APIView):
+    permission_classes = [AllowAny]
+    http_method_names = ['post']
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'token_refresh'
+    def post(self, request):
+        serializer=RefreshTokenSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        payload = serializer.validated_data['refresh']
+        user = User.objects.filter(pk=payload['sub'], is_active=True).first()
+        if user is None:
+            raise ValidationError({'refresh': 'Token is invalid or expired.'})
+        revoke_token(payload)
+        return Response(issue_token_pair(user), status=status.HTTP_200_OK)
+
+#wylogowanie dla tokenów: odwołuje token odświeżania oraz token dostępu, którym uwierzytelniono żądanie
+class TokenRevokeAPIView(APIView):
+    permission_classes = [AllowAny]
+    http_method_names = ['post']
+    def post(self, request):
+        serializer=RefreshTokenSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        revoke_token(serializer.validated_data['refresh'])
+        if isinstance(request.auth, dict):
+            revoke_token(request.auth)
+        return Response({'message': 'Token has been revoked.'}, status=status.HTTP_200_OK)
+
 class UserLogoutAPIView(APIView):
     permission_classes = [IsAuthenticated]
     http_method_names = ['post']
@@ -59,10 +121,12 @@ class UserLogoutAPIView(APIView):
         logout(request)
         return Response({'message': 'Logout successful.'}, status=status.HTTP_200_OK)
 
-class ManufacturerListCreateAPIView(generics.ListCreateAPIView):
+class ManufacturerListCreateAPIView(CachedListMixin, EagerLoadingMixin, generics.ListCreateAPIView):
+    cache_namespace = 'manufacturers'
     queryset = Manufacturer.objects.all()
     serializer_class = ManufacturerSerializer
     http_method_names = ['head', 'get', 'post']
+    pagination_class = ManufacturerCursorPagination
     filter_backends = (external_filters.DjangoFilterBackend,)
     def get_permissions(self):
         if self.request.method.lower() == 'post':
@@ -71,20 +135,22 @@ class ManufacturerListCreateAPIView(generics.ListCreateAPIView):
             self.permission_classes = [IsAuthenticated]
         return super().get_permissions()
 
-class CityListCreateAPIView(generics.ListCreateAPIView):
+class CityListCreateAPIView(CachedListMixin, EagerLoadingMixin, generics.ListCreateAPIView):
+    cache_namespace = 'cities'
     queryset = City.objects.all()
     serializer_class = CitySerializer
     http_method_names = ['head', 'get', 'post']
+    pagination_class = CityCursorPagination
     filter_backends = (external_filters.DjangoFilterBackend,)
     permission_classes = [IsAdmin]
 
-class CityRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
+class CityRetrieveUpdateDestroyAPIView(EagerLoadingMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = City.objects.all()
     serializer_class = CitySerializer
     http_method_names = ['head', 'get', 'put', 'patch', 'delete']
     permission_classes = [IsAdmin]
 
-class ManufacturerRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
+class ManufacturerRetrieveUpdateDestroyAPIView(EagerLoadingMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Manufacturer.objects.all()
     serializer_class = ManufacturerSerializer
     http_method_names = ['head', 'get', 'put', 'patch', 'delete']
@@ -98,9 +164,11 @@ class ManufacturerRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPI
 
 #dodawać, usuwać oraz modyfikować lokalizacje może administrator
 #wypisywać wszystkie lokalizacje mogą wszyscy
-class LocationListCreateAPIView(generics.ListCreateAPIView):
+class LocationListCreateAPIView(CachedListMixin, EagerLoadingMixin, generics.ListCreateAPIView):
+    cache_namespace = 'locations'
     queryset = Location.objects.all()
     http_method_names = ['head', 'get', 'post']
+    pagination_class = LocationCursorPagination
     filter_backends = (external_filters.DjangoFilterBackend,)
     filterset_class = LocationFilter
     def get_serializer_class(self):
@@ -116,7 +184,7 @@ class LocationListCreateAPIView(generics.ListCreateAPIView):
         return super().get_permissions()
 
 
-class LocationRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
+class LocationRetrieveUpdateDestroyAPIView(EagerLoadingMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Location.objects.all()
     http_method_names = ['head', 'get', 'put', 'patch', 'delete']
     def get_serializer_class(self):
@@ -138,7 +206,7 @@ class UserLocationAPIView(APIView):
     http_method_names = ['head', 'get']
 
     def get(self, request):
-        user_location_assignment = UserLocationAssignment.objects.filter(user_id=request.user.id).first()
+        user_location_assignment = apply_eager_loading(UserLocationAssignment.objects.filter(user_id=request.user.id), UserNestedLocationAssignmentSerializer).first()
         if user_location_assignment is None:
             raise NotFound('Your account is not assigned to any location.')
         else:
@@ -148,10 +216,11 @@ class UserLocationAPIView(APIView):
 #ten widok umożliwia wypisywanie i tworzenie pojazdów przez menadżera oraz administratora
 #za pomocą odpowiednich query setów muszę zaimplementować wypisywanie pojazdów z siedziby standarda
 #a także wypisywanie pojazdów przez mechanika, dla których istnieje powiązanie FailureReport z jego warsztatem
-class VehicleListCreateAPIView(generics.ListCreateAPIView):
+class VehicleListCreateAPIView(EagerLoadingMixin, generics.ListCreateAPIView):
     queryset = Vehicle.objects.all()
     serializer_class = VehicleListSerializer
     http_method_names = ['head', 'get', 'post']
+    pagination_class = VehicleCursorPagination
     filter_backends = (external_filters.DjangoFilterBackend,)
     filterset_class = VehicleFilter
     def get_serializer_class(self):
@@ -169,19 +238,19 @@ class VehicleListCreateAPIView(generics.ListCreateAPIView):
     def get_queryset(self):
         qs = super().get_queryset()
         if self.request.user.role in ('standard', 'mechanic'):
-            location_id = UserLocationAssignment.objects.filter(user_id=self.request.user.id).values_list('location_id', flat=True).first()
+            location_id = get_actor_context(self.request).location_id
             if location_id is not None:
                 if self.request.user.role == 'standard':
                     return qs.filter(location_id=location_id)
                 elif self.request.user.role == 'mechanic':
-                    return qs.filter(failure_reports__workshop_id=location_id)
+                    return qs.filter(failure_reports__workshop_id=location_id).distinct()
         elif self.request.user.role in ('manager', 'admin'):
             return qs
         return qs.none()
 
 
 #ten widok umożliwia menadżerowi oraz administratorowi odczytywanie, aktualizowanie oraz usuwanie pojazdu
-class VehicleRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
+class VehicleRetrieveUpdateDestroyAPIView(EagerLoadingMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Vehicle.objects.all()
     http_method_names = ['head', 'get', 'put', 'patch', 'delete']
     def get_serializer_class(self):
@@ -199,17 +268,34 @@ class VehicleRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView)
     def get_queryset(self):
         qs = super().get_queryset()
         if self.request.user.role in ('standard','mechanic'):
-            location_id=UserLocationAssignment.objects.filter(user_id=self.request.user.id).values_list('location_id',flat=True).first()
+            location_id=get_actor_context(self.request).location_id
             if location_id is not None:
                 if self.request.user.role == 'standard':
                     return qs.filter(location_id=location_id)
                 elif self.request.user.role == 'mechanic':
-                    return qs.filter(failure_reports__workshop_id=location_id)
+                    return qs.filter(failure_reports__workshop_id=location_id).distinct()
         elif self.request.user.role in ('manager', 'admin'):
             return qs
         return qs.none()
 
 
+#widok do masowego importu pojazdów z pliku CSV lub NDJSON przez menadżera oraz administratora
+class VehicleImportAPIView(APIView):
+    http_method_names = ['post']
+    permission_classes = [IsManager | IsAdmin]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        uploaded_file = request.FILES.get('file')
+        if uploaded_file is None:
+            raise ValidationError({'file': 'File was not provided.'})
+        file_format = request.data.get('format')
+        if file_format is None:
+            file_format = 'csv' if uploaded_file.name.lower().endswith('.csv') else 'ndjson'
+        report = import_vehicles(codecs.iterdecode(uploaded_file, 'utf-8-sig', errors='replace'), file_format)
+        return Response(report, status=status.HTTP_200_OK)
+
+
 #jest to widok służący do aktywacji konta oraz zmiany hasła z domyślnego na wybrane przez usera
 class AccountActivationAPIView(APIView):
     http_method_names = ['post']
@@ -260,16 +346,17 @@ class PasswordChangeAPIView(APIView):
         except User.DoesNotExist:
             raise NotFound('There is no user with provided ID.')
         self.check_object_permissions(self.request, user)
-        serializer=PasswordChangeSerializer(data=request.data, context={'user': self.request.user})
+        serializer=PasswordChangeSerializer(data=request.data, context={'user': user})
         serializer.is_valid(raise_exception=True)
         result = serializer.save()
         return Response({'message': result}, status=status.HTTP_200_OK)
 
 
 #Jest to widok służący do utworzenia konta użytkownika oraz ich wylistowania. Zakres użytkowników oraz uprawnienia różnią się w zależności od roli użytkownika
-class UserListCreateAPIView(generics.ListCreateAPIView):
+class UserListCreateAPIView(EagerLoadingMixin, generics.ListCreateAPIView):
     queryset = User.objects.all()
     http_method_names = ['head', 'get', 'post']
+    pagination_class = UserCursorPagination
     filter_backends = (external_filters.DjangoFilterBackend,)
     filterset_class = UserFilter
     def get_permissions(self):
@@ -293,7 +380,7 @@ class UserListCreateAPIView(generics.ListCreateAPIView):
     def get_queryset(self):
         qs = super().get_queryset()
         if self.request.user.role == 'standard' or self.request.user.role == 'mechanic':
-            user_location_id=UserLocationAssignment.objects.filter(user=self.request.user).values_list('location_id',flat=True).first()
+            user_location_id=get_actor_context(self.request).location_id
             if user_location_id is not None:
                 return qs.filter(user_location_assignment__location_id=user_location_id)
             else:
@@ -311,14 +398,14 @@ class UserProfileAPIView(APIView):
     http_method_names = ['head', 'get']
 
     def get(self, request):
-        user=User.objects.filter(pk=self.request.user.pk).first()
+        user=apply_eager_loading(User.objects.filter(pk=self.request.user.pk), UserRetrieveSerializer).first()
         if user is None:
             raise NotFound('There is no user with provided ID.')
         self.check_object_permissions(self.request, user)
         serializer=UserRetrieveSerializer(user, context={'request': request, 'user_profile_endpoint':True})
         return Response(serializer.data,status=status.HTTP_200_OK)
 
-class UserRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
+class UserRetrieveUpdateDestroyAPIView(EagerLoadingMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = User.objects.all()
     http_method_names = ['head', 'get', 'put', 'patch', 'delete']
     def get_serializer_class(self):
@@ -342,7 +429,7 @@ class UserRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         qs = super().get_queryset()
         if self.request.user.role == 'standard' or self.request.user.role == 'mechanic':
-            user_location_id = UserLocationAssignment.objects.filter(user_id=self.request.user.id).values_list('location_id',flat=True).first()
+            user_location_id = get_actor_context(self.request).location_id
             if user_location_id is not None:
                 return qs.filter(user_location_assignment__location_id=user_location_id)
             else:
@@ -414,9 +501,12 @@ class UserAssignmentAPIView(APIView):
 
 
 #widok ten służy do tworzenia failure reportów przez standardowego użytkownika oraz wypisywania ich przez menadżera i admina
-class FailureReportListCreateAPIView(generics.ListCreateAPIView):
+class FailureReportListCreateAPIView(ConditionalGetMixin, EagerLoadingMixin, generics.ListCreateAPIView):
+    last_modified_field = 'last_status_change_date'
+    related_last_modified_fields = ('vehicle__last_change_date', 'vehicle__manufacturer__last_change_date')
     queryset = FailureReport.objects.all()
     http_method_names = ['head', 'get', 'post']
+    pagination_class = FailureReportCursorPagination
     filter_backends = (external_filters.DjangoFilterBackend,)
     filterset_class = FailureReportFilter
     def get_serializer_context(self):
@@ -438,7 +528,9 @@ class FailureReportListCreateAPIView(generics.ListCreateAPIView):
 
 
 #to widok dla menadżerów i adminów do wyświetlania dokładnych informacji o danym FailureReport
-class FailureReportRetrieveAPIView(generics.RetrieveAPIView):
+class FailureReportRetrieveAPIView(ConditionalGetMixin, EagerLoadingMixin, generics.RetrieveAPIView):
+    last_modified_field = 'last_status_change_date'
+    related_last_modified_fields = ('vehicle__last_change_date', 'vehicle__manufacturer__last_change_date', 'workshop__last_change_date')
     queryset = FailureReport.objects.all()
     serializer_class = FailureReportRetrieveSerializer
     http_method_names = ['head', 'get']
@@ -473,8 +565,7 @@ class FailureReportActionAPIView(APIView):
             if failure_report.status != 'P':
                 raise ValidationError({'detail':'Failure report is not in PENDING status.'})
 
-            failure_report.status = 'D'
-            failure_report.save()
+            dismiss_failure_report(failure_report)
             return Response({'message': 'Failure report has been dismissed.'}, status=status.HTTP_200_OK)
 
         elif action == 'reassign':
@@ -490,18 +581,7 @@ class FailureReportActionAPIView(APIView):
             if failure_report.status != 'A':
                 raise ValidationError({'detail':'Failure report is not in ASSIGNED status.'})
 
-            repair_report = failure_report.repair_report
-            if repair_report.status != 'R':
-                raise ValidationError({'detail':'Repair report is not in READY status.'})
-
-            with transaction.atomic():
-                vehicle = failure_report.vehicle
-                repair_report.status = 'H'
-                failure_report.status = 'R'
-                vehicle.availability = 'A'
-                repair_report.save()
-                failure_report.save()
-                vehicle.save()
+            resolve_failure_report(failure_report)
             return Response({'message': 'Failure report has been resolved.'}, status=status.HTTP_200_OK)
         else:
             raise ValidationError({'action':'Only available actions are: assign, reassign, dismiss, resolve'})
@@ -522,27 +602,28 @@ class FailureReportManagementAPIView(APIView):
 
         action=request.data.get('action')
         if action == 'obtain':
-            if failure_report.managed_by is not None:
-                if failure_report.managed_by == self.request.user:
+            if failure_report.managed_by_id is not None:
+                if failure_report.managed_by_id == self.request.user.pk:
                     raise ValidationError({'detail':'Failure report is already managed by you.'})
                 raise ValidationError({'detail':'Failure report is already managed by another manager.'})
 
-            failure_report.managed_by = self.request.user
-            failure_report.save()
+            obtain_failure_report(failure_report, self.request.user)
             return Response({'message': 'Failure report is now managed by your account.'}, status=status.HTTP_200_OK)
         elif action == 'release':
             self.check_object_permissions(self.request, failure_report)
-            failure_report.managed_by = None
-            failure_report.save()
+            release_failure_report(failure_report)
             return Response({'message': 'Failure report is no longer managed by your account.'},status=status.HTTP_200_OK)
         else:
             raise ValidationError({'action':'Only available actions are: obtain, release.'})
 
 #widok do wypisywania wszystkich repair reportów/do filtrowania, tylko dla menadżera i admina
-class RepairReportListAPIView(generics.ListAPIView):
+class RepairReportListAPIView(ConditionalGetMixin, EagerLoadingMixin, generics.ListAPIView):
+    last_modified_field = 'last_change_date'
+    related_last_modified_fields = ('failure_report__last_status_change_date',)
     queryset = RepairReport.objects.all()
     serializer_class = RepairReportListSerializer
     http_method_names = ['head', 'get']
+    pagination_class = RepairReportCursorPagination
     permission_classes = [IsManager | IsAdmin]
     filter_backends = (external_filters.DjangoFilterBackend,)
     filterset_class = RepairReportFilter
@@ -556,15 +637,18 @@ class RepairReportListAPIView(generics.ListAPIView):
         return qs.none()
 
 #widok ten służy do wyświetlenia wszystkich failure + repair przypisanych do warsztatu, w którym pracuje mechanik
-class RepairReportsInWorkshopListAPIView(generics.ListAPIView):
+class RepairReportsInWorkshopListAPIView(ConditionalGetMixin, EagerLoadingMixin, generics.ListAPIView):
+    last_modified_field = 'last_change_date'
+    related_last_modified_fields = ('failure_report__last_status_change_date',)
     serializer_class = RepairReportListSerializer
     permission_classes = [IsMechanicAssignedToWorkshop]
     http_method_names = ['head', 'get']
+    pagination_class = RepairReportCursorPagination
     filter_backends = (external_filters.DjangoFilterBackend,)
     filterset_class = RepairReportFilter
 
     def get_queryset(self):
-        mechanic_workshop_id=UserLocationAssignment.objects.filter(user_id=self.request.user.id,location__location_type='W').values_list('location_id',flat=True).first()
+        mechanic_workshop_id=get_actor_context(self.request).workshop_id
         if mechanic_workshop_id is not None:
             return RepairReport.objects.filter(failure_report__workshop_id=mechanic_workshop_id)
         else:
@@ -576,19 +660,24 @@ class RelatedVehicleRepairReportsListAPIView(APIView):
     permission_classes = [IsMechanicAssignedToWorkshop]
 
     def get(self,request,vehicle_id):
-        mechanic_workshop_id=UserLocationAssignment.objects.filter(user_id=self.request.user.id, location__location_type='W').values_list('location_id',flat=True).first()
+        mechanic_workshop_id=get_actor_context(self.request).workshop_id
         if mechanic_workshop_id is not None:
             #sprawdzenie czy dla danego pojazdu istnieje failure_report przypisany do warsztatu mechanika o statusie ACTIVE albo READY: oznacza to, że pojazd jest przydzielony do naprawy w warsztacie mechanika
             if RepairReport.objects.filter(failure_report__vehicle_id=vehicle_id, failure_report__workshop_id=mechanic_workshop_id, status__in=['A', 'R']).exists():
-                repair_reports = RepairReport.objects.filter(failure_report__vehicle_id=vehicle_id, status='H')
-                serializer = RepairReportListSerializer(repair_reports, many=True)
-                return Response(serializer.data, status=status.HTTP_200_OK)
+                repair_reports = apply_eager_loading(RepairReport.objects.filter(failure_report__vehicle_id=vehicle_id, status='H'), RepairReportListSerializer)
+                paginator = RepairReportCursorPagination()
+                page = paginator.paginate_queryset(repair_reports, request, view=self)
+                serializer = RepairReportListSerializer(page, many=True)
+                return paginator.get_paginated_response(serializer.data)
             else:
                 raise NotFound("There is no vehicle with provided id assigned to repair in your workshop.")
         else:
             raise NotFound("You are not assigned to any location.")
 
-class RepairReportRetrieveUpdateAPIView(generics.RetrieveUpdateAPIView):
+class RepairReportRetrieveUpdateAPIView(ConditionalGetMixin, EagerLoadingMixin, generics.RetrieveUpdateAPIView):
+    last_modified_field = 'last_change_date'
+    related_last_modified_fields = ('failure_report__last_status_change_date', 'failure_report__vehicle__last_change_date',
+                                    'failure_report__vehicle__manufacturer__last_change_date')
     queryset = RepairReport.objects.all()
     serializer_class = RepairReportRetrieveUpdateSerializer
     http_method_names = ['head', 'get', 'put', 'patch']
@@ -603,7 +692,7 @@ class RepairReportRetrieveUpdateAPIView(generics.RetrieveUpdateAPIView):
     def get_queryset(self):
         qs=super().get_queryset()
         if self.request.user.role == 'mechanic':
-            mechanic_workshop_id=UserLocationAssignment.objects.filter(user_id=self.request.user.id,location__location_type='W').values_list('location_id',flat=True).first()
+            mechanic_workshop_id=get_actor_context(self.request).workshop_id
             if mechanic_workshop_id is not None:
                 if self.request.method.lower() in ('get','head'):
                     pk=self.kwargs.get('pk')
@@ -624,7 +713,7 @@ class RepairReportChangeStatusAPIView(APIView):
     http_method_names = ['post']
     permission_classes = [IsMechanicAssignedToWorkshop]
     def post(self, request, pk):
-        mechanic_workshop_id=UserLocationAssignment.objects.filter(user_id=self.request.user.id,location__location_type='W').values_list('location_id',flat=True).first()
+        mechanic_workshop_id=get_actor_context(self.request).workshop_id
         if mechanic_workshop_id is None:
             raise NotFound("You are not assigned to any location.")
         repair_report=RepairReport.objects.filter(pk=pk,failure_report__workshop_id=mechanic_workshop_id).first()
@@ -635,15 +724,13 @@ class RepairReportChangeStatusAPIView(APIView):
             if repair_report.status != 'A':
                 raise ValidationError({'detail':'Repair report is not in ACTIVE status.'})
             else:
-                repair_report.status = 'R'
-                repair_report.save()
+                set_repair_report_ready(repair_report)
                 return Response({'message': 'Repair report has been set as ready.'}, status=status.HTTP_200_OK)
         elif req_status=='active':
             if repair_report.status != 'R':
                 raise ValidationError({'detail':'Repair report is not in READY status.'})
             else:
-                repair_report.status = 'A'
-                repair_report.save()
+                set_repair_report_active(repair_report)
                 return Response({'message':'Repair report has been set as active.'}, status=status.HTTP_200_OK)
         else:
             raise ValidationError({'status':'Available status types are: ready, active.'})
@@ -665,18 +752,17 @@ class RepairReportRejectAPIView(APIView):
 
         serializer=RepairReportRejectionSerializer(data=request.data,context={'repair_report':repair_report})
         serializer.is_valid(raise_exception=True)
-        with transaction.atomic():
-            serializer.save()
-            repair_report.status='A'
-            repair_report.save()
-            return Response({'message': 'Repair report has been rejected.'}, status=status.HTTP_200_OK)
+        serializer.save()
+        return Response({'message': 'Repair report has been rejected.'}, status=status.HTTP_200_OK)
 
 
-class RepairReportRejectionListAPIView(generics.ListAPIView):
+class RepairReportRejectionListAPIView(ConditionalGetMixin, EagerLoadingMixin, generics.ListAPIView):
+    last_modified_field = 'rejection_date'
     queryset = RepairReportRejection.objects.all()
     serializer_class = RepairReportRejectionListSerializer
     permission_classes = [IsManager | IsAdmin |IsMechanicAssignedToWorkshop]
     http_method_names = ['head', 'get']
+    pagination_class = RepairReportRejectionCursorPagination
     filter_backends = (external_filters.DjangoFilterBackend,)
     filterset_class = RepairReportRejectionFilter
 
@@ -688,7 +774,7 @@ class RepairReportRejectionListAPIView(generics.ListAPIView):
     def get_queryset(self):
         qs=super().get_queryset()
         if self.request.user.role == 'mechanic':
-            mechanic_workshop_id=UserLocationAssignment.objects.filter(user_id=self.request.user.id,location__location_type='W').values_list('location_id',flat=True).first()
+            mechanic_workshop_id=get_actor_context(self.request).workshop_id
             if mechanic_workshop_id is not None:
                 return qs.filter(repair_report__failure_report__workshop_id=mechanic_workshop_id)
         elif self.request.user.role=='manager':
@@ -697,7 +783,7 @@ class RepairReportRejectionListAPIView(generics.ListAPIView):
             return qs
         return qs.none()
 
-class RepairReportRejectionRetrieveAPIView(generics.RetrieveAPIView):
+class RepairReportRejectionRetrieveAPIView(EagerLoadingMixin, generics.RetrieveAPIView):
     queryset = RepairReportRejection.objects.all()
     serializer_class = RepairReportRejectionRetrieveSerializer
     permission_classes = [IsManager | IsAdmin | IsMechanicAssignedToWorkshop]
@@ -711,7 +797,7 @@ class RepairReportRejectionRetrieveAPIView(generics.RetrieveAPIView):
     def get_queryset(self):
         qs=super().get_queryset()
         if self.request.user.role == 'mechanic':
-            mechanic_workshop_id=UserLocationAssignment.objects.filter(user_id=self.request.user.id,location__location_type='W').values_list('location_id',flat=True).first()
+            mechanic_workshop_id=get_actor_context(self.request).workshop_id
             if mechanic_workshop_id is not None:
                 return qs.filter(repair_report__failure_report__workshop_id=mechanic_workshop_id)
 
@@ -721,3 +807,235 @@ class RepairReportRejectionRetrieveAPIView(generics.RetrieveAPIView):
             return qs
         return qs.none()
 
+
+#bazowy widok eksportu - odpowiedź jest strumieniowana wiersz po wierszu, bez serializerów i bez ładowania
+#całej tabeli do pamięci. Format wybierany jest parametrem file_format (csv albo ndjson)
+class StreamingExportAPIView(generics.GenericAPIView):
+    http_method_names = ['head', 'get']
+    permission_classes = [IsManager | IsAdmin]
+    filter_backends = (external_filters.DjangoFilterBackend,)
+    export_fields = ()
+    export_file_name = None
+
+    def get(self, request):
+        file_format = request.query_params.get('file_format', 'csv')
+        if file_format not in EXPORT_FORMATS:
+            raise ValidationError({'file_format': 'Only available formats are: %s.' % ', '.join(EXPORT_FORMATS)})
+        queryset = self.filter_queryset(self.get_queryset())
+        content_type = 'text/csv' if file_format == 'csv' else 'application/x-ndjson'
+        response = StreamingHttpResponse(stream_export(queryset, self.export_fields, file_format), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{self.export_file_name}.{file_format}"'
+        return response
+
+class FailureReportExportAPIView(StreamingExportAPIView):
+    queryset = FailureReport.objects.all()
+    filterset_class = FailureReportFilter
+    export_fields = FAILURE_REPORT_EXPORT_FIELDS
+    export_file_name = 'failure-reports'
+
+    def get_queryset(self):
+        qs=super().get_queryset()
+        if self.request.user.role=='manager':
+            return qs.filter(managed_by_id=self.request.user.id)
+        elif self.request.user.role=='admin':
+            return qs
+        return qs.none()
+
+class RepairReportExportAPIView(StreamingExportAPIView):
+    queryset = RepairReport.objects.all()
+    filterset_class = RepairReportFilter
+    export_fields = REPAIR_REPORT_EXPORT_FIELDS
+    export_file_name = 'repair-reports'
+
+    def get_queryset(self):
+        qs=super().get_queryset()
+        if self.request.user.role=='manager':
+            return qs.filter(failure_report__managed_by_id=self.request.user.id)
+        elif self.request.user.role=='admin':
+            return qs
+        return qs.none()
+
+class RepairReportRejectionExportAPIView(StreamingExportAPIView):
+    queryset = RepairReportRejection.objects.all()
+    filterset_class = RepairReportRejectionFilter
+    export_fields = REPAIR_REPORT_REJECTION_EXPORT_FIELDS
+    export_file_name = 'repair-report-rejections'
+
+    def get_queryset(self):
+        qs=super().get_queryset()
+        if self.request.user.role=='manager':
+            return qs.filter(repair_report__failure_report__managed_by_id=self.request.user.id)
+        elif self.request.user.role=='admin':
+            return qs
+        return qs.none()
+
+#histogramy czasu i liczby zapytań per trasa zebrane przez RequestProfilingMiddleware ze wszystkich procesów;
+#proces obsługujący żądanie publikuje najpierw własną migawkę, żeby jego dane nie czekały na kolejny flush
+class RequestMetricsAPIView(APIView):
+    permission_classes = [IsAdmin]
+    http_method_names = ['head', 'get']
+
+    def get(self, request):
+        request_metrics.publish()
+        metrics = collect_request_metrics()
+        routes = {route: summarize_route(route_metrics) for route, route_metrics in sorted(metrics['routes'].items())}
+        if request.query_params.get('histograms') == 'true':
+            for route, route_metrics in metrics['routes'].items():
+                routes[route]['histograms'] = {name: route_metrics[name] for name in ('total_ms', 'sql_ms', 'queries')}
+        return Response({'process_count': metrics['process_count'], 'duration_buckets_ms': DURATION_BUCKETS_MS,
+                         'query_count_buckets': QUERY_COUNT_BUCKETS, 'routes': routes}, status=status.HTTP_200_OK)
+
+#panel floty dla menadżera oraz administratora: liczby pojazdów, zgłoszeń awarii i raportów naprawy wyliczane
+#zapytaniami agregującymi. Zakres danych odpowiada widokom list (menadżer widzi tylko raporty naprawy swoich zgłoszeń)
+class FleetDashboardAPIView(APIView):
+    permission_classes = [IsManager | IsAdmin]
+    http_method_names = ['head', 'get']
+
+    def get(self, request):
+        repair_reports = RepairReport.objects.all()
+        if request.user.role == 'manager':
+            repair_reports = repair_reports.filter(failure_report__managed_by_id=request.user.id)
+            cache_key = f'dashboard:manager:{request.user.id}'
+        else:
+            cache_key = 'dashboard:admin'
+        dashboard = fleet_dashboard(cache_key, Vehicle.objects.all(), FailureReport.objects.all(), repair_reports)
+        return Response(dashboard, status=status.HTTP_200_OK)
+
+#analityka kosztów napraw dla menadżera (tylko zgłoszenia, którymi zarządza) oraz administratora, liczona z dziennych
+#wierszy RepairCostRollup zamiast z pełnej historii raportów naprawy. Parametr group_by wybiera podział (dzień, miesiąc,
+#rok, pojazd, producent, warsztat)
+class RepairCostAnalyticsAPIView(generics.GenericAPIView):
+    queryset = RepairCostRollup.objects.all()
+    http_method_names = ['head', 'get']
+    permission_classes = [IsManager | IsAdmin]
+    filter_backends = (external_filters.DjangoFilterBackend,)
+    filterset_class = RepairCostRollupFilter
+
+    def get_queryset(self):
+        qs=super().get_queryset()
+        if self.request.user.role=='manager':
+            return qs.filter(managed_by_id=self.request.user.id)
+        elif self.request.user.role=='admin':
+            return qs
+        return qs.none()
+
+    def get(self, request):
+        query_serializer = RepairCostAnalyticsQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        summary = repair_cost_summary(self.filter_queryset(self.get_queryset()), **query_serializer.validated_data)
+        return Response(RepairCostSummarySerializer(summary).data, status=status.HTTP_200_OK)
+
+#wyszukiwanie pełnotekstowe w zgłoszeniach awarii, raportach naprawy i odrzuceniach (indeks FULLTEXT na MySQL).
+#Każdy typ wyników zawężany jest tak samo jak w odpowiadającym mu widoku listy i sortowany malejąco po trafności
+class SearchAPIView(APIView):
+    http_method_names = ['head', 'get']
+    permission_classes = [IsMechanicAssignedToWorkshop | IsManager | IsAdmin]
+    result_serializers = {
+        'failure_reports': FailureReportListSerializer,
+        'repair_reports': RepairReportListSerializer,
+        'rejections': RepairReportRejectionListSerializer,
+    }
+
+    def get_search_queryset(self, search_type):
+        role=self.request.user.role
+        if search_type == 'failure_reports':
+            if role in ('manager', 'admin'):
+                return FailureReport.objects.all()
+        elif search_type == 'repair_reports':
+            if role == 'mechanic':
+                return RepairReport.objects.filter(failure_report__workshop_id=get_actor_context(self.request).workshop_id)
+            elif role == 'manager':
+                return RepairReport.objects.filter(failure_report__managed_by_id=self.request.user.id)
+            elif role == 'admin':
+                return RepairReport.objects.all()
+        elif search_type == 'rejections':
+            if role == 'mechanic':
+                return RepairReportRejection.objects.filter(repair_report__failure_report__workshop_id=get_actor_context(self.request).workshop_id)
+            elif role == 'manager':
+                return RepairReportRejection.objects.filter(repair_report__failure_report__managed_by_id=self.request.user.id)
+            elif role == 'admin':
+                return RepairReportRejection.objects.all()
+        return SEARCH_TARGETS[search_type][0].objects.none()
+
+    def get(self, request):
+        query_serializer=SearchQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        query, limit=query_serializer.validated_data['q'], query_serializer.validated_data['limit']
+        response_data={'query': query}
+        for search_type in query_serializer.validated_data['types']:
+            serializer_class=self.result_serializers[search_type]
+            queryset=apply_eager_loading(self.get_search_queryset(search_type), serializer_class)
+            matches=search(queryset, SEARCH_TARGETS[search_type][1], query, limit)
+            response_data[search_type]=[{**serializer_class(obj).data, 'relevance': round(relevance, 4)} for obj, relevance in matches]
+        return Response(response_data, status=status.HTTP_200_OK)
+
+#podpowiedzi dla pól wyszukiwania w interfejsie: zakres danych i uprawnienia jak w widokach list lokalizacji,
+#użytkowników i pojazdów, dopasowanie prefiksowe po znormalizowanych kolumnach
+class LocationAutocompleteAPIView(AutocompleteMixin, LocationListCreateAPIView):
+    autocomplete_fields = ('name_normalized',)
+
+class UserAutocompleteAPIView(AutocompleteMixin, UserListCreateAPIView):
+    autocomplete_fields = ('last_name_normalized', 'first_name_normalized', 'email_normalized')
+
+class VehicleAutocompleteAPIView(AutocompleteMixin, VehicleListCreateAPIView):
+    autocomplete_fields = ('vehicle_model_normalized',)
+
+#wyszukiwanie pojazdu po numerze VIN (vehicles/by-vin/<vin>) lub kilku pojazdów naraz (vehicles/by-vin?vins=A,B).
+#Numery są walidowane przed zapytaniem, a pojazdy wraz z otwartym zgłoszeniem awarii i warsztatem pobierane są
+#jednym zapytaniem. Zakres widocznych pojazdów jest taki sam jak w VehicleRetrieveUpdateDestroyAPIView
+class VehicleByVinAPIView(APIView):
+    http_method_names = ['head', 'get']
+    permission_classes = [IsStandardAssignedToBranch | IsMechanicAssignedToWorkshop | IsManager | IsAdmin]
+
+    def get_queryset(self):
+        qs = Vehicle.objects.all()
+        if self.request.user.role in ('standard', 'mechanic'):
+            location_id = get_actor_context(self.request).location_id
+            if location_id is not None:
+                if self.request.user.role == 'standard':
+                    return qs.filter(location_id=location_id)
+                elif self.request.user.role == 'mechanic':
+                    return qs.filter(Exists(FailureReport.objects.filter(vehicle_id=OuterRef('pk'), workshop_id=location_id)))
+        elif self.request.user.role in ('manager', 'admin'):
+            return qs
+        return qs.none()
+
+    def get(self, request, vin=None):
+        if vin is not None:
+            serializer = VehicleVinLookupSerializer(data={'vin': vin})
+            serializer.is_valid(raise_exception=True)
+            vin = serializer.validated_data['vin']
+            vehicle = lookup_vehicles_by_vin(self.get_queryset(), [vin]).get(vin)
+            if vehicle is None:
+                raise NotFound('There is no vehicle with provided VIN.')
+            return Response(vehicle, status=status.HTTP_200_OK)
+
+        serializer = VehicleBatchVinLookupSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        vins = serializer.validated_data['vins']
+        vehicles = lookup_vehicles_by_vin(self.get_queryset(), vins)
+        return Response({'results': [vehicles[vin] for vin in vins if vin in vehicles],
+                         'not_found': [vin for vin in vins if vin not in vehicles]}, status=status.HTTP_200_OK)
+
+#pobieranie wielu pojazdów, użytkowników, zgłoszeń awarii lub raportów naprawy jednym żądaniem (np. vehicles/batch?ids=A,B)
+#zamiast osobnego żądania o każdy obiekt. Uprawnienia, zakres danych i serializery są takie same jak w widokach szczegółów
+class VehicleBatchRetrieveAPIView(BatchRetrieveMixin, VehicleRetrieveUpdateDestroyAPIView):
+    pass
+
+class UserBatchRetrieveAPIView(BatchRetrieveMixin, UserRetrieveUpdateDestroyAPIView):
+    pass
+
+class FailureReportBatchRetrieveAPIView(BatchRetrieveMixin, FailureReportRetrieveAPIView):
+    pass
+
+#mechanik widzi raporty ze swojego warsztatu oraz historyczne raporty pojazdów, które są w nim naprawiane
+#(w widoku szczegółów ten sam warunek sprawdzany jest dla pojazdu pojedynczego raportu)
+class RepairReportBatchRetrieveAPIView(BatchRetrieveMixin, RepairReportRetrieveUpdateAPIView):
+    def get_queryset(self):
+        if self.request.user.role == 'mechanic':
+            mechanic_workshop_id=get_actor_context(self.request).workshop_id
+            if mechanic_workshop_id is not None:
+                repaired_vehicles=RepairReport.objects.filter(failure_report__workshop_id=mechanic_workshop_id, status__in=['A', 'R']).values('failure_report__vehicle_id')
+                return self.queryset.filter(Q(failure_report__workshop_id=mechanic_workshop_id) | Q(failure_report__vehicle_id__in=repaired_vehicles, status='H'))
+            return self.queryset.none()
+        return super().get_queryset()
@@ -0,0 +1,51 @@
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .analytics_services import record_repair_cost
+from .concurrency import update_versioned, update_queryset_versioned
+from .models import Vehicle, RepairReport, RepairReportRejection
+
+#przejścia stanów failure reportów i repair reportów. Każde przejście to docelowe zapytania UPDATE zapisujące tylko
+#zmieniane kolumny, z oczekiwanym statusem i wersją wiersza w klauzuli WHERE - jeśli wiersz zmienił się od czasu
+#odczytu, przejście kończy się błędem 409 zamiast nadpisania cudzej zmiany
+
+def obtain_failure_report(failure_report, manager):
+    update_versioned(failure_report, predicates={'status__in': ('P', 'A', 'S'), 'managed_by__isnull': True}, managed_by=manager)
+
+def release_failure_report(failure_report):
+    update_versioned(failure_report, predicates={'status__in': ('P', 'A', 'S')}, managed_by=None)
+
+def assign_failure_report(failure_report, workshop):
+    with transaction.atomic():
+        update_versioned(failure_report, predicates={'status': 'P', 'workshop__isnull': True}, workshop=workshop, status='A')
+        return RepairReport.objects.create(failure_report=failure_report, status='A', cost=0)
+
+def dismiss_failure_report(failure_report):
+    update_versioned(failure_report, predicates={'status': 'P'}, status='D')
+
+def reassign_failure_report(failure_report, workshop):
+    update_versioned(failure_report, predicates={'status__in': ('A', 'S')}, workshop=workshop, status='A')
+
+#zamknięcie failure reportu: repair report przechodzi z READY do HISTORIC, a pojazd staje się dostępny.
+#Repair report i pojazd nie są wczytywane w całości - poza trzema zapytaniami UPDATE odczytywane są tylko kolumny
+#potrzebne do dopisania kosztu naprawy do dziennego wiersza RepairCostRollup, wszystko w jednej transakcji
+def resolve_failure_report(failure_report):
+    with transaction.atomic():
+        update_versioned(failure_report, predicates={'status': 'A'}, status='R')
+        repair_report_queryset = RepairReport.objects.filter(failure_report_id=failure_report.pk, status='R')
+        if not update_queryset_versioned(repair_report_queryset, status='H'):
+            raise ValidationError({'detail': 'Repair report is not in READY status.'})
+        record_repair_cost(RepairReport.objects.filter(failure_report_id=failure_report.pk))
+        Vehicle.objects.filter(pk=failure_report.vehicle_id).update(availability='A', last_change_date=timezone.now())
+
+def set_repair_report_ready(repair_report):
+    update_versioned(repair_report, predicates={'status': 'A'}, status='R')
+
+def set_repair_report_active(repair_report):
+    update_versioned(repair_report, predicates={'status': 'R'}, status='A')
+
+def reject_repair_report(repair_report, title, reason):
+    with transaction.atomic():
+        update_versioned(repair_report, predicates={'status': 'R'}, status='A')
+        return RepairReportRejection.objects.create(repair_report=repair_report, title=title, reason=reason)